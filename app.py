@@ -1,4 +1,19 @@
+import importlib
+
 import streamlit as st
+
+from hanvion_pages import data_reload, metrics
+
+# -----------------------------
+# Page Config
+# -----------------------------
+st.set_page_config(
+    page_title="Hanvion Health",
+    page_icon="💠",  # elegant icon (not shown inside UI, only browser tab)
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
 # -----------------------------
 # Global Hanvion UI Styling
 # -----------------------------
@@ -41,6 +56,43 @@ global_css = """
         box-shadow: 0px 4px 16px rgba(0,0,0,0.04);
     }
 
+    .hanvion-card h4 {
+        margin-top: 0;
+    }
+
+    .hanvion-card-tinted {
+        background: #f8f9ff;
+        border-color: #e0e3ff;
+    }
+
+    /* Card groups (hanvion_pages.components) */
+    .hanvion-card-row {
+        display: flex;
+        gap: 25px;
+        flex-wrap: wrap;
+        margin: 10px 0 20px;
+    }
+
+    .hanvion-card-row > .hanvion-card {
+        flex: 1;
+        min-width: 240px;
+    }
+
+    .hanvion-stat {
+        font-size: 28px;
+        font-weight: 700;
+        margin: 6px 0;
+    }
+
+    .hanvion-stat-lg {
+        font-size: 34px;
+    }
+
+    .hanvion-note {
+        font-size: 13px;
+        color: #777;
+    }
+
     /* Section banner */
     .hanvion-banner {
         background: linear-gradient(90deg, #eef2ff, #e0e7ff);
@@ -91,29 +143,30 @@ global_css = """
 
 </style>
 """
-st.markdown(global_css, unsafe_allow_html=True)
+# Sent on every rerun, so whitespace is collapsed before it goes out
+st.markdown(" ".join(global_css.split()), unsafe_allow_html=True)
 
 # -----------------------------
-# Import all pages
+# Page registry
 # -----------------------------
-from hanvion_pages.overview import page_overview
-from hanvion_pages.health_profile import page_health_profile
-from hanvion_pages.symptom_checker import page_symptom_checker
-from hanvion_pages.insurance_eligibility import page_insurance_checker
-from hanvion_pages.doctor_costs import page_doctor_costs
-from hanvion_pages.medication_prices import page_medication_prices
-from hanvion_pages.cms_costs import page_cms_costs
-
+# Label -> (module, render function). A page module (and pandas, numpy,
+# openpyxl with it) is only imported the first time its page is selected.
+PAGES = {
+    "Overview": ("hanvion_pages.overview", "page_overview"),
+    "Health Profile": ("hanvion_pages.health_profile", "page_health_profile"),
+    "Symptom Checker": ("hanvion_pages.symptom_checker", "page_symptom_checker"),
+    "Insurance Eligibility": ("hanvion_pages.insurance_eligibility", "page_insurance_checker"),
+    "Doctor Costs": ("hanvion_pages.doctor_costs", "page_doctor_costs"),
+    "Medication Prices": ("hanvion_pages.medication_prices", "page_medication_prices"),
+    "CMS Cost Viewer": ("hanvion_pages.cms_costs", "page_cms_costs"),
+}
+
+
+def render_page(label):
+    module_name, func_name = PAGES[label]
+    module = importlib.import_module(module_name)
+    getattr(module, func_name)()
 
-# -----------------------------
-# Page Config
-# -----------------------------
-st.set_page_config(
-    page_title="Hanvion Health",
-    page_icon="💠",  # elegant icon (not shown inside UI, only browser tab)
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
 # -----------------------------
 # Premium Sidebar Navigation
 # -----------------------------
@@ -191,15 +244,7 @@ st.sidebar.markdown('<div class="sidebar-section">Navigate</div>', unsafe_allow_
 
 page = st.sidebar.radio(
     "",
-    [
-        "Overview",
-        "Health Profile",
-        "Symptom Checker",
-        "Insurance Eligibility",
-        "Doctor Costs",
-        "Medication Prices",
-        "CMS Cost Viewer"
-    ],
+    list(PAGES.keys()),
     format_func=lambda x: x  # don't alter labels
 )
 
@@ -216,23 +261,23 @@ st.sidebar.markdown(
 # -----------------------------
 # Page Routing
 # -----------------------------
-if page == "Overview":
-    page_overview()
-
-elif page == "Health Profile":
-    page_health_profile()
-
-elif page == "Symptom Checker":
-    page_symptom_checker()
+metrics.start_exporters()
+data_reload.start_watcher()
 
-elif page == "Insurance Eligibility":
-    page_insurance_checker()
 
-elif page == "Doctor Costs":
-    page_doctor_costs()
+def run_page(label):
+    """
+    Render a page on one data snapshot, recording its duration and errors.
+    With HANVION_PROFILE_DIR set, sessions opened with ?profile=1 are profiled.
+    """
+    with metrics.page_run(label):
+        directory = metrics.profile_dir()
+        if directory and st.query_params.get("profile") == "1":
+            path = metrics.run_profiled(lambda: render_page(label), label, directory)
+            if path:
+                st.sidebar.caption(f"Profile written to {path}")
+        else:
+            render_page(label)
 
-elif page == "Medication Prices":
-    page_medication_prices()
 
-elif page == "CMS Cost Viewer":
-    page_cms_costs()
+run_page(page)
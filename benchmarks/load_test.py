@@ -0,0 +1,329 @@
+"""
+Concurrent-session load test for every page, driven headlessly through
+streamlit's AppTest (no browser).
+
+For each page and each session count N, N simulated sessions run at once
+in this process, each with its own session state. After opening the page,
+each session repeats the page's interaction script: typing in the CMS
+search, moving the insurance sliders, switching medications, and so on.
+Every widget change is one script rerun, and each rerun is timed. Per
+page and N it reports:
+
+* p50 / p95 / p99 rerun latency
+* throughput (reruns per second, all sessions together)
+* RSS growth over the run, after the sessions were opened
+* errors: reruns that raised, plus steps whose widget was not on the page
+
+AppTest itself only does full reruns. For a widget inside an st.fragment
+(FRAGMENT_WIDGETS) the rerun is requested the way the browser does it, by
+queueing the fragment id, so fragment pages are timed on the reruns users
+actually trigger; the "frag" column counts them.
+
+The capacity of a page is the largest N whose p95 stays within --budget-ms.
+
+    python -m benchmarks.load_test --sessions 1,4,16 --steps 30
+    python -m benchmarks.load_test --pages "CMS Cost Viewer" --json load.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import resource
+import sys
+import threading
+import time
+
+import numpy as np
+import streamlit
+from streamlit.logger import set_log_level
+from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+from streamlit.testing.v1 import AppTest, local_script_runner
+from streamlit.testing.v1.element_tree import parse_tree_from_messages
+
+from benchmarks.rerun_latency import _fragment_ids
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+
+# Page -> interaction script: (widget kind, widget label, values cycled
+# through). A session applies one step per rerun, looping over the script.
+SCRIPTS = {
+    "Overview": [
+        (None, None, None),  # no widgets; every rerun is a plain refresh
+    ],
+    "Health Profile": [
+        ("number_input", "Weight (kg)", [70, 82, 95, 64]),
+        ("slider", "How many days do you exercise per week?", [3, 5, 1, 0]),
+        ("selectbox", "Stress Level", ["Low", "Medium", "High"]),
+        ("number_input", "Age", [25, 41, 67]),
+    ],
+    "Symptom Checker": [
+        ("multiselect", "Symptoms", [["Headache"], ["Headache", "Fever"], ["Chest pain"], []]),
+        ("text_input", "Or describe them, separated by commas", ["cough", "sore throat, fever", ""]),
+    ],
+    "Insurance Eligibility": [
+        ("slider", "Coinsurance (%)", [10, 20, 30, 40]),
+        ("number_input", "Annual deductible ($)", [500, 1500, 3000]),
+        ("selectbox", "Planned Visit Type", ["Urgent Care Visit", "Specialist Visit", "Primary Care Visit"]),
+        ("number_input", "Primary care visits per year", [1, 2, 4]),
+        ("selectbox", "State (for uninsured rate)", ["TX", "FL", "CA"]),
+    ],
+    "Doctor Costs": [
+        ("selectbox", "City", ["New York", "Chicago", "Boston"]),
+        ("selectbox", "Visit Type", ["Specialist Visit", "Urgent Care Visit", "Primary Care Visit"]),
+        ("text_input", "Or enter a ZIP code", ["10001", "60601", ""]),
+    ],
+    "Medication Prices": [
+        ("text_input", "Search by name", ["a", "am", "l", ""]),
+        ("selectbox", "Medication", None),
+        ("selectbox", "Or browse by condition", ["Hypertension", "All conditions"]),
+        ("text_input", "ZIP code", ["10001", "02115", ""]),
+    ],
+    "CMS Cost Viewer": [
+        ("text_input", "Search by name or code (e.g., 99213, MRI, blood)", ["m", "mr", "mri", "blood", "99213", ""]),
+        # Paired with the searches above so every step leaves procedures to pick
+        ("selectbox", "Setting", ["Imaging", "Imaging", "All", "Lab", "Clinic", "All"]),
+        ("selectbox", "Select a procedure", None),
+    ],
+}
+
+# Widgets of sections a page hides when their optional data files are absent
+# (the pharmacy search needs data/pharmacies.csv and pharmacy_prices.csv);
+# their steps are skipped there instead of counted as errors
+OPTIONAL_WIDGETS = {("Medication Prices", "ZIP code")}
+
+# (page, widget label) -> the st.fragment function the widget lives in
+FRAGMENT_WIDGETS = {
+    ("Insurance Eligibility", "Coinsurance (%)"): "visit_cost_section",
+    ("Insurance Eligibility", "Annual deductible ($)"): "visit_cost_section",
+    ("Insurance Eligibility", "Planned Visit Type"): "profile_section",
+    ("Insurance Eligibility", "Primary care visits per year"): "annual_spend_section",
+    ("Insurance Eligibility", "State (for uninsured rate)"): "profile_section",
+}
+
+# The session whose AppTest.run() the current thread is in, and the
+# fragment id that run should be limited to
+_rerun_scope = threading.local()
+
+
+def _scoped_rerun_data(**kwargs):
+    fragment_id = getattr(_rerun_scope, "fragment_id", None)
+    if fragment_id is not None:
+        kwargs["fragment_id_queue"] = [fragment_id]
+    return RerunData(**kwargs)
+
+
+def _scoped_tree(messages):
+    # A fragment run only sends the fragment's elements; lay them over the
+    # session's last page like the browser does, so widgets in the other
+    # sections can still be found and their values are sent with the next run
+    session = getattr(_rerun_scope, "session", None)
+    if session is None:
+        return parse_tree_from_messages(messages)
+    deltas = {tuple(m.metadata.delta_path): m for m in messages if m.HasField("delta")}
+    if getattr(_rerun_scope, "fragment_id", None) is None:
+        session.deltas = deltas
+    else:
+        session.deltas.update(deltas)
+    return parse_tree_from_messages(list(session.deltas.values()))
+
+
+# local_script_runner names replaced by fragment_reruns()
+_PATCHED = {"RerunData": _scoped_rerun_data, "parse_tree_from_messages": _scoped_tree}
+
+
+@contextlib.contextmanager
+def fragment_reruns():
+    """
+    Within the block, AppTest runs follow the calling thread's _rerun_scope.
+
+    AppTest.run builds its RerunData and parses the output in the calling
+    thread, so a thread-local scope lets concurrent sessions rerun
+    different fragments. The patched names are restored on exit.
+    """
+    missing = [name for name in _PATCHED if not hasattr(local_script_runner, name)]
+    if missing or "fragment_id_queue" not in RerunData.__dataclass_fields__:
+        raise RuntimeError(
+            f"streamlit {streamlit.__version__} no longer runs AppTest through "
+            f"local_script_runner.{' / '.join(_PATCHED)} with a fragment_id_queue; "
+            "update the load test's fragment rerun hooks")
+    saved = {name: getattr(local_script_runner, name) for name in _PATCHED}
+    for name, value in _PATCHED.items():
+        setattr(local_script_runner, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(local_script_runner, name, value)
+
+
+def _rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        # Peak rather than current outside Linux; still shows growth
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20
+
+
+def _widget(at, kind, label):
+    return next((w for w in getattr(at, kind) if w.label == label), None)
+
+
+class Session:
+    """
+    One simulated user: an AppTest with its own session state, on one page.
+    Create and drive sessions inside fragment_reruns().
+    """
+
+    def __init__(self, page, offset=0):
+        self.page = page
+        self.step = offset  # sessions start at different points of the script
+        self.latencies = []
+        self.errors = 0
+        self.fragment_reruns = 0
+        self.missing = set()
+        self.deltas = {}
+        self.at = AppTest.from_file(APP, default_timeout=120)
+        _rerun_scope.session = self
+        try:
+            self.at.run()
+            self.at.sidebar.radio[0].set_value(page).run()
+        finally:
+            _rerun_scope.session = None
+        self.fragments = _fragment_ids(self.at)
+
+    def interact(self):
+        script = SCRIPTS[self.page]
+        kind, label, values = script[self.step % len(script)]
+        cycle = self.step // len(script)
+        self.step += 1
+
+        widget = _widget(self.at, kind, label) if kind else None
+        if kind and widget is None and (self.page, label) in OPTIONAL_WIDGETS:
+            return
+        if kind and widget is None:
+            # The script no longer matches the page; timing a plain rerun
+            # instead would hide that
+            self.errors += 1
+            self.missing.add(label)
+            return
+        if widget is not None and values is None:
+            # Pick among the widget's current options, e.g. whatever
+            # procedures or medications the last search left
+            if widget.options:
+                widget.select_index(cycle % min(len(widget.options), 5))
+        elif widget is not None:
+            widget.set_value(values[cycle % len(values)])
+
+        fragment_id = self.fragments.get(FRAGMENT_WIDGETS.get((self.page, label)))
+        _rerun_scope.session, _rerun_scope.fragment_id = self, fragment_id
+        try:
+            start = time.perf_counter()
+            self.at.run()
+            self.latencies.append(time.perf_counter() - start)
+        finally:
+            _rerun_scope.session = _rerun_scope.fragment_id = None
+        self.fragment_reruns += fragment_id is not None
+        if self.at.exception:
+            self.errors += 1
+
+
+def run_page(page, sessions, steps):
+    """
+    Latency samples (seconds), wall time, error count and RSS growth for
+    `sessions` concurrent sessions each doing `steps` interactions.
+    """
+    users = [Session(page, offset=i) for i in range(sessions)]
+    rss_before = _rss_mb()
+    start_barrier = threading.Barrier(sessions + 1)
+
+    def drive(user):
+        start_barrier.wait()
+        for _ in range(steps):
+            user.interact()
+
+    threads = [threading.Thread(target=drive, args=(user,)) for user in users]
+    for thread in threads:
+        thread.start()
+    start_barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    latencies = np.array([s for user in users for s in user.latencies])
+    # Every step can miss its widget when the script no longer fits the page
+    pct = lambda q: float(np.percentile(latencies, q) * 1e3) if latencies.size else float("nan")
+    return {
+        "sessions": sessions,
+        "reruns": int(latencies.size),
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+        "reruns_per_s": latencies.size / wall,
+        "rss_growth_mb": _rss_mb() - rss_before,
+        "fragment_reruns": sum(user.fragment_reruns for user in users),
+        "errors": sum(user.errors for user in users),
+        "missing_widgets": sorted(set().union(*(user.missing for user in users))),
+    }
+
+
+def capacity(rows, budget_ms):
+    """
+    Largest session count whose p95 stayed within budget_ms (0 if none).
+    """
+    within = [row["sessions"] for row in rows if row["p95_ms"] <= budget_ms and not row["errors"]]
+    return max(within, default=0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test every page with concurrent headless sessions.")
+    parser.add_argument("--pages", nargs="*", default=list(SCRIPTS), help="pages to test (default all)")
+    parser.add_argument("--sessions", default="1,4,16", help="comma-separated concurrent session counts")
+    parser.add_argument("--steps", type=int, default=20, help="interactions per session")
+    parser.add_argument("--budget-ms", type=float, default=1000.0,
+                        help="p95 rerun latency a page must stay within to count as capacity")
+    parser.add_argument("--json", default=None, help="write results to this file")
+    args = parser.parse_args(argv)
+    set_log_level("error")
+
+    unknown = [page for page in args.pages if page not in SCRIPTS]
+    if unknown:
+        parser.error(f"unknown pages: {', '.join(unknown)}")
+    counts = [int(n) for n in args.sessions.split(",")]
+
+    results = {}
+    with fragment_reruns():
+        # Warm the process-wide caches once so the first count is not charged
+        # for loading every dataset
+        for page in args.pages:
+            Session(page)
+
+        print(f"{'page':24s} {'N':>4s} {'p50':>9s} {'p95':>9s} {'p99':>9s} {'reruns/s':>9s} "
+              f"{'RSS +MB':>8s} {'frag':>6s} {'errors':>6s}")
+        for page in args.pages:
+            rows = []
+            for n in counts:
+                row = run_page(page, n, args.steps)
+                rows.append(row)
+                print(f"{page:24s} {n:4d} {row['p50_ms']:7.1f}ms {row['p95_ms']:7.1f}ms "
+                      f"{row['p99_ms']:7.1f}ms {row['reruns_per_s']:9.1f} {row['rss_growth_mb']:8.1f} "
+                      f"{row['fragment_reruns']:6d} {row['errors']:6d}")
+                if row["missing_widgets"]:
+                    print(f"  widgets not found: {', '.join(row['missing_widgets'])}")
+            results[page] = {"runs": rows, "capacity": capacity(rows, args.budget_ms)}
+
+    print(f"\nCapacity (concurrent sessions with p95 <= {args.budget_ms:.0f} ms, of {args.sessions}):")
+    for page, result in results.items():
+        print(f"  {page:24s} {result['capacity']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"budget_ms": args.budget_ms, "steps": args.steps, "pages": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Per-rerun render payload: how many elements each page sends and how big
+they are.
+
+Every element in a rerun reaches the browser as one delta message, so the
+element count is the number of deltas and the serialized element protos are
+(within a few bytes of framing per message) what goes over the websocket.
+
+    python -m benchmarks.render_payload
+    python -m benchmarks.render_payload --json out.json --compare before.json
+"""
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+PAGES = [
+    "Overview",
+    "Health Profile",
+    "Symptom Checker",
+    "Insurance Eligibility",
+    "Doctor Costs",
+    "Medication Prices",
+    "CMS Cost Viewer",
+]
+
+
+def _walk(node):
+    for child in getattr(node, "children", {}).values():
+        yield child
+        yield from _walk(child)
+
+
+def measure(page):
+    """
+    Render one page and count its main-area elements and their bytes.
+    """
+    at = AppTest.from_file(APP, default_timeout=120)
+    at.run()
+    at.sidebar.radio[0].set_value(page).run()
+    if at.exception:
+        raise RuntimeError(f"{page}: {at.exception[0].message}")
+
+    kinds = Counter()
+    total_bytes = 0
+    markdown_bytes = 0
+    for node in _walk(at.main):
+        proto = getattr(node, "proto", None)
+        if proto is None or not hasattr(proto, "ByteSize"):
+            continue
+        size = proto.ByteSize()
+        kinds[type(node).__name__] += 1
+        total_bytes += size
+        if type(node).__name__ == "Markdown":
+            markdown_bytes += size
+    return {
+        "page": page,
+        "elements": sum(kinds.values()),
+        "markdown_elements": kinds["Markdown"],
+        "bytes": total_bytes,
+        "markdown_bytes": markdown_bytes,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure per-rerun element counts and bytes per page.")
+    parser.add_argument("pages", nargs="*", default=PAGES)
+    parser.add_argument("--json", default=None, help="write results to this file")
+    parser.add_argument("--compare", default=None, help="earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    from streamlit.logger import set_log_level
+    set_log_level("error")
+
+    results = [measure(page) for page in args.pages]
+    base = {}
+    if args.compare:
+        with open(args.compare) as f:
+            base = {r["page"]: r for r in json.load(f)}
+
+    print(f"{'page':24s} {'elements':>9s} {'markdown':>9s} {'bytes':>9s} {'md bytes':>9s}")
+    for r in results:
+        line = (f"{r['page']:24s} {r['elements']:9d} {r['markdown_elements']:9d} "
+                f"{r['bytes']:9d} {r['markdown_bytes']:9d}")
+        b = base.get(r["page"])
+        if b:
+            line += (f"   was {b['elements']} elements / {b['bytes']} bytes"
+                     f" ({r['elements'] - b['elements']:+d}, {r['bytes'] - b['bytes']:+d})")
+        print(line)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
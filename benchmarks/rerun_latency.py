@@ -0,0 +1,102 @@
+"""
+Rerun latency of widget changes on the Insurance Eligibility page.
+
+Each interaction is timed two ways with AppTest: as a full-script rerun
+(what every widget change cost before the page was split into fragments)
+and as the fragment-scoped rerun the live app performs for a widget inside
+an st.fragment. AppTest itself only does full reruns, so the fragment run
+is requested the way the browser does it, by queueing the fragment id.
+
+    python -m benchmarks.rerun_latency --repeat 20
+"""
+import argparse
+import functools
+import os
+import statistics
+import sys
+import time
+
+from streamlit.logger import set_log_level
+from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+from streamlit.testing.v1 import AppTest, local_script_runner
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+PAGE = "Insurance Eligibility"
+
+# label, widget kind, widget label, values cycled through, owning fragment
+INTERACTIONS = [
+    ("coinsurance slider", "slider", "Coinsurance (%)", [10, 20, 30, 40], "visit_cost_section"),
+    ("deductible met", "number_input", "Deductible already met ($)", [0, 250, 500], "visit_cost_section"),
+    ("age", "number_input", "Age", [22, 35, 60], "profile_section"),
+    ("state", "selectbox", "State (for uninsured rate)", None, "profile_section"),
+    ("primary care visits", "number_input", "Primary care visits per year", [1, 2, 3, 4], "annual_spend_section"),
+]
+
+
+def _widget(at, kind, label):
+    return next(w for w in getattr(at, kind) if w.label == label)
+
+
+def _fragment_ids(at):
+    """
+    Map fragment function name -> fragment id from the AppTest's storage.
+    """
+    ids = {}
+    for fragment_id, wrapped in at._fragment_storage._fragments.items():
+        for cell in wrapped.__closure__ or ():
+            name = getattr(cell.cell_contents, "__name__", "")
+            if name.endswith("_section"):
+                ids[name] = fragment_id
+    return ids
+
+
+def _fresh_app():
+    at = AppTest.from_file(APP, default_timeout=120)
+    at.run()
+    at.sidebar.radio[0].set_value(PAGE).run()
+    return at
+
+
+def _time_runs(at, kind, label, values, repeat, fragment_id=None):
+    if values is None:
+        values = list(_widget(at, kind, label).options)
+
+    original = local_script_runner.RerunData
+    if fragment_id is not None:
+        local_script_runner.RerunData = functools.partial(RerunData, fragment_id_queue=[fragment_id])
+    try:
+        samples = []
+        for i in range(repeat + 1):
+            _widget(at, kind, label).set_value(values[i % len(values)])
+            t0 = time.perf_counter()
+            at.run()
+            if i:  # first run warms caches for this widget
+                samples.append(time.perf_counter() - t0)
+            if at.exception:
+                raise RuntimeError(at.exception[0].message)
+    finally:
+        local_script_runner.RerunData = original
+    return statistics.median(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time full vs fragment reruns on the insurance page.")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+    set_log_level("error")
+
+    print(f"{'interaction':24s} {'full rerun':>12s} {'fragment':>12s} {'fragment fn':>24s}")
+    for name, kind, label, values, fragment in INTERACTIONS:
+        full = _time_runs(_fresh_app(), kind, label, values, args.repeat)
+
+        at = _fresh_app()
+        fragment_id = _fragment_ids(at)[fragment]
+        partial = _time_runs(at, kind, label, values, args.repeat, fragment_id)
+
+        print(f"{name:24s} {full * 1e3:10.1f}ms {partial * 1e3:10.1f}ms {fragment:>24s}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
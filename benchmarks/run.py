@@ -0,0 +1,599 @@
+"""
+Benchmark suite for the dataset loaders, filters and cost engines.
+
+Each case runs at several synthetic data sizes in a scratch directory laid
+out like the repo (data/...), so the loaders read exactly the files they
+read in production. Results are written as JSON and can be compared with an
+earlier run:
+
+    python -m benchmarks.run                         # all cases, default sizes
+    python -m benchmarks.run --sizes 1000,100000 -k cms
+    python -m benchmarks.run --compare benchmarks/results/<earlier>.json
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from streamlit.logger import set_log_level
+
+from benchmarks import synthetic
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+
+CASES = {}
+
+
+def case(name, max_size=None):
+    """
+    Register a benchmark. The decorated function gets (size, workdir) and
+    returns (fn, items): fn is timed, items is the work done per call.
+    """
+    def register(setup):
+        CASES[name] = (setup, max_size)
+        return setup
+    return register
+
+
+@contextlib.contextmanager
+def working_dir(path):
+    old = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(old)
+
+
+# -----------------------------
+# Loaders
+# -----------------------------
+@case("cms.load_cold")
+def cms_load_cold(size, workdir):
+    from hanvion_pages.cms_costs import load_cms_data
+    from hanvion_pages.datastore import CMS_STORE
+    from hanvion_pages.shared_data import shared_dir
+
+    synthetic.write_cms_csv(os.path.join(synthetic.data_dir(workdir), "cms_procedures.csv"), size)
+
+    def run():
+        if os.path.exists(CMS_STORE):
+            os.remove(CMS_STORE)
+        shutil.rmtree(shared_dir(), ignore_errors=True)
+        load_cms_data.clear()
+        load_cms_data()
+    return run, size
+
+
+@case("cms.load_warm")
+def cms_load_warm(size, workdir):
+    from hanvion_pages.cms_costs import load_cms_data
+
+    synthetic.write_cms_csv(os.path.join(synthetic.data_dir(workdir), "cms_procedures.csv"), size)
+    load_cms_data.clear()
+    load_cms_data()
+
+    def run():
+        load_cms_data.clear()
+        load_cms_data()
+    return run, size
+
+
+@case("state.load_xlsx", max_size=10_000)
+def state_load_xlsx(size, workdir):
+    from hanvion_pages.datastore import STATE_STORE
+    from hanvion_pages.insurance_eligibility import load_state_data
+    from hanvion_pages.shared_data import shared_dir
+
+    synthetic.write_state_xlsx(os.path.join(synthetic.data_dir(workdir), "tableA1.xlsx"), size)
+
+    def run():
+        if os.path.exists(STATE_STORE):
+            os.remove(STATE_STORE)
+        shutil.rmtree(shared_dir(), ignore_errors=True)
+        load_state_data.clear()
+        load_state_data()
+    return run, size
+
+
+@case("state.load_warm")
+def state_load_warm(size, workdir):
+    from hanvion_pages.insurance_eligibility import load_state_data
+
+    synthetic.write_state_xlsx(os.path.join(synthetic.data_dir(workdir), "tableA1.xlsx"), min(size, 10_000))
+    load_state_data.clear()
+    load_state_data()
+
+    def run():
+        load_state_data.clear()
+        load_state_data()
+    return run, size
+
+
+@case("state.lookup")
+def state_lookup(size, workdir):
+    from hanvion_pages.insurance_eligibility import load_state_data, load_state_lookup
+
+    n_states = min(size, 10_000)
+    synthetic.write_state_xlsx(os.path.join(synthetic.data_dir(workdir), "tableA1.xlsx"), n_states)
+    load_state_data.clear()
+    load_state_lookup.clear()
+    states = load_state_lookup()
+    keys = [f"S{i % n_states:05d}" for i in range(size)]
+
+    def run():
+        for key in keys:
+            states.get(key)
+    return run, size
+
+
+@case("cache.hit")
+def cache_hit(size, workdir):
+    from hanvion_pages.cms_costs import load_cms_data
+
+    synthetic.write_cms_csv(os.path.join(synthetic.data_dir(workdir), "cms_procedures.csv"), size)
+    load_cms_data.clear()
+    load_cms_data()
+
+    def run():
+        for _ in range(100):
+            load_cms_data()
+    return run, 100
+
+
+# -----------------------------
+# CMS search / filter
+# -----------------------------
+SEARCHES = [("office", "All"), ("0001", "All"), ("mri brain", "Imaging"), ("term12", "Clinic")]
+
+
+@case("cms.search_index_build")
+def cms_index_build(size, workdir):
+    from hanvion_pages.cms_costs import load_cms_data
+    from hanvion_pages.cms_search import ProcedureSearchIndex
+
+    synthetic.write_cms_csv(os.path.join(synthetic.data_dir(workdir), "cms_procedures.csv"), size)
+    load_cms_data.clear()
+    df = load_cms_data()
+
+    def run():
+        ProcedureSearchIndex.build(df["code"], df["description"])
+    return run, size
+
+
+@case("shared.attach")
+def shared_attach(size, workdir):
+    """
+    What a new server process pays once another has published the data.
+    """
+    from hanvion_pages.cms_costs import load_cms_data, load_cms_search_index
+
+    synthetic.write_cms_csv(os.path.join(synthetic.data_dir(workdir), "cms_procedures.csv"), size)
+    load_cms_data()
+    load_cms_search_index()
+
+    def run():
+        load_cms_data.clear()
+        load_cms_search_index.clear()
+        load_cms_data()
+        load_cms_search_index()
+    return run, size
+
+
+@case("cms.filter")
+def cms_filter(size, workdir):
+    from hanvion_pages.cms_costs import filter_procedures, load_cms_data, load_cms_search_index
+
+    synthetic.write_cms_csv(os.path.join(synthetic.data_dir(workdir), "cms_procedures.csv"), size)
+    load_cms_data.clear()
+    load_cms_search_index.clear()
+    df = load_cms_data()
+    load_cms_search_index()
+
+    def run():
+        for text, setting in SEARCHES:
+            filter_procedures(df, text, setting)
+    return run, len(SEARCHES)
+
+
+# -----------------------------
+# Price sketches
+# -----------------------------
+@case("sketch.build")
+def sketch_build(size, workdir):
+    from hanvion_pages.sketches import TDigest
+
+    rates = np.random.default_rng(0).lognormal(5, 0.8, size)
+
+    def run():
+        digest = TDigest()
+        for chunk in np.array_split(rates, max(size // 4096, 1)):
+            digest.extend(chunk)
+    return run, size
+
+
+@case("sketch.merge_quantile")
+def sketch_merge_quantile(size, workdir):
+    from hanvion_pages.sketches import TDigest
+
+    rng = np.random.default_rng(0)
+    parts = []
+    for chunk in np.array_split(rng.lognormal(5, 0.8, size), 16):
+        digest = TDigest()
+        digest.extend(chunk)
+        parts.append(digest)
+    qs = np.array([0.10, 0.25, 0.50, 0.75, 0.90])
+
+    def run():
+        merged = TDigest()
+        for part in parts:
+            merged.merge(part)
+        merged.quantile(qs)
+    return run, len(parts)
+
+
+# -----------------------------
+# Cost engines
+# -----------------------------
+@case("visit_payment.scalar", max_size=100_000)
+def visit_payment_scalar(size, workdir):
+    from hanvion_pages.insurance_eligibility import simulate_visit_payment
+
+    c = synthetic.claims(size)
+    rows = list(zip(c["visit_type"].tolist(), c["in_network"].tolist(), c["has_insurance"].tolist(),
+                    c["deductible"].tolist(), c["deductible_met"].tolist(), c["oop_max"].tolist(),
+                    c["coinsurance_pct"].tolist(), c["copay"].tolist()))
+
+    def run():
+        for row in rows:
+            simulate_visit_payment(*row)
+    return run, size
+
+
+@case("visit_payment.batch")
+def visit_payment_batch(size, workdir):
+    from hanvion_pages.claims import simulate_visit_payment_batch
+
+    c = synthetic.claims(size)
+
+    def run():
+        simulate_visit_payment_batch(
+            c["visit_type"], c["in_network"], c["deductible"], c["deductible_met"],
+            c["oop_max"], c["coinsurance_pct"], c["copay"], has_insurance=c["has_insurance"],
+        )
+    return run, size
+
+
+@case("annual_spend.heuristic", max_size=100_000)
+def annual_spend_heuristic(size, workdir):
+    from hanvion_pages.insurance_eligibility import estimate_annual_spend
+
+    rng = np.random.default_rng(0)
+    profiles = rng.integers(0, 6, (size, 4)).tolist()
+
+    def run():
+        for pc, uc, er, meds in profiles:
+            estimate_annual_spend(pc, uc, er, meds, True)
+    return run, size
+
+
+@case("annual_spend.simulate", max_size=100_000)
+def annual_spend_simulate(size, workdir):
+    from hanvion_pages.claims import simulate_annual_spend
+
+    def run():
+        simulate_annual_spend(2, 1, 0, 1, True, n_years=size)
+    return run, size
+
+
+@case("plan_sweep.grid", max_size=100_000)
+def plan_sweep_grid(size, workdir):
+    from hanvion_pages.claims import plan_grid, sample_claim_years, sweep_plans
+
+    plans = plan_grid()
+    plans["premium"] = 0.0
+    sim = sample_claim_years({"Primary Care Visit": 2, "Urgent Care Visit": 1}, 1, size)
+
+    def run():
+        sweep_plans(sim, plans)
+    return run, len(plans)
+
+
+# -----------------------------
+# Population scoring
+# -----------------------------
+@case("likelihood.scalar", max_size=100_000)
+def likelihood_scalar(size, workdir):
+    from hanvion_pages.insurance_eligibility import insurance_likelihood
+    from hanvion_pages.population import uninsured_lookup
+
+    synthetic.write_state_xlsx(os.path.join(synthetic.data_dir(workdir), "tableA1.xlsx"), 50)
+    lookup = uninsured_lookup()
+    states = lookup.to_dict()
+    df = synthetic.roster(size, list(lookup.index) + ["ZZ"])
+    rows = list(zip(df["age"].tolist(), df["sex"].tolist(), df["state"].tolist()))
+
+    def run():
+        for age, sex, state in rows:
+            row = {"uninsured_rate": states[state]} if state in states else {}
+            insurance_likelihood(age, sex, row)
+    return run, size
+
+
+@case("likelihood.roster")
+def likelihood_roster(size, workdir):
+    from hanvion_pages.population import score_roster, uninsured_lookup
+
+    synthetic.write_state_xlsx(os.path.join(synthetic.data_dir(workdir), "tableA1.xlsx"), 50)
+    lookup = uninsured_lookup()
+    synthetic.roster(size, list(lookup.index) + ["ZZ"]).to_parquet("roster.parquet")
+
+    def run():
+        score_roster("roster.parquet", "scored.parquet", ["state", "age_band"], lookup=lookup)
+    return run, size
+
+
+# -----------------------------
+# Health profile
+# -----------------------------
+@case("health.scalar", max_size=100_000)
+def health_scalar(size, workdir):
+    from hanvion_pages.health_profile import calculate_bmi, lifestyle_score, prevention_recommendations
+
+    h = synthetic.health_records(size)
+    rows = list(zip(*(h[k].tolist() for k in
+                      ("weight", "height_cm", "sleep", "activity_days", "stress", "smoking", "alcohol"))))
+
+    def run():
+        for weight, height, sleep, activity, stress, smoking, alcohol in rows:
+            _, category = calculate_bmi(weight, height)
+            score = lifestyle_score(sleep, activity, stress, smoking, alcohol)
+            prevention_recommendations(score, category)
+    return run, size
+
+
+@case("health.cohort")
+def health_cohort(size, workdir):
+    from hanvion_pages.cohort import score_cohort
+
+    df = pd.DataFrame(synthetic.health_records(size))
+
+    def run():
+        score_cohort(df)
+    return run, size
+
+
+# -----------------------------
+# Symptom engine
+# -----------------------------
+@case("symptom.match")
+def symptom_match(size, workdir):
+    from hanvion_pages.symptom_engine import SymptomEngine
+
+    engine = SymptomEngine(synthetic.symptom_records(size))
+    rng = np.random.default_rng(1)
+    queries = [[engine.symptoms[i] for i in rng.choice(size, min(size, 4), replace=False)]
+               for _ in range(100)]
+
+    def run():
+        for query in queries:
+            engine.match(query)
+    return run, len(queries)
+
+
+@case("symptom.lookup")
+def symptom_lookup(size, workdir):
+    from hanvion_pages.symptom_engine import SymptomEngine
+
+    engine = SymptomEngine(synthetic.symptom_records(size))
+    rng = np.random.default_rng(1)
+    # Drop one letter from each name to force the fuzzy path
+    queries = []
+    for i in rng.choice(size, 100):
+        name = engine.symptoms[i]
+        cut = int(rng.integers(0, len(name)))
+        queries.append(name[:cut] + name[cut + 1:])
+
+    def run():
+        for query in queries:
+            engine.lookup(query)
+    return run, len(queries)
+
+
+# -----------------------------
+# Medication search
+# -----------------------------
+@case("medications.index_build", max_size=100_000)
+def medications_index_build(size, workdir):
+    from hanvion_pages.medication_prices import MedicationPrices
+
+    df = synthetic.medication_frame(size)
+
+    def run():
+        MedicationPrices(df)
+    return run, size
+
+
+@case("medications.search", max_size=100_000)
+def medications_search(size, workdir):
+    from hanvion_pages.medication_prices import SEARCH_LIMIT, MedicationPrices
+
+    prices = MedicationPrices(synthetic.medication_frame(size))
+    queries = ["o", "office", "mri", "term", "visit1", "zz"] + [c for c in prices.conditions]
+
+    def run():
+        for q in queries:
+            prices.search(q, SEARCH_LIMIT)
+            prices.for_condition(q)
+    return run, len(queries)
+
+
+# -----------------------------
+# Pharmacy prices
+# -----------------------------
+PHARMACY_PRODUCTS = 200
+
+
+@case("pharmacy.build", max_size=100_000)
+def pharmacy_build(size, workdir):
+    from hanvion_pages.pharmacy_prices import PharmacyPrices
+
+    pharmacies = synthetic.pharmacies(size)
+    prices = synthetic.pharmacy_prices(pharmacies["pharmacy_id"], PHARMACY_PRODUCTS)
+
+    def run():
+        PharmacyPrices.build(pharmacies, prices)
+    return run, len(prices)
+
+
+@case("pharmacy.cheapest_near", max_size=100_000)
+def pharmacy_cheapest_near(size, workdir):
+    from hanvion_pages.pharmacy_prices import PharmacyPrices
+
+    pharmacies = synthetic.pharmacies(size)
+    store = PharmacyPrices.build(pharmacies, synthetic.pharmacy_prices(pharmacies["pharmacy_id"],
+                                                                      PHARMACY_PRODUCTS))
+    rng = np.random.default_rng(1)
+    queries = [(f"Drug {rng.integers(PHARMACY_PRODUCTS)}", rng.uniform(30, 45), rng.uniform(-120, -75),
+                rng.choice([5, 10, 25, 50])) for _ in range(100)]
+
+    def run():
+        for drug, lat, lon, radius in queries:
+            store.cheapest_near(drug, "10 mg", lat, lon, radius, k=10)
+    return run, len(queries)
+
+
+# -----------------------------
+# Runner
+# -----------------------------
+def time_case(name, size, repeat):
+    setup, _ = CASES[name]
+    workdir = tempfile.mkdtemp(prefix="hanvion-bench-")
+    # Published datasets live (and are removed) with the scratch directory
+    os.environ["HANVION_SHARED_DIR"] = os.path.join(workdir, "shared")
+    try:
+        with working_dir(workdir):
+            fn, items = setup(size, workdir)
+            fn()  # warm-up: imports, first-touch allocations
+            samples = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                fn()
+                samples.append(time.perf_counter() - t0)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    median = statistics.median(samples)
+    return {
+        "case": name,
+        "size": size,
+        "repeat": repeat,
+        "median_s": median,
+        "min_s": min(samples),
+        "items": items,
+        "items_per_s": items / median if median > 0 else None,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(sizes, pattern=None, repeat=3):
+    results = []
+    for name, (_, max_size) in CASES.items():
+        if pattern and pattern not in name:
+            continue
+        for size in sizes:
+            if max_size is not None and size > max_size:
+                continue
+            r = time_case(name, size, repeat)
+            results.append(r)
+            print(f"{name:28s} n={size:>9,d}  median {r['median_s'] * 1e3:10.2f} ms"
+                  f"  min {r['min_s'] * 1e3:10.2f} ms")
+    return {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """
+    Print current vs baseline medians; returns the regressed (case, size) keys.
+    """
+    base = {(r["case"], r["size"]): r for r in baseline["results"]}
+    regressions = []
+    print(f"\n{'case':28s} {'size':>9s} {'baseline':>12s} {'current':>12s} {'ratio':>7s}")
+    for r in current["results"]:
+        key = (r["case"], r["size"])
+        if key not in base:
+            continue
+        ratio = r["median_s"] / base[key]["median_s"]
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"{r['case']:28s} {r['size']:>9,d} {base[key]['median_s'] * 1e3:10.2f}ms "
+              f"{r['median_s'] * 1e3:10.2f}ms {ratio:6.2f}x{flag}")
+        if flag:
+            regressions.append(key)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="comma-separated synthetic data sizes")
+    parser.add_argument("-k", dest="pattern", default=None, help="only cases containing this text")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", default=None, help="results file (default: benchmarks/results/<time>.json)")
+    parser.add_argument("--compare", default=None, help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="current/baseline median ratio that counts as a regression")
+    args = parser.parse_args(argv)
+
+    # Loaders are st.cache_* functions running without a Streamlit runtime
+    set_log_level("error")
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    current = run_suite(sizes, args.pattern, args.repeat)
+
+    out = args.out
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        out = os.path.join(RESULTS_DIR, f"{stamp}.json")
+    with open(out, "w") as f:
+        json.dump(current, f, indent=2)
+    print(f"\nResults written to {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(current, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Cold-start benchmark for the Streamlit app.
+
+Every measurement runs in a fresh interpreter so nothing is served from
+sys.modules:
+
+* import time of streamlit itself and of each page module on top of it
+* time to first paint of the Overview page (interpreter start to the end of
+  the first script run, driven headlessly through streamlit's AppTest)
+
+Usage, from the repository root:
+
+    python -m benchmarks.startup --repeat 5 --budget-ms 3000 --json startup.json
+
+Exits with status 1 when the median first paint is over --budget-ms.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGE_MODULES = [
+    "hanvion_pages.overview",
+    "hanvion_pages.health_profile",
+    "hanvion_pages.symptom_checker",
+    "hanvion_pages.insurance_eligibility",
+    "hanvion_pages.doctor_costs",
+    "hanvion_pages.medication_prices",
+    "hanvion_pages.cms_costs",
+]
+
+HEAVY_MODULES = ["pandas", "numpy", "pyarrow", "openpyxl"]
+
+_IMPORT_SCRIPT = """
+import importlib, json, sys, time
+t0 = time.perf_counter()
+import streamlit
+t1 = time.perf_counter()
+importlib.import_module(sys.argv[1])
+t2 = time.perf_counter()
+print(json.dumps({
+    "streamlit_ms": (t1 - t0) * 1e3,
+    "module_ms": (t2 - t1) * 1e3,
+    "heavy": [m for m in %r if m in sys.modules],
+}))
+""" % HEAVY_MODULES
+
+_FIRST_PAINT_SCRIPT = """
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+t1 = time.perf_counter()
+at.run()
+t2 = time.perf_counter()
+assert not at.exception, at.exception
+print(json.dumps({
+    "first_paint_ms": (t2 - t0) * 1e3,
+    "script_run_ms": (t2 - t1) * 1e3,
+    "heavy": [m for m in %r if m in sys.modules],
+}))
+""" % HEAVY_MODULES
+
+
+def _run(script, arg):
+    out = subprocess.run(
+        [sys.executable, "-c", script, arg],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _median(samples, key):
+    return statistics.median(s[key] for s in samples)
+
+
+def measure(repeat=3):
+    results = {"imports": {}, "overview": {}}
+
+    for module in PAGE_MODULES:
+        samples = [_run(_IMPORT_SCRIPT, module) for _ in range(repeat)]
+        results["imports"][module] = {
+            "import_ms": _median(samples, "module_ms"),
+            "heavy": samples[-1]["heavy"],
+        }
+        results["streamlit_import_ms"] = _median(samples, "streamlit_ms")
+
+    samples = [_run(_FIRST_PAINT_SCRIPT, os.path.join(ROOT, "app.py")) for _ in range(repeat)]
+    results["overview"] = {
+        "first_paint_ms": _median(samples, "first_paint_ms"),
+        "script_run_ms": _median(samples, "script_run_ms"),
+        "heavy": samples[-1]["heavy"],
+    }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="fail when the median Overview first paint exceeds this")
+    parser.add_argument("--json", default=None, help="write results to this file")
+    args = parser.parse_args(argv)
+
+    results = measure(args.repeat)
+
+    print(f"streamlit import: {results['streamlit_import_ms']:8.1f} ms")
+    for module, r in results["imports"].items():
+        heavy = ", ".join(r["heavy"]) or "-"
+        print(f"{module:40s} {r['import_ms']:8.1f} ms   loads: {heavy}")
+    overview = results["overview"]
+    print(f"Overview first paint: {overview['first_paint_ms']:.1f} ms "
+          f"(script run {overview['script_run_ms']:.1f} ms, "
+          f"loads: {', '.join(overview['heavy']) or '-'})")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.budget_ms is not None and overview["first_paint_ms"] > args.budget_ms:
+        print(f"Over budget: {overview['first_paint_ms']:.1f} ms > {args.budget_ms:.1f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
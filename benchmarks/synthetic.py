@@ -0,0 +1,168 @@
+"""
+Synthetic datasets in the repo's file schemas, for benchmarks.
+"""
+import csv
+import os
+
+import numpy as np
+import pandas as pd
+
+from hanvion_pages.claims import VISIT_TYPES
+
+SETTINGS = ["Clinic", "Hospital", "Imaging", "Lab", "Emergency"]
+WORDS = [
+    "office", "visit", "established", "patient", "new", "emergency", "department",
+    "mri", "brain", "contrast", "chest", "xray", "single", "view", "metabolic",
+    "panel", "blood", "test", "draw", "electrocardiogram", "endoscopy", "biopsy",
+    "knee", "arthroscopy", "ambulance", "transport", "urine", "culture", "injection",
+    "severity", "high", "low", "moderate", "without", "with", "imaging", "lab",
+]
+
+
+def cms_frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    vocab = np.array(WORDS + [f"term{i}" for i in range(2000)])
+    words = vocab[rng.integers(0, vocab.size, (n, 5))]
+    low = rng.integers(5, 2000, n)
+    return pd.DataFrame({
+        "code": [f"{i:07d}" for i in range(n)],
+        "description": [" ".join(w) for w in words],
+        "setting": np.array(SETTINGS)[rng.integers(0, len(SETTINGS), n)],
+        "median_price": low * 2,
+        "min_price": low,
+        "max_price": low * rng.integers(3, 12, n),
+        "sample_size": rng.integers(10, 1000, n),
+    })
+
+
+def write_cms_csv(path, n, seed=0):
+    cms_frame(n, seed).to_csv(path, index=False, quoting=csv.QUOTE_MINIMAL)
+
+
+def write_state_xlsx(path, n, seed=0):
+    rng = np.random.default_rng(seed)
+    uninsured = rng.uniform(3, 20, n).round(1)
+    pd.DataFrame({
+        "state": [f"S{i:05d}" for i in range(n)],
+        "insured_rate": (100 - uninsured).round(1),
+        "uninsured_rate": uninsured,
+    }).to_excel(path, index=False)
+
+
+def roster(n, states, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "member_id": np.arange(n),
+        "age": rng.integers(0, 95, n),
+        "sex": np.array(["Female", "Male", "Other"])[rng.integers(0, 3, n)],
+        "state": np.asarray(states)[rng.integers(0, len(states), n)],
+    })
+
+
+def symptom_records(n, n_causes=None, seed=0):
+    rng = np.random.default_rng(seed)
+    vocab = np.array(WORDS + [f"term{i}" for i in range(2000)])
+    n_causes = n_causes or max(n // 2, 10)
+    records = []
+    for i in range(n):
+        words = vocab[rng.integers(0, vocab.size, (4, 2))]
+        records.append({
+            "symptom": f"{' '.join(words[0])} {i}",
+            "system": f"System {i % 20}",
+            "causes": [f"Cause {c}" for c in rng.choice(n_causes, 6, replace=False)],
+            "seek_care": bool(rng.random() < 0.2),
+            "notes": "",
+            "aliases": [f"{' '.join(w)} {i}" for w in words[1:]],
+        })
+    return records
+
+
+CONDITIONS = ["Anxiety", "Asthma", "Depression", "Diabetes", "GERD", "High Cholesterol",
+              "Hypertension", "Infection", "Inflammation", "Nerve Pain", "Thyroid"]
+
+
+def medication_frame(n, seed=0):
+    """
+    n goodrx_prices.csv rows: about n / 3 drugs with one to five strengths.
+    """
+    rng = np.random.default_rng(seed)
+    drugs = np.array([f"{WORDS[i % len(WORDS)].title()}{i} {WORDS[(i * 7) % len(WORDS)]}"
+                      for i in range(max(n // 3, 1))])
+    low = rng.integers(4, 200, n)
+    conditions = np.array(CONDITIONS)[rng.integers(0, len(CONDITIONS), (n, 2))]
+    return pd.DataFrame({
+        "drug": drugs[rng.integers(0, drugs.size, n)],
+        "strength": [f"{s} mg" for s in range(n)],
+        "cash_low": low,
+        "cash_high": low * 2,
+        "discount_low": low // 2,
+        "discount_high": low,
+        "copay": rng.choice([0, 10, 25], n),
+        "conditions": ["|".join(sorted(set(c))) for c in conditions],
+    })
+
+
+def pharmacies(n, seed=0):
+    """
+    n pharmacies over the continental US with their ZIPs and coordinates.
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "pharmacy_id": [f"P{i:07d}" for i in range(n)],
+        "name": [f"Pharmacy {i}" for i in range(n)],
+        "chain": np.array(["A", "B", "C", "D", "Independent"])[rng.integers(0, 5, n)],
+        "zip": [f"{z:05d}" for z in rng.integers(1000, 99999, n)],
+        "lat": rng.uniform(25, 49, n),
+        "lon": rng.uniform(-124, -67, n),
+    })
+
+
+def pharmacy_prices(pharmacy_ids, n_products, stocked=0.5, seed=0):
+    """
+    Cash and discount prices for about stocked * len(pharmacy_ids) * n_products items.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(pharmacy_ids)
+    pharmacy, product = np.nonzero(rng.random((n, n_products)) < stocked)
+    base = rng.uniform(5, 80, n_products)
+    cash = base[product] * rng.uniform(0.7, 1.4, product.size)
+    return pd.DataFrame({
+        "pharmacy_id": np.asarray(pharmacy_ids)[pharmacy],
+        "drug": np.array([f"Drug {i}" for i in range(n_products)])[product],
+        "strength": "10 mg",
+        "cash_price": cash.round(2),
+        "discount_price": (cash * rng.uniform(0.3, 0.9, product.size)).round(2),
+    })
+
+
+def claims(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        "visit_type": np.array(VISIT_TYPES)[rng.integers(0, len(VISIT_TYPES), n)],
+        "in_network": rng.random(n) < 0.8,
+        "has_insurance": rng.random(n) < 0.9,
+        "deductible": rng.choice([0.0, 500.0, 1500.0, 3000.0, 6000.0], n),
+        "deductible_met": rng.uniform(0, 3000, n).round(),
+        "oop_max": rng.choice([0.0, 3000.0, 5000.0, 8000.0], n),
+        "coinsurance_pct": rng.integers(0, 51, n),
+        "copay": rng.choice([0.0, 20.0, 30.0, 50.0], n),
+    }
+
+
+def health_records(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        "weight": rng.uniform(40, 150, n).round(1),
+        "height_cm": rng.uniform(145, 205, n).round(),
+        "sleep": rng.integers(3, 11, n),
+        "activity_days": rng.integers(0, 8, n),
+        "stress": np.array(["Low", "Medium", "High"])[rng.integers(0, 3, n)],
+        "smoking": np.array(["No", "Yes"])[rng.integers(0, 2, n)],
+        "alcohol": np.array(["None", "Occasional", "Frequent"])[rng.integers(0, 3, n)],
+    }
+
+
+def data_dir(root):
+    path = os.path.join(root, "data")
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,369 @@
+"""
+Headless JSON API for the Hanvion calculators.
+
+Serves the same cost, coverage and health calculations as the Streamlit
+pages without a script rerun per request. Datasets are loaded once when the
+server starts and picked up again after data_reload swaps in new files.
+
+    python -m hanvion_pages.api --port 8080
+
+Every POST endpoint takes either one JSON object or a list of objects and
+answers with one result or a list of results in the same order. Lists of
+visit payments are priced in a single vectorized pass. Endpoints whose
+dataset failed to load answer 503; NaN values come back as null.
+
+    POST /v1/visit-payment        visit_type, in_network, has_insurance, deductible,
+                                  deductible_met, oop_max, coinsurance_pct, copay
+    POST /v1/annual-spend         visits_pc, visits_uc, visits_er, meds_monthly,
+                                  has_insurance
+    POST /v1/annual-spend/simulate  the above plus in_network, deductible, oop_max,
+                                  coinsurance_pct, copay, n_years, seed
+    POST /v1/insurance-likelihood age, sex, state
+    POST /v1/bmi                  weight, height_cm
+    POST /v1/lifestyle-score      sleep, activity_days, stress, smoking, alcohol,
+                                  bmi_category (optional)
+    POST /v1/cms/search           q, setting (optional), limit (optional)
+    POST /v1/medications          drug, strength
+    GET  /v1/medications          drug -> strengths
+    GET  /v1/cache                dataset cache hits, misses, evictions and bytes
+    GET  /metrics                 OpenMetrics text (hanvion_pages.metrics)
+    GET  /healthz
+"""
+import argparse
+import json
+import logging
+import math
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+from streamlit.logger import set_log_level
+
+from hanvion_pages.claims import (
+    SIM_YEARS,
+    price_sigmas,
+    simulate_annual_spend,
+    simulate_visit_payment_batch,
+)
+from hanvion_pages.cms_costs import load_cms_data, load_cms_search_index
+from hanvion_pages.data_cache import DATA_CACHE
+from hanvion_pages.data_reload import start_watcher
+from hanvion_pages.health_profile import calculate_bmi, lifestyle_score, prevention_recommendations
+from hanvion_pages.insurance_eligibility import (
+    DEFAULT_STATE_ROW,
+    estimate_annual_spend,
+    insurance_likelihood,
+    load_state_lookup,
+)
+from hanvion_pages.medication_prices import load_medication_prices
+from hanvion_pages.metrics import CONTENT_TYPE, METRICS
+
+MAX_BODY_BYTES = 32 * 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+REQUEST_SECONDS = METRICS.histogram(
+    "hanvion_api_request_seconds", "Time to answer one API request.", ["endpoint", "status"])
+
+
+# -----------------------------
+# Preloaded datasets
+# -----------------------------
+class Datasets:
+    def __init__(self):
+        with DATA_CACHE.snapshot() as generation:
+            self.generation = generation
+            self.cms = load_cms_data()
+            self.cms_index = load_cms_search_index()
+            self.medications = load_medication_prices()
+            self.sigmas = price_sigmas(self.cms)
+            self.states = load_state_lookup()
+
+    def current(self):
+        """
+        This snapshot, or a new one if a reload has swapped data in since.
+        """
+        return self if self.generation == DATA_CACHE.generation else Datasets()
+
+
+# -----------------------------
+# Handlers: list of payloads -> list of results
+# -----------------------------
+_REQUIRED = object()
+
+
+def _column(items, name, dtype, default=_REQUIRED):
+    if default is _REQUIRED:
+        return np.array([item[name] for item in items], dtype=dtype)
+    return np.array([item.get(name, default) for item in items], dtype=dtype)
+
+
+def _flag(item, name, default):
+    """
+    item[name] as a JSON true/false; bool("false") would read as True.
+    """
+    value = item.get(name, default)
+    if not isinstance(value, bool):
+        raise TypeError(f"{name} must be true or false, got {value!r}")
+    return value
+
+
+def _flags(items, name, default):
+    return np.array([_flag(item, name, default) for item in items], dtype=bool)
+
+
+def visit_payment(data, items):
+    allowed, plan_pays, patient_pays = simulate_visit_payment_batch(
+        _column(items, "visit_type", object),
+        _flags(items, "in_network", True),
+        _column(items, "deductible", float),
+        _column(items, "deductible_met", float, 0),
+        _column(items, "oop_max", float),
+        _column(items, "coinsurance_pct", float),
+        _column(items, "copay", float, 0),
+        has_insurance=_flags(items, "has_insurance", True),
+    )
+    return [
+        {"allowed": a, "plan_pays": p, "patient_pays": q}
+        for a, p, q in zip(allowed.tolist(), plan_pays.tolist(), patient_pays.tolist())
+    ]
+
+
+def annual_spend(data, items):
+    results = []
+    for item in items:
+        self_pay, with_ins = estimate_annual_spend(
+            item.get("visits_pc", 0), item.get("visits_uc", 0), item.get("visits_er", 0),
+            item.get("meds_monthly", 0), _flag(item, "has_insurance", True),
+        )
+        results.append({"self_pay": self_pay, "with_insurance": with_ins})
+    return results
+
+
+def annual_spend_simulate(data, items):
+    return [
+        simulate_annual_spend(
+            item.get("visits_pc", 0), item.get("visits_uc", 0), item.get("visits_er", 0),
+            item.get("meds_monthly", 0), _flag(item, "has_insurance", True),
+            _flag(item, "in_network", True),
+            float(item.get("deductible", 1500)), float(item.get("oop_max", 5000)),
+            int(item.get("coinsurance_pct", 20)), float(item.get("copay", 30)),
+            n_years=min(int(item["n_years"]), SIM_YEARS) if "n_years" in item else None,
+            seed=int(item.get("seed", 0)),
+            sigmas=data.sigmas,
+        )
+        for item in items
+    ]
+
+
+def coverage_likelihood(data, items):
+    results = []
+    for item in items:
+        state_row = data.states.get(item.get("state"), DEFAULT_STATE_ROW)
+        results.append({"likelihood": insurance_likelihood(item["age"], item["sex"], state_row)})
+    return results
+
+
+def bmi(data, items):
+    results = []
+    for item in items:
+        value, category = calculate_bmi(item["weight"], item["height_cm"])
+        results.append({"bmi": value, "category": category})
+    return results
+
+
+def lifestyle(data, items):
+    results = []
+    for item in items:
+        score = lifestyle_score(item["sleep"], item["activity_days"], item["stress"],
+                                item["smoking"], item["alcohol"])
+        recs = prevention_recommendations(score, item.get("bmi_category", "Normal"))
+        results.append({"score": score, "recommendations": recs})
+    return results
+
+
+def cms_search(data, items):
+    show_cols = ["code", "description", "setting", "median_price", "min_price",
+                 "max_price", "sample_size", "variation_ratio"]
+    results = []
+    for item in items:
+        limit = min(int(item.get("limit", 20)), 1000)
+        ids = data.cms_index.search(item.get("q", ""))
+        rows = data.cms.iloc[ids]
+        if item.get("setting"):
+            rows = rows[rows["setting"] == item["setting"]]
+        results.append({"matches": len(rows), "rows": rows[show_cols].head(limit).to_dict("records")})
+    return results
+
+
+def medication(data, items):
+    results = []
+    for item in items:
+        record = data.medications.lookup(item["drug"], item["strength"])
+        if record is None:
+            raise KeyError(f"unknown medication: {item['drug']} {item['strength']}")
+        results.append(record)
+    return results
+
+
+ROUTES = {
+    "/v1/visit-payment": visit_payment,
+    "/v1/annual-spend": annual_spend,
+    "/v1/annual-spend/simulate": annual_spend_simulate,
+    "/v1/insurance-likelihood": coverage_likelihood,
+    "/v1/bmi": bmi,
+    "/v1/lifestyle-score": lifestyle,
+    "/v1/cms/search": cms_search,
+    "/v1/medications": medication,
+}
+
+# Datasets a route cannot answer without; None when the dataset failed to load
+REQUIRES = {
+    "/v1/cms/search": ("cms", "cms_index"),
+    "/v1/medications": ("medications",),
+}
+
+
+def unavailable(data, path):
+    """
+    Names of the datasets path needs that are not loaded.
+    """
+    return [name for name in REQUIRES.get(path, ()) if getattr(data, name) is None]
+
+
+def dispatch(data, path, body):
+    """
+    Run one request body through its handler; returns (status, payload).
+    """
+    handler = ROUTES.get(path)
+    if handler is None:
+        return 404, {"error": f"unknown endpoint {path}"}
+
+    batched = isinstance(body, list)
+    items = body if batched else [body]
+    if not all(isinstance(item, dict) for item in items):
+        return 400, {"error": "body must be an object or a list of objects"}
+
+    start = time.perf_counter()
+    missing = unavailable(data, path)
+    if missing:
+        REQUEST_SECONDS.observe(time.perf_counter() - start, path, "503")
+        return 503, {"error": f"dataset not loaded: {', '.join(missing)}"}
+    try:
+        results = handler(data, items) if items else []
+    except (KeyError, TypeError, ValueError) as e:
+        REQUEST_SECONDS.observe(time.perf_counter() - start, path, "400")
+        return 400, {"error": f"{type(e).__name__}: {e}"}
+    except Exception as e:
+        logger.exception("Request to %s failed", path)
+        REQUEST_SECONDS.observe(time.perf_counter() - start, path, "500")
+        return 500, {"error": f"internal error: {type(e).__name__}"}
+    REQUEST_SECONDS.observe(time.perf_counter() - start, path, "200")
+    return 200, results if batched else results[0]
+
+
+# -----------------------------
+# HTTP server
+# -----------------------------
+def _json_default(obj):
+    if hasattr(obj, "item"):
+        return obj.item()
+    return str(obj)
+
+
+def _finite(obj):
+    """
+    obj with NaN and infinite floats replaced by None, which JSON can carry.
+    """
+    if isinstance(obj, dict):
+        return {k: _finite(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(v) for v in obj]
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float) and not math.isfinite(obj):
+        return None
+    return obj
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    data = None
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status, payload, content_type="application/json"):
+        if isinstance(payload, str):
+            body = payload.encode()
+        else:
+            body = json.dumps(_finite(payload), default=_json_default, allow_nan=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _data(self):
+        data = self.data.current()
+        if data is not self.data:
+            type(self).data = data
+        return data
+
+    def do_GET(self):
+        if self.path == "/healthz":
+            self._send(200, {"status": "ok"})
+        elif self.path == "/v1/cache":
+            self._send(200, DATA_CACHE.stats())
+        elif self.path == "/metrics":
+            self._send(200, METRICS.render(), CONTENT_TYPE)
+        elif self.path == "/v1/medications":
+            data = self._data()
+            if data.medications is None:
+                self._send(503, {"error": "dataset not loaded: medications"})
+            else:
+                self._send(200, data.medications.strengths)
+        else:
+            self._send(404, {"error": f"unknown endpoint {self.path}"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self._send(413, {"error": "request body too large"})
+            return
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError as e:
+            self._send(400, {"error": f"invalid JSON: {e}"})
+            return
+        self._send(*dispatch(self._data(), self.path, body))
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host="127.0.0.1", port=8080, data=None):
+    handler = type("BoundApiHandler", (ApiHandler,), {"data": data or Datasets()})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the Hanvion calculators over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args(argv)
+
+    # Result caches are st.cache_data functions; outside a Streamlit runtime
+    # they fall back to in-process caches and warn about it on every call.
+    set_log_level("error")
+
+    server = make_server(args.host, args.port)
+    start_watcher()
+    print(f"Hanvion API listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Chunked readers, writers and a process-pool map for large row files.
+
+Rosters and claim files can be far larger than memory. They are read as a
+stream of pandas chunks (CSV or Parquet, picked by extension), each chunk
+is processed on its own, in-process or across a pool, and results are
+written out in input order as they complete.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+CHUNK_ROWS = 1_000_000
+
+
+def _is_parquet(path):
+    return path.endswith((".parquet", ".pq"))
+
+
+def iter_chunks(path, chunk_rows=CHUNK_ROWS, columns=None):
+    """
+    Stream a CSV or Parquet file as pandas DataFrames of about chunk_rows rows.
+    """
+    if _is_parquet(path):
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns)
+    else:
+        convert = pa_csv.ConvertOptions(include_columns=columns) if columns else None
+        # ~64 bytes a row is a fair guess for roster-like files
+        read = pa_csv.ReadOptions(block_size=max(chunk_rows * 64, 1 << 20))
+        batches = pa_csv.open_csv(path, read_options=read, convert_options=convert)
+
+    pending = []
+    rows = 0
+    for batch in batches:
+        pending.append(batch)
+        rows += batch.num_rows
+        if rows >= chunk_rows:
+            yield pa.Table.from_batches(pending).to_pandas()
+            pending, rows = [], 0
+    if pending:
+        yield pa.Table.from_batches(pending).to_pandas()
+
+
+class ChunkWriter:
+    """
+    Append DataFrames to a CSV or Parquet file.
+
+    The file is written under a temporary name and moved into place on
+    close, so a failed run never leaves a truncated output behind.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = f"{path}.{os.getpid()}.tmp"
+        self.writer = None
+        self.rows = 0
+
+    def write(self, df):
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self.writer is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            if _is_parquet(self.path):
+                self.writer = pq.ParquetWriter(self.tmp_path, table.schema)
+            else:
+                self.writer = pa_csv.CSVWriter(self.tmp_path, table.schema)
+        self.writer.write_table(table)
+        self.rows += table.num_rows
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        if self.writer is not None:
+            self.writer.close()
+            os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def map_chunks(fn, chunks, workers=None, *args):
+    """
+    Yield fn(chunk, *args) for every chunk, in input order.
+
+    With workers > 1 chunks go to a process pool; at most two chunks per
+    worker are in flight, so memory stays bounded however long the input
+    is. fn must be a module-level function.
+    """
+    if not workers or workers <= 1:
+        for chunk in chunks:
+            yield fn(chunk, *args)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append(pool.submit(fn, chunk, *args))
+            if len(in_flight) >= 2 * workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
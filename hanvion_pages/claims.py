@@ -0,0 +1,498 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from hanvion_pages.metrics import timed
+
+# -----------------------------
+# Visit types
+# -----------------------------
+BASE_VISIT_COSTS = {
+    "Primary Care Visit": 140,
+    "Urgent Care Visit": 220,
+    "Specialist Visit": 260,
+    "Telehealth Visit": 80,
+    "Emergency Room Visit": 1800,
+}
+
+VISIT_TYPES = list(BASE_VISIT_COSTS.keys())
+DEFAULT_BILLED = 150
+
+# Code -1 (unknown visit type) wraps around to the default charge
+_BILLED_BY_CODE = np.array(
+    [BASE_VISIT_COSTS[v] for v in VISIT_TYPES] + [DEFAULT_BILLED], dtype=np.float64
+)
+_VISIT_TYPE_INDEX = pd.Index(VISIT_TYPES)
+
+
+def visit_type_codes(visit_type):
+    """
+    Integer codes into VISIT_TYPES; unknown names become -1.
+
+    Integer input is assumed to be codes already and passed through.
+    """
+    values = np.asarray(visit_type)
+    if values.dtype.kind in "iu":
+        return values
+    return _VISIT_TYPE_INDEX.get_indexer(values.ravel()).reshape(values.shape)
+
+
+def billed_amounts(visit_type):
+    return _BILLED_BY_CODE[visit_type_codes(visit_type)]
+
+
+# -----------------------------
+# Batch adjudication
+# -----------------------------
+def adjudicate(billed, in_network, has_insurance, deductible, deductible_met,
+               oop_max, coinsurance_pct, copay):
+    """
+    Array form of simulate_visit_payment on billed amounts.
+
+    All arguments broadcast against each other, so a single plan can be
+    applied to many claims or many plans to one claim. Returns
+    (allowed, plan_pays, patient_pays) as float64 arrays and matches the
+    scalar function exactly, branch for branch.
+    """
+    billed = np.asarray(billed, dtype=np.float64)
+    in_network = np.asarray(in_network, dtype=bool)
+    has_insurance = np.asarray(has_insurance, dtype=bool)
+    copay = np.asarray(copay, dtype=np.float64)
+    oop_max = np.asarray(oop_max, dtype=np.float64)
+
+    allowed = np.where(in_network, billed * 0.6, billed * 1.0)
+    remaining_ded = np.maximum(np.asarray(deductible, dtype=np.float64)
+                               - np.asarray(deductible_met, dtype=np.float64), 0)
+    coinsurance = np.asarray(coinsurance_pct, dtype=np.float64) / 100.0
+
+    in_deductible = remaining_ded > 0
+    after_ded = allowed - remaining_ded
+
+    patient_pays = np.where(
+        in_deductible,
+        np.where(allowed <= remaining_ded, allowed, remaining_ded + after_ded * coinsurance),
+        np.where(copay > 0, np.minimum(copay, allowed), allowed * coinsurance),
+    )
+    plan_pays = np.where(
+        in_deductible,
+        np.where(allowed <= remaining_ded, 0.0, after_ded * (1 - coinsurance)),
+        np.where(copay > 0, np.maximum(allowed - copay, 0), allowed * (1 - coinsurance)),
+    )
+
+    # Apply OOP maximum cap (simplified per visit)
+    patient_pays = np.where((oop_max > 0) & (patient_pays > oop_max), oop_max, patient_pays)
+
+    # Cash pay
+    allowed = np.where(has_insurance, allowed, billed)
+    plan_pays = np.where(has_insurance, plan_pays, 0.0)
+    patient_pays = np.where(has_insurance, patient_pays, billed)
+
+    return allowed, plan_pays, patient_pays
+
+
+@timed("simulate_visit_payment_batch")
+def simulate_visit_payment_batch(visit_type,
+                                 in_network,
+                                 deductible,
+                                 deductible_met,
+                                 oop_max,
+                                 coinsurance_pct,
+                                 copay,
+                                 has_insurance=True):
+    """
+    Price many visits at once; see adjudicate() for the cost-sharing rules.
+
+    visit_type holds BASE_VISIT_COSTS names or integer codes into
+    VISIT_TYPES. Every other argument is an array or a scalar.
+    """
+    return adjudicate(billed_amounts(visit_type), in_network, has_insurance,
+                      deductible, deductible_met, oop_max, coinsurance_pct, copay)
+
+
+CLAIM_COLUMNS = ["visit_type", "in_network", "deductible", "deductible_met",
+                 "oop_max", "coinsurance_pct", "copay"]
+
+
+def adjudicate_claims(df):
+    """
+    Price a claim file held in a DataFrame with CLAIM_COLUMNS
+    (plus an optional has_insurance column).
+    """
+    allowed, plan_pays, patient_pays = simulate_visit_payment_batch(
+        *(df[c].to_numpy() for c in CLAIM_COLUMNS),
+        has_insurance=df["has_insurance"].to_numpy() if "has_insurance" in df else True,
+    )
+    return pd.DataFrame(
+        {"allowed": allowed, "plan_pays": plan_pays, "patient_pays": patient_pays},
+        index=df.index,
+    )
+
+
+# -----------------------------
+# Monte Carlo annual spend
+# -----------------------------
+# CMS benchmark code whose min/max spread shapes each visit's price distribution.
+# A specialist is usually seen on referral as a new patient, and consult codes
+# (9924x) are not in the CMS table, so it borrows the new-patient office visit.
+# Telehealth visits bill the same office E/M codes as an in-person
+# established-patient visit (with a telehealth modifier).
+VISIT_CMS_CODES = {
+    "Primary Care Visit": "99213",
+    "Urgent Care Visit": "99214",
+    "Specialist Visit": "99203",
+    "Telehealth Visit": "99213",
+    "Emergency Room Visit": "99285",
+}
+DEFAULT_PRICE_SIGMA = 0.4
+
+# Prescriptions: $40/mo self-pay median, price fixed per drug for the year
+MED_MONTHLY_PRICE = 40
+MED_PRICE_SIGMA = 0.35
+
+SIM_YEARS = 100_000
+# Expected claims (visits plus monthly pharmacy claims) simulated when the
+# caller leaves n_years to simulate_annual_spend: heavy users get fewer years,
+# never below MIN_SIM_YEARS, so the cost of a run stays flat across inputs
+SIM_CLAIMS = 1_500_000
+MIN_SIM_YEARS = 10_000
+
+
+def price_sigmas(cms_df=None):
+    """
+    Lognormal sigma per visit type from CMS min/max prices.
+
+    The min and max are read as the 2.5th and 97.5th percentiles of the
+    negotiated rates, so sigma = ln(max / min) / (2 * 1.96).
+    """
+    sigmas = {v: DEFAULT_PRICE_SIGMA for v in VISIT_TYPES}
+    if cms_df is None:
+        return sigmas
+
+    codes = cms_df["code"].astype(str)
+    for visit_type, code in VISIT_CMS_CODES.items():
+        match = cms_df[codes == code]
+        if len(match):
+            row = match.iloc[0]
+            if row["min_price"] > 0 and row["max_price"] > row["min_price"]:
+                sigmas[visit_type] = float(np.log(row["max_price"] / row["min_price"]) / (2 * 1.96))
+    return sigmas
+
+
+def simulation_years(visits_per_year, meds_monthly, claims=SIM_CLAIMS):
+    """
+    Years to simulate for a usage profile so about `claims` claims are drawn.
+    """
+    per_year = sum(max(v, 0) for v in visits_per_year.values()) + (12 if meds_monthly > 0 else 0)
+    if per_year <= 0:
+        return SIM_YEARS
+    return int(min(max(claims // per_year, MIN_SIM_YEARS), SIM_YEARS))
+
+
+SimulatedYears = namedtuple(
+    "SimulatedYears", ["n_years", "billed", "year", "month", "pharmacy", "fills"]
+)
+
+
+def sample_claim_years(visits_per_year, meds_monthly, n_years=SIM_YEARS, seed=0, sigmas=None):
+    """
+    Sample n_years of claims for a usage profile.
+
+    visits_per_year maps visit type -> expected visits per year. Counts are
+    Poisson, billed prices lognormal around BASE_VISIT_COSTS, and each visit
+    lands in a random month. Prescriptions are filled every month at a price
+    drawn once per drug per year. Visits come back sorted by year and month
+    (random order within a month); pharmacy holds the billed amount of one
+    month's fills for each year.
+    """
+    rng = np.random.default_rng(seed)
+    sigmas = sigmas or price_sigmas()
+    years = np.arange(n_years)
+
+    billed_parts = []
+    year_parts = []
+    for visit_type, expected in visits_per_year.items():
+        if expected <= 0:
+            continue
+        counts = rng.poisson(expected, n_years)
+        median = BASE_VISIT_COSTS.get(visit_type, DEFAULT_BILLED)
+        sigma = sigmas.get(visit_type, DEFAULT_PRICE_SIGMA)
+        year_parts.append(np.repeat(years, counts))
+        billed_parts.append(median * np.exp(sigma * rng.standard_normal(counts.sum())))
+
+    year = np.concatenate(year_parts) if year_parts else np.empty(0, dtype=np.int64)
+    billed = np.concatenate(billed_parts) if billed_parts else np.empty(0)
+    month = rng.integers(0, 12, year.size)
+
+    order = np.argsort(year * 12 + month + rng.random(year.size))
+    year, month, billed = year[order], month[order], billed[order]
+
+    fills = int(meds_monthly)
+    pharmacy = np.zeros(n_years)
+    if fills > 0:
+        prices = MED_MONTHLY_PRICE * np.exp(MED_PRICE_SIGMA * rng.standard_normal((n_years, fills)))
+        pharmacy = prices.sum(axis=1)
+
+    return SimulatedYears(n_years, billed, year, month, pharmacy, fills)
+
+
+def sum_by_group(values, group, n_groups):
+    """
+    Totals along the last axis for values sorted by group id.
+    """
+    if values.ndim == 1:
+        return np.bincount(group, weights=values, minlength=n_groups)
+
+    counts = np.bincount(group, minlength=n_groups)
+    totals = np.zeros(values.shape[:-1] + (n_groups,))
+    nonempty = counts > 0
+    if nonempty.any():
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        totals[..., nonempty] = np.add.reduceat(values, starts[nonempty], axis=-1)
+    return totals
+
+
+def annual_patient_spend(sim, in_network, deductible, oop_max, coinsurance_pct, copay):
+    """
+    Patient spend for every simulated year.
+
+    Visits run through adjudicate() in order, with the deductible already
+    met equal to everything allowed earlier in the year. Each month's
+    prescriptions are one pharmacy claim at the end of the month with a
+    copay per fill, priced with the same rules in closed form on a dense
+    year x month grid. The OOP maximum caps the yearly total.
+
+    Plan arguments broadcast: pass shape (P, 1) arrays to price P plans
+    against the same simulated years and get a (P, n_years) result.
+    """
+    n = sim.n_years
+    in_network = np.asarray(in_network, dtype=bool)
+    deductible = np.asarray(deductible, dtype=np.float64)
+    coinsurance = np.asarray(coinsurance_pct, dtype=np.float64) / 100.0
+    copay = np.asarray(copay, dtype=np.float64)
+    oop_max = np.asarray(oop_max, dtype=np.float64)
+
+    allowed = np.where(in_network, sim.billed * 0.6, sim.billed * 1.0)
+    pharmacy = np.where(in_network, sim.pharmacy * 0.6, sim.pharmacy * 1.0)
+
+    # Deductible progress in front of each visit; the clamp absorbs rounding
+    # from differencing the running total, which would otherwise push a
+    # zero deductible into the deductible branch.
+    year_totals = sum_by_group(allowed, sim.year, n)
+    year_offset = np.cumsum(year_totals, axis=-1) - year_totals
+    spent_before = np.maximum(np.cumsum(allowed, axis=-1) - allowed - year_offset[..., sim.year], 0)
+
+    if sim.fills > 0:
+        spent_before = spent_before + sim.month * pharmacy[..., sim.year]
+
+    _, _, visit_pays = adjudicate(sim.billed, in_network, True, deductible, spent_before,
+                                  0, coinsurance_pct, copay)
+    annual = sum_by_group(visit_pays, sim.year, n)
+
+    if sim.fills > 0:
+        # Allowed visit dollars through the end of each month
+        month_totals = sum_by_group(allowed, sim.year * 12 + sim.month, n * 12)
+        month_totals = month_totals.reshape(month_totals.shape[:-1] + (n, 12))
+
+        claim = pharmacy[..., None]
+        pharmacy_before = np.arange(12) * claim + np.cumsum(month_totals, axis=-1)
+        # Plan arrays end in a length-1 axis that lines up with years
+        remaining_ded = np.maximum(deductible[..., None] - pharmacy_before, 0)
+        copay = copay[..., None]
+        coinsurance = coinsurance[..., None]
+
+        after_ded = np.where(copay > 0, np.minimum(copay * sim.fills, claim), claim * coinsurance)
+        in_ded = np.where(claim <= remaining_ded, claim,
+                          remaining_ded + (claim - remaining_ded) * coinsurance)
+        annual = annual + np.where(remaining_ded > 0, in_ded, after_ded).sum(axis=-1)
+
+    return np.where(oop_max > 0, np.minimum(annual, oop_max), annual)
+
+
+def _summary(annual):
+    p50, p90, p99 = np.percentile(annual, [50, 90, 99])
+    return {"mean": float(annual.mean()), "p50": float(p50), "p90": float(p90), "p99": float(p99)}
+
+
+@timed("simulate_annual_spend")
+def simulate_annual_spend(visits_pc, visits_uc, visits_er, meds_monthly,
+                          has_insurance: bool,
+                          in_network: bool = True,
+                          deductible: float = 1500,
+                          oop_max: float = 5000,
+                          coinsurance_pct: int = 20,
+                          copay: float = 30,
+                          n_years: int = None,
+                          seed: int = 0,
+                          sigmas=None):
+    """
+    Monte Carlo replacement for estimate_annual_spend's 35% heuristic.
+
+    Returns {"self_pay": stats, "insured": stats or None} where stats holds
+    the mean and p50/p90/p99 of annual spend across n_years (by default
+    simulation_years() for the profile).
+    """
+    visits = {
+        "Primary Care Visit": visits_pc,
+        "Urgent Care Visit": visits_uc,
+        "Emergency Room Visit": visits_er,
+    }
+    if n_years is None:
+        n_years = simulation_years(visits, meds_monthly)
+    sim = sample_claim_years(visits, meds_monthly, n_years, seed, sigmas)
+
+    self_pay = sum_by_group(sim.billed, sim.year, n_years) + 12 * sim.pharmacy
+    result = {"self_pay": _summary(self_pay), "insured": None}
+    if has_insurance:
+        result["insured"] = _summary(annual_patient_spend(
+            sim, in_network, deductible, oop_max, coinsurance_pct, copay
+        ))
+    return result
+
+
+# -----------------------------
+# Plan grid sweep
+# -----------------------------
+PLAN_COLUMNS = ["deductible", "oop_max", "coinsurance_pct", "copay"]
+# Cost-sharing terms priced per claim; the OOP maximum applies to the year
+TERM_COLUMNS = ["deductible", "coinsurance_pct", "copay"]
+
+DEFAULT_PLAN_GRID = {
+    "deductible": [0, 500, 1000, 1500, 2000, 3000, 4500, 6000],
+    "oop_max": [3000, 4500, 6000, 7500, 9200],
+    "coinsurance_pct": [0, 10, 20, 30, 40],
+    "copay": [0, 20, 30, 50],
+}
+
+# Premiums are a flat amount for care this model does not price (hospital
+# stays, imaging, ...) plus what the plan expects to pay for a reference
+# member's visits and prescriptions, grossed up for an 80% medical loss ratio.
+BASE_PREMIUM = 4200
+REFERENCE_VISITS = {
+    "Primary Care Visit": 3,
+    "Specialist Visit": 1,
+    "Urgent Care Visit": 0.5,
+    "Emergency Room Visit": 0.2,
+}
+REFERENCE_MEDS = 1
+LOSS_RATIO = 0.8
+
+SWEEP_YEARS = 10_000
+# Plan x claim cells priced per chunk; bounds the sweep's working memory
+SWEEP_CELLS = 2_000_000
+
+
+def plan_grid(**values):
+    """
+    Every combination of DEFAULT_PLAN_GRID values, one plan per row.
+
+    Keyword arguments replace the values of a column, e.g.
+    plan_grid(copay=[0]).
+    """
+    grid = {**DEFAULT_PLAN_GRID, **values}
+    mesh = np.meshgrid(*(np.asarray(grid[c], dtype=np.float64) for c in PLAN_COLUMNS),
+                       indexing="ij")
+    plans = pd.DataFrame({c: m.ravel() for c, m in zip(PLAN_COLUMNS, mesh)})
+
+    # A deductible above the OOP maximum is not a plan anyone sells
+    capped = plans["oop_max"] > 0
+    return plans[~capped | (plans["deductible"] <= plans["oop_max"])].reset_index(drop=True)
+
+
+def _plan_chunks(sim, n_plans):
+    cells = sim.billed.size + (12 * sim.n_years if sim.fills > 0 else sim.n_years)
+    step = max(1, SWEEP_CELLS // max(cells, 1))
+    for start in range(0, n_plans, step):
+        yield slice(start, min(start + step, n_plans))
+
+
+def _spend_stats(sim, plans, in_network):
+    """
+    Mean, p90 and max of annual patient spend for every plan row.
+
+    The OOP maximum only caps the yearly total, so years are priced once per
+    distinct (deductible, coinsurance, copay) and each plan's cap is applied
+    to that result.
+    """
+    terms, term_of = np.unique(plans[TERM_COLUMNS].to_numpy(np.float64), axis=0,
+                               return_inverse=True)
+    term_of = term_of.ravel()
+    oop_max = plans["oop_max"].to_numpy(np.float64)
+    cap = np.where(oop_max > 0, oop_max, np.inf)
+
+    mean, p90, worst = (np.empty(len(plans)) for _ in range(3))
+    for rows in _plan_chunks(sim, len(terms)):
+        uncapped = annual_patient_spend(sim, in_network, terms[rows, 0:1], 0,
+                                        terms[rows, 1:2], terms[rows, 2:3])
+        members = np.flatnonzero((term_of >= rows.start) & (term_of < rows.stop))
+        for block in np.array_split(members, max(1, -(-members.size // len(uncapped)))):
+            spend = np.minimum(uncapped[term_of[block] - rows.start], cap[block, None])
+            mean[block] = spend.mean(axis=1)
+            p90[block] = np.percentile(spend, 90, axis=1)
+            worst[block] = spend.max(axis=1)
+    return mean, p90, worst
+
+
+def allowed_per_year(sim, in_network=True):
+    """
+    Allowed dollars of every simulated year, visits plus prescriptions.
+    """
+    factor = 0.6 if in_network else 1.0
+    return factor * (sum_by_group(sim.billed, sim.year, sim.n_years) + 12 * sim.pharmacy)
+
+
+def price_premiums(plans, n_years=SWEEP_YEARS, seed=1):
+    """
+    Annual premium for each plan row: BASE_PREMIUM plus its share of a
+    reference member's simulated in-network care.
+    """
+    sim = sample_claim_years(REFERENCE_VISITS, REFERENCE_MEDS, n_years, seed)
+    allowed = allowed_per_year(sim).mean()
+    expected, _, _ = _spend_stats(sim, plans, True)
+    return np.round(BASE_PREMIUM + (allowed - expected) / LOSS_RATIO)
+
+
+@timed("sweep_plans")
+def sweep_plans(sim, plans, in_network=True):
+    """
+    Price every plan row against the same simulated years.
+
+    Adds expected_oop, p90_oop, expected_cost (premium + expected_oop) and
+    worst_case (premium + OOP maximum, or + the worst simulated year for
+    uncapped plans) to a copy of plans. Plans without a premium column are
+    priced with price_premiums.
+    """
+    plans = plans.reset_index(drop=True)
+    if "premium" not in plans:
+        plans["premium"] = price_premiums(plans)
+
+    expected, p90, worst = _spend_stats(sim, plans, in_network)
+
+    oop_max = plans["oop_max"].to_numpy(np.float64)
+    premium = plans["premium"].to_numpy(np.float64)
+    plans["expected_oop"] = expected
+    plans["p90_oop"] = p90
+    plans["expected_cost"] = premium + expected
+    plans["worst_case"] = premium + np.where(oop_max > 0, oop_max, worst)
+    return plans
+
+
+def pareto_frontier(cost, risk):
+    """
+    Mask of rows no other row beats on both cost and risk (lower is better).
+    Rows that tie on both are all kept.
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    risk = np.asarray(risk, dtype=np.float64)
+    order = np.lexsort((risk, cost))
+    cost, risk = cost[order], risk[order]
+
+    # Sorted by cost then risk, so each equal-cost group opens with its minimum
+    opens = np.concatenate(([True], cost[1:] != cost[:-1]))
+    group = np.cumsum(opens) - 1
+    group_min = risk[opens]
+    lower_cost_min = np.minimum.accumulate(np.concatenate(([np.inf], group_min[:-1])))
+
+    mask = np.zeros(cost.size, dtype=bool)
+    mask[order] = (risk == group_min[group]) & (group_min[group] < lower_cost_min[group])
+    return mask
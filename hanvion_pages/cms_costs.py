@@ -1,18 +1,70 @@
 import streamlit as st
 import pandas as pd
 
-@st.cache_data
+from hanvion_pages.components import Card, card_row
+from hanvion_pages.data_cache import cached_data
+from hanvion_pages.datastore import CMS_CSV
+from hanvion_pages.metrics import record_filter, timed
+from hanvion_pages.shared_data import shared_search_index, shared_table
+from hanvion_pages.sketches import SKETCH_STORE, load_sketch_store
+
+PERCENTILES = [0.10, 0.25, 0.75, 0.90]
+
+
+# The frame wraps Arrow buffers memory-mapped from the node's shared copy
+# (shared_data), so neither sessions nor server processes copy it.
+@cached_data(sources=[CMS_CSV])
 def load_cms_data():
     try:
-        df = pd.read_csv("data/cms_procedures.csv")
-        df["price_spread"] = df["max_price"] - df["min_price"]
-        df["variation_ratio"] = (df["max_price"] / df["min_price"]).round(1)
-        return df
+        table = shared_table("cms")
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
     except Exception as e:
         st.error(f"Unable to load CMS procedures dataset: {e}")
         return None
 
 
+@cached_data(sources=[CMS_CSV])
+def load_cms_search_index():
+    """
+    Search index arrays memory-mapped from the node's shared copy.
+    """
+    try:
+        return shared_search_index()
+    except Exception as e:
+        st.error(f"Unable to load CMS search index: {e}")
+        return None
+
+
+@cached_data(sources=[SKETCH_STORE])
+def load_cms_sketches():
+    """
+    Price sketches written by tic_ingest, or None when none have been built.
+    """
+    try:
+        return load_sketch_store()
+    except Exception as e:
+        st.error(f"Unable to load CMS price sketches: {e}")
+        return None
+
+
+@timed("cms_filter_procedures")
+def filter_procedures(df, search_text, setting):
+    """
+    Rows matching the search box (ranked by the search index) and setting.
+    """
+    filtered = df
+
+    if search_text:
+        index = load_cms_search_index()
+        filtered = df.iloc[index.search(search_text)]
+
+    if setting != "All":
+        filtered = filtered[filtered["setting"] == setting]
+
+    record_filter("cms_procedures", len(df), len(filtered))
+    return filtered
+
+
 def page_cms_costs():
     df = load_cms_data()
     if df is None or df.empty:
@@ -40,24 +92,19 @@ def page_cms_costs():
 
     col1, col2 = st.columns([2, 1])
     with col1:
-        search_text = st.text_input("Search by name or code (e.g., 99213, MRI, blood)")
+        search_text = st.text_input(
+            "Search by name or code (e.g., 99213, MRI, blood)",
+            help="Codes match from their first character. Every word you type must appear in "
+                 "the description, as a whole word or part of one; whole-word and "
+                 "word-start matches are listed first.",
+        )
     with col2:
         setting = st.selectbox(
             "Setting",
             ["All"] + sorted(df["setting"].unique().tolist())
         )
 
-    filtered = df.copy()
-
-    if search_text:
-        s = search_text.lower()
-        filtered = filtered[
-            filtered["description"].str.lower().str.contains(s)
-            | filtered["code"].astype(str).str.contains(s)
-        ]
-
-    if setting != "All":
-        filtered = filtered[filtered["setting"] == setting]
+    filtered = filter_procedures(df, search_text, setting)
 
     if filtered.empty:
         st.warning("No procedures found with the current filters.")
@@ -74,85 +121,37 @@ def page_cms_costs():
     row = filtered[filtered["code"].astype(str) == selected_code].iloc[0]
 
     # Summary cards
-    st.markdown("""
-        <div style="display:flex; gap:25px; flex-wrap:wrap; margin-top:10px;">
-    """, unsafe_allow_html=True)
-
-    # Median price
-    st.markdown(f"""
-        <div style="
-            flex:1; min-width:240px; background:#ffffff; padding:22px;
-            border-radius:12px; border:1px solid #eee;
-            box-shadow:0px 4px 12px rgba(0,0,0,0.05);">
-            <h4 style="margin-top:0;">Median Price</h4>
-            <p style="font-size:30px; font-weight:700; margin:6px 0;">
-                ${int(row['median_price'])}
-            </p>
-            <p style="font-size:13px; color:#777;">
-                Typical negotiated rate across reporting providers.
-            </p>
-        </div>
-    """, unsafe_allow_html=True)
-
-    # Min–Max
-    st.markdown(f"""
-        <div style="
-            flex:1; min-width:240px; background:#ffffff; padding:22px;
-            border-radius:12px; border:1px solid #eee;
-            box-shadow:0px 4px 12px rgba(0,0,0,0.05);">
-            <h4 style="margin-top:0;">Price Range</h4>
-            <p style="font-size:18px; margin:6px 0;">
-                Minimum: <b>${int(row['min_price'])}</b><br>
-                Maximum: <b>${int(row['max_price'])}</b>
-            </p>
-            <p style="font-size:13px; color:#777;">
-                Spread: ${int(row['price_spread'])} 
-                (variation ratio: {row['variation_ratio']}×).
-            </p>
-        </div>
-    """, unsafe_allow_html=True)
-
-    # Sample size
-    st.markdown(f"""
-        <div style="
-            flex:1; min-width:240px; background:#ffffff; padding:22px;
-            border-radius:12px; border:1px solid #eee;
-            box-shadow:0px 4px 12px rgba(0,0,0,0.05);">
-            <h4 style="margin-top:0;">Data Coverage</h4>
-            <p style="font-size:26px; font-weight:700; margin:6px 0;">
-                {int(row['sample_size'])} providers
-            </p>
-            <p style="font-size:13px; color:#777;">
-                Number of facilities used to derive these benchmarks.
-            </p>
-        </div>
-    """, unsafe_allow_html=True)
-
-    st.markdown("</div>", unsafe_allow_html=True)
+    cards = [
+        Card("Median Price", f"${int(row['median_price'])}",
+             note="Typical negotiated rate across reporting providers."),
+        Card("Price Range",
+             rows=(("Minimum", f"${int(row['min_price'])}"), ("Maximum", f"${int(row['max_price'])}")),
+             note=f"Spread: ${int(row['price_spread'])} (variation ratio: {row['variation_ratio']}×)."),
+        Card("Data Coverage", f"{int(row['sample_size'])} providers",
+             note="Number of facilities used to derive these benchmarks."),
+    ]
+
+    # Percentiles from the price sketches, when rate files have been ingested
+    sketches = load_cms_sketches()
+    sketch = sketches.get(str(row["code"]), row["setting"]) if sketches is not None else None
+    if sketch is not None:
+        prices = sketch.quantile(PERCENTILES)
+        cards.insert(2, Card(
+            "Price Percentiles",
+            rows=tuple((f"P{round(q * 100)}", f"${round(p)}") for q, p in zip(PERCENTILES, prices)),
+            note=f"From {sketch.count:,} negotiated rates.",
+        ))
+    card_row(*cards)
 
     # Detailed info card
-    st.markdown("<br>", unsafe_allow_html=True)
-    st.markdown("""
-        <div style="background:#f8f9ff; padding:22px; border-radius:10px;
-                    border:1px solid #e0e3ff;">
-            <h4 style="margin-top:0;">Procedure Details</h4>
-    """, unsafe_allow_html=True)
-
-    st.markdown(
-        f"<p><b>Code:</b> {row['code']}<br>"
-        f"<b>Description:</b> {row['description']}<br>"
-        f"<b>Setting:</b> {row['setting']}</p>",
-        unsafe_allow_html=True,
+    card_row(
+        Card("Procedure Details",
+             rows=(("Code", row["code"]), ("Description", row["description"]), ("Setting", row["setting"])),
+             note="These benchmarks are derived from price transparency style data "
+                  "and are intended for education, not billing.",
+             tinted=True),
     )
 
-    st.markdown(
-        "<p style='font-size:13px; color:#777;'>These benchmarks are derived from "
-        "price transparency style data and are intended for education, not billing.</p>",
-        unsafe_allow_html=True,
-    )
-
-    st.markdown("</div>", unsafe_allow_html=True)
-
     # Table of filtered procedures
     st.markdown("<br><h3 style='font-weight:700;'>All Matching Procedures</h3>", unsafe_allow_html=True)
     show_cols = ["code", "description", "setting", "median_price", "min_price", "max_price", "sample_size", "variation_ratio"]
@@ -0,0 +1,182 @@
+import re
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# -----------------------------
+# Tokenization
+# -----------------------------
+TOKEN_SPLIT = r"[^0-9a-z]+"
+_TOKEN_SPLIT_RE = re.compile(TOKEN_SPLIT)
+
+
+def tokenize(text):
+    return [t for t in _TOKEN_SPLIT_RE.split(text.lower()) if t]
+
+
+def prefix_range(sorted_keys, prefix):
+    """
+    [lo, hi) slice of a sorted unicode array whose keys start with prefix.
+    """
+    if not prefix or len(prefix) > sorted_keys.dtype.itemsize // 4:
+        return 0, 0
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    lo = int(np.searchsorted(sorted_keys, prefix, side="left"))
+    hi = int(np.searchsorted(sorted_keys, upper, side="left"))
+    return lo, hi
+
+
+def _ordered_unique(*groups):
+    """
+    Concatenate row-id arrays, keeping the first occurrence of each id.
+    """
+    ids = np.concatenate(groups) if groups else np.empty(0, dtype=np.int64)
+    if ids.size == 0:
+        return ids.astype(np.int64)
+    _, first = np.unique(ids, return_index=True)
+    return ids[np.sort(first)].astype(np.int64)
+
+
+def _as_string_array(values):
+    if not isinstance(values, (pa.Array, pa.ChunkedArray)):
+        # Arrow-backed pandas columns convert to a ChunkedArray
+        values = pa.array(values)
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks()
+    return values.cast(pa.string())
+
+
+# -----------------------------
+# Search index
+# -----------------------------
+class ProcedureSearchIndex:
+    """
+    Inverted index over procedure descriptions plus a sorted code index.
+
+    Description tokens are stored as a sorted vocabulary with CSR posting
+    lists laid out in vocabulary order, so every token sharing a prefix maps
+    to one contiguous slice of row ids. Codes are kept sorted for prefix
+    lookups. Both are built once per dataset with vectorized Arrow kernels.
+    """
+
+    def __init__(self, vocab, offsets, postings, codes, code_rows):
+        self.vocab = vocab
+        self.offsets = offsets
+        self.postings = postings
+        self.codes = codes
+        self.code_rows = code_rows
+
+    @classmethod
+    def build(cls, codes, descriptions):
+        codes = _as_string_array(codes)
+        descriptions = _as_string_array(descriptions)
+
+        # Token -> row postings
+        tokens = pc.split_pattern_regex(pc.utf8_lower(descriptions), TOKEN_SPLIT)
+        flat = pc.list_flatten(tokens)
+        rows = pc.list_parent_indices(tokens)
+        keep = pc.not_equal(flat, "")
+        flat = pc.filter(flat, keep)
+        rows = pc.filter(rows, keep).to_numpy().astype(np.int64)
+
+        encoded = pc.dictionary_encode(flat)
+        dictionary = encoded.dictionary
+        sort_order = pc.array_sort_indices(dictionary).to_numpy()
+        rank = np.empty_like(sort_order)
+        rank[sort_order] = np.arange(sort_order.size)
+        token_ids = rank[encoded.indices.to_numpy()]
+
+        order = np.lexsort((rows, token_ids))
+        token_ids = token_ids[order]
+        rows = rows[order]
+        if rows.size:
+            distinct = np.ones(rows.size, dtype=bool)
+            distinct[1:] = (token_ids[1:] != token_ids[:-1]) | (rows[1:] != rows[:-1])
+            token_ids = token_ids[distinct]
+            rows = rows[distinct]
+
+        vocab = np.array(pc.take(dictionary, pa.array(sort_order)).to_pylist(), dtype=str)
+        offsets = np.zeros(vocab.size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(token_ids, minlength=vocab.size), out=offsets[1:])
+
+        # Sorted code index
+        code_keys = np.array(pc.utf8_lower(codes).to_pylist(), dtype=str)
+        code_rows = np.argsort(code_keys, kind="stable")
+
+        return cls(vocab, offsets, rows.astype(np.int32), code_keys[code_rows], code_rows.astype(np.int32))
+
+    def __len__(self):
+        return self.code_rows.size
+
+    def _token_rows(self, token, match):
+        """
+        Sorted, distinct row ids of descriptions with a word that equals
+        ("exact"), starts with ("prefix") or contains ("infix") token.
+        """
+        if match == "infix":
+            # Scans the vocabulary, not the rows: a word-internal substring
+            # ("scopy" in "endoscopy") has no contiguous vocabulary range
+            words = np.flatnonzero(np.char.find(self.vocab, token) >= 0)
+            return self._distinct([self.postings[self.offsets[w]:self.offsets[w + 1]] for w in words])
+        if len(token) > self.vocab.dtype.itemsize // 4:
+            return np.empty(0, dtype=np.int32)
+        if match == "exact":
+            lo = int(np.searchsorted(self.vocab, token, side="left"))
+            hi = lo + 1 if lo < self.vocab.size and self.vocab[lo] == token else lo
+        else:
+            lo, hi = prefix_range(self.vocab, token)
+        rows = self.postings[self.offsets[lo]:self.offsets[hi]]
+        # One word's postings are already sorted and distinct
+        return rows if hi - lo <= 1 else self._distinct([rows])
+
+    def _distinct(self, slices):
+        """
+        Sorted distinct row ids of several posting slices.
+        """
+        total = sum(len(rows) for rows in slices)
+        if total == 0:
+            return np.empty(0, dtype=np.int32)
+        if total < len(self) // 8:
+            return np.unique(np.concatenate(slices))
+        # Short queries can hit most of the table; marking rows then costs
+        # O(rows) instead of sorting several times that many postings
+        seen = np.zeros(len(self), dtype=bool)
+        for rows in slices:
+            seen[rows] = True
+        return np.flatnonzero(seen).astype(np.int32)
+
+    def _description_rows(self, tokens, match):
+        if not tokens:
+            return np.empty(0, dtype=np.int32)
+        # Smallest set first keeps every intersection small
+        sets = sorted((self._token_rows(t, match) for t in tokens), key=len)
+        result = sets[0]
+        for rows in sets[1:]:
+            if result.size == 0:
+                break
+            result = np.intersect1d(result, rows, assume_unique=True)
+        return result
+
+    def search(self, query, limit=None):
+        """
+        Ranked row ids matching query.
+
+        Order: exact code, code prefix, descriptions containing every query
+        word, descriptions where every query word is a word prefix, then
+        descriptions where every query word is part of a word ("scopy"
+        finds "endoscopy"). Codes match from their start only. Ties keep
+        table order.
+        """
+        q = query.strip().lower()
+        if not q:
+            return np.arange(len(self), dtype=np.int64)[:limit]
+
+        lo, hi = prefix_range(self.codes, q)
+        code_prefix = self.code_rows[lo:hi]
+        code_exact = code_prefix[self.codes[lo:hi] == q]
+
+        tokens = tokenize(q)
+        ranked = _ordered_unique(code_exact, np.sort(code_prefix),
+                                 *(self._description_rows(tokens, match) for match in ("exact", "prefix", "infix")))
+        return ranked if limit is None else ranked[:limit]
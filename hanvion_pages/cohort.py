@@ -0,0 +1,215 @@
+"""
+Health Profile metrics for whole cohorts.
+
+calculate_bmi, lifestyle_score and prevention_recommendations score one
+person from the page form; the functions here compute the same metrics over
+columns. Recommendations come back as a bitmask (bit i set means
+RECOMMENDATIONS[i] applies), so a million members cost a million bytes
+rather than a million lists of strings. Cohort files stream through
+batch_io chunk by chunk:
+
+    python -m hanvion_pages.cohort members.parquet --out scored.parquet \\
+        --workers 4 --verify 1000
+"""
+import argparse
+import contextlib
+
+import numpy as np
+import pandas as pd
+
+from hanvion_pages.batch_io import CHUNK_ROWS, ChunkWriter, iter_chunks, map_chunks
+from hanvion_pages.recommendations import REC_IDX, RECOMMENDATIONS
+
+COHORT_COLUMNS = ["weight", "height_cm", "sleep", "activity_days", "stress", "smoking", "alcohol"]
+
+BMI_CATEGORIES = ["Underweight", "Normal", "Overweight", "Obesity"]
+
+
+def _bits(*names):
+    return sum(1 << REC_IDX[name] for name in names)
+
+
+# Bits of RECOMMENDATIONS set together by one rule of prevention_recommendations
+REC_WEIGHT_LOSS = _bits("walking", "diet")
+REC_WEIGHT_GAIN = _bits("calorie_intake")
+REC_LOW_SCORE = _bits("activity", "sleep", "habits")
+REC_VERY_LOW_SCORE = _bits("provider")
+# Masks are stored as uint8
+assert len(RECOMMENDATIONS) <= 8
+
+
+# -----------------------------
+# Vectorized metrics
+# -----------------------------
+def round_half_even(values, digits=1):
+    """
+    Python's round(x, digits) over an array.
+
+    np.round scales, rounds and unscales, which can land on the other side
+    of a tie than round() does on the exact binary value. Values within a
+    hair of a tie are re-rounded one by one with round() itself.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    scale = 10.0 ** digits
+    scaled = values * scale
+    result = np.round(scaled) / scale
+    near_tie = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    for i in near_tie:
+        result[i] = round(float(values[i]), digits)
+    return result
+
+
+def bmi_batch(weight, height_cm):
+    """
+    (bmi rounded to one decimal, category codes into BMI_CATEGORIES).
+
+    The category is taken from the unrounded BMI, as calculate_bmi does.
+    """
+    height_m = np.asarray(height_cm, dtype=np.float64) / 100
+    bmi = np.asarray(weight, dtype=np.float64) / (height_m ** 2)
+    category = np.select([bmi < 18.5, bmi < 24.9, bmi < 29.9], [0, 1, 2], 3).astype(np.int8)
+    return round_half_even(bmi), category
+
+
+def lifestyle_score_batch(sleep, activity_days, stress, smoking, alcohol):
+    score = np.full(len(sleep), 100, dtype=np.int16)
+    score -= np.where(np.asarray(sleep, dtype=np.float64) < 6, 15, 0).astype(np.int16)
+    score -= np.where(np.asarray(activity_days, dtype=np.float64) < 3, 20, 0).astype(np.int16)
+    score -= np.where((pd.Series(stress) == "High").to_numpy(), 15, 0).astype(np.int16)
+    score -= np.where((pd.Series(smoking) == "Yes").to_numpy(), 25, 0).astype(np.int16)
+    score -= np.where((pd.Series(alcohol) == "Frequent").to_numpy(), 10, 0).astype(np.int16)
+    return np.maximum(score, 0)
+
+
+def recommendation_mask(score, bmi_category):
+    """
+    Bitmask of RECOMMENDATIONS from lifestyle scores and BMI category codes.
+    """
+    score = np.asarray(score)
+    category = np.asarray(bmi_category)
+    mask = np.zeros(score.shape, dtype=np.uint8)
+    mask |= np.where(category >= 2, REC_WEIGHT_LOSS, 0).astype(np.uint8)
+    mask |= np.where(category == 0, REC_WEIGHT_GAIN, 0).astype(np.uint8)
+    mask |= np.where(score < 70, REC_LOW_SCORE, 0).astype(np.uint8)
+    mask |= np.where(score < 40, REC_VERY_LOW_SCORE, 0).astype(np.uint8)
+    return mask
+
+
+def decode_recommendations(mask):
+    """
+    The recommendation texts of one bitmask, in prevention_recommendations order.
+    """
+    return [text for bit, text in enumerate(RECOMMENDATIONS) if int(mask) >> bit & 1]
+
+
+def score_cohort(df):
+    """
+    bmi, bmi_category, lifestyle_score and recommendations for every row of
+    a frame with COHORT_COLUMNS.
+    """
+    missing = [c for c in COHORT_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"cohort is missing column(s): {', '.join(missing)}")
+
+    bmi, category = bmi_batch(df["weight"], df["height_cm"])
+    score = lifestyle_score_batch(df["sleep"], df["activity_days"], df["stress"],
+                                  df["smoking"], df["alcohol"])
+    return pd.DataFrame({
+        "bmi": bmi,
+        "bmi_category": pd.Categorical.from_codes(category, BMI_CATEGORIES),
+        "lifestyle_score": score,
+        "recommendations": recommendation_mask(score, category),
+    }, index=df.index)
+
+
+# -----------------------------
+# Equivalence with the page functions
+# -----------------------------
+def verify_against_scalar(df, scores):
+    """
+    Raise ValueError on the first row where score_cohort disagrees with
+    calculate_bmi / lifestyle_score / prevention_recommendations.
+    """
+    from hanvion_pages.health_profile import calculate_bmi, lifestyle_score, prevention_recommendations
+
+    rows = zip(*(df[c].tolist() for c in COHORT_COLUMNS), *(scores[c].tolist() for c in scores.columns))
+    for weight, height, sleep, activity, stress, smoking, alcohol, bmi, category, score, mask in rows:
+        expected_bmi, expected_category = calculate_bmi(weight, height)
+        expected_score = lifestyle_score(sleep, activity, stress, smoking, alcohol)
+        expected_recs = prevention_recommendations(expected_score, expected_category)
+        got = (bmi, category, score, decode_recommendations(mask))
+        expected = (expected_bmi, expected_category, expected_score, expected_recs)
+        if got != expected and not (np.isnan(bmi) and np.isnan(expected_bmi) and got[1:] == expected[1:]):
+            raise ValueError(f"cohort scores {got!r} != scalar {expected!r} "
+                             f"for weight={weight!r} height_cm={height!r}")
+
+
+# -----------------------------
+# Streaming
+# -----------------------------
+def score_chunk(df, verify=0):
+    """
+    Score one chunk; returns (chunk with scores appended, summary partial).
+    """
+    scores = score_cohort(df)
+    if verify:
+        verify_against_scalar(df.head(verify), scores.head(verify))
+
+    bits = np.unpackbits(scores["recommendations"].to_numpy()[:, None], axis=1, bitorder="little")
+    partial = {
+        "members": len(df),
+        "score_sum": int(scores["lifestyle_score"].sum()),
+        "categories": np.bincount(scores["bmi_category"].cat.codes, minlength=len(BMI_CATEGORIES)),
+        "recommendations": bits[:, :len(RECOMMENDATIONS)].sum(axis=0),
+    }
+    return pd.concat([df, scores], axis=1), partial
+
+
+def score_file(in_path, out_path=None, workers=None, chunk_rows=CHUNK_ROWS, verify=0):
+    """
+    Stream a cohort file through score_chunk; returns the cohort summary.
+    """
+    totals = None
+    with ChunkWriter(out_path) if out_path else contextlib.nullcontext() as writer:
+        for scored, partial in map_chunks(score_chunk, iter_chunks(in_path, chunk_rows), workers, verify):
+            if writer is not None:
+                writer.write(scored)
+            totals = partial if totals is None else {k: totals[k] + partial[k] for k in totals}
+    return summarize(totals)
+
+
+def summarize(totals):
+    if not totals or not totals["members"]:
+        return None
+    members = totals["members"]
+    return {
+        "members": members,
+        "mean_lifestyle_score": totals["score_sum"] / members,
+        "bmi_categories": dict(zip(BMI_CATEGORIES, (int(n) for n in totals["categories"]))),
+        "recommendations": {text: int(n) for text, n in zip(RECOMMENDATIONS, totals["recommendations"])},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a cohort file for Health Profile metrics.")
+    parser.add_argument("cohort", help="CSV or Parquet with " + ", ".join(COHORT_COLUMNS))
+    parser.add_argument("--out", default=None, help="scored cohort to write (.csv or .parquet)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--verify", type=int, default=0,
+                        help="check the first N rows of each chunk against the scalar functions")
+    args = parser.parse_args(argv)
+
+    summary = score_file(args.cohort, args.out, args.workers, args.chunk_rows, args.verify)
+    if summary is None:
+        print("No members scored.")
+        return
+    print(f"Members: {summary['members']:,}   mean lifestyle score: {summary['mean_lifestyle_score']:.1f}")
+    for category, n in summary["bmi_categories"].items():
+        print(f"  {category:12s} {n:>12,}")
+    for text, n in summary["recommendations"].items():
+        print(f"  {n:>12,}  {text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import html
+from dataclasses import dataclass
+from functools import lru_cache
+
+import streamlit as st
+
+# -----------------------------
+# Card templates
+# -----------------------------
+# Styling lives in the .hanvion-* classes of app.py's global CSS, so a card is
+# a few short tags instead of a block of inline styles. Markup is emitted on
+# one line: a blank line or 4-space indent would end the HTML block in
+# Markdown.
+
+
+@dataclass(frozen=True)
+class Card:
+    """
+    One summary card. Every part except the title is optional:
+    value is the big figure, rows are "label: value" lines, items a bullet
+    list and note the small grey text underneath.
+    """
+    title: str
+    value: str = ""
+    rows: tuple = ()
+    items: tuple = ()
+    note: str | tuple = ""
+    large: bool = False
+    tinted: bool = False
+
+
+def _esc(text):
+    return html.escape(str(text), quote=False)
+
+
+@lru_cache(maxsize=1024)
+def render_card(card):
+    classes = "hanvion-card hanvion-card-tinted" if card.tinted else "hanvion-card"
+    parts = [f'<div class="{classes}"><h4>{_esc(card.title)}</h4>']
+
+    if card.value != "":
+        size = " hanvion-stat-lg" if card.large else ""
+        parts.append(f'<p class="hanvion-stat{size}">{_esc(card.value)}</p>')
+    if card.rows:
+        lines = "<br>".join(f"{_esc(label)}: <b>{_esc(value)}</b>" for label, value in card.rows)
+        parts.append(f"<p>{lines}</p>")
+    if card.items:
+        bullets = "".join(f"<li>{_esc(item)}</li>" for item in card.items)
+        parts.append(f"<ul>{bullets}</ul>")
+    if card.note:
+        notes = (card.note,) if isinstance(card.note, str) else card.note
+        parts.append(f'<p class="hanvion-note">{"<br>".join(_esc(n) for n in notes)}</p>')
+
+    parts.append("</div>")
+    return "".join(parts)
+
+
+@lru_cache(maxsize=512)
+def render_card_row(cards):
+    return '<div class="hanvion-card-row">' + "".join(render_card(c) for c in cards) + "</div>"
+
+
+# -----------------------------
+# Streamlit output
+# -----------------------------
+def card_row(*cards):
+    """
+    Render a group of cards side by side as a single Markdown element.
+    """
+    st.markdown(render_card_row(cards), unsafe_allow_html=True)
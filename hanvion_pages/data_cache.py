@@ -0,0 +1,334 @@
+"""
+Process-wide, memory-budgeted cache for datasets.
+
+st.cache_data pickles a DataFrame when it is stored and unpickles a fresh
+copy on every hit, so each rerun of each session pays for a full copy of
+the dataset. st.cache_resource avoids the copy but has no notion of size.
+This cache hands every caller the same object, charges it against a byte
+budget and evicts least-recently-used entries when the budget is exceeded.
+
+Cached objects are shared across sessions and must be treated as
+read-only. With pandas copy-on-write, anything derived from a cached frame
+(filters, .assign, column selections) is private to the caller; only
+assigning into the cached object itself would leak between sessions.
+
+    @cached_data(sources=["data/things.csv"])
+    def load_things():
+        ...
+
+    DATA_CACHE.stats()   # hits, misses, evictions, bytes, entries, budget
+
+Reloads (hanvion_pages.data_reload) replace entries in generations. A
+script run inside DATA_CACHE.snapshot() keeps reading the generation it
+started on, so a page never pairs a new table with an old index built
+over the previous one; replaced values live until no run pins them.
+"""
+import contextlib
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from hanvion_pages.metrics import CACHE_REQUESTS, LOADER_SECONDS, METRICS
+
+logger = logging.getLogger(__name__)
+
+# HANVION_CACHE_MB overrides the default budget
+DEFAULT_BUDGET_MB = 1024
+
+# Per thread: the generation a script run is pinned to, and loaders being
+# rebuilt by a reload
+_local = threading.local()
+
+
+def nbytes(value, _seen=None):
+    """
+    Approximate memory held by a cached value.
+
+    DataFrames, arrays and Arrow data report their buffers; containers and
+    plain objects (indexes, lookup tables) are walked, each object counted
+    once. pandas, numpy and pyarrow are looked up in sys.modules rather
+    than imported: a value can only be one of their types once they are
+    loaded, and pages that need none of them should not pay for importing them.
+    """
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if pd is not None and isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    np = sys.modules.get("numpy")
+    pa = sys.modules.get("pyarrow")
+    if ((np is not None and isinstance(value, np.ndarray))
+            or (pa is not None and isinstance(value, (pa.Table, pa.RecordBatch, pa.Array, pa.ChunkedArray)))):
+        return int(value.nbytes)
+
+    _seen = set() if _seen is None else _seen
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(nbytes(k, _seen) + nbytes(v, _seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(nbytes(v, _seen) for v in value)
+    elif hasattr(value, "__dict__") and not isinstance(value, type):
+        size += nbytes(vars(value), _seen)
+    return size
+
+
+class DataCache:
+    """
+    LRU cache of shared objects with a byte budget.
+
+    Loads for the same key run once; concurrent callers wait for the first.
+    A value larger than the whole budget is kept as the only entry (and
+    counted in stats()["oversized"], with a warning once per key) rather
+    than re-loaded on every call. None (a failed load) is never cached, so
+    the next call retries.
+    """
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.entries = OrderedDict()  # key -> (value, nbytes, generation added)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.oversized = 0
+        self._warned = set()  # keys already warned about as oversized
+        self.lock = threading.Lock()
+        self.loading = {}  # key -> Lock held while the key loads
+        self.generation = 0
+        self.pins = {}  # generation -> script runs pinned to it
+        self.retired = []  # (key, value, added, replaced) still pinned by a run
+
+    def _lookup(self, key):
+        """
+        The entry visible to this thread, or None. Call with the lock held.
+        """
+        entry = self.entries.get(key)
+        pinned = getattr(_local, "generation", None)
+        if pinned is None or (entry is not None and entry[2] <= pinned):
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+        for k, value, added, replaced in self.retired:
+            if k == key and added <= pinned < replaced:
+                return (value, 0, added)
+        # Not loaded yet when the run started: the current value is the
+        # first this run sees of it
+        return entry
+
+    def get(self, key, load):
+        with self.lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self.hits += 1
+                return entry[0]
+            key_lock = self.loading.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self.lock:
+                entry = self._lookup(key)
+                if entry is not None:
+                    self.hits += 1
+                    return entry[0]
+                self.misses += 1
+            try:
+                value = load()
+                if value is not None:
+                    self.put(key, value)
+                return value
+            finally:
+                with self.lock:
+                    self.loading.pop(key, None)
+
+    def put(self, key, value):
+        size = nbytes(value)
+        with self.lock:
+            self._drop(key)
+            self._check_size(key, size)
+            self.entries[key] = (value, size, self.generation)
+            self.bytes += size
+            self._evict()
+
+    def _check_size(self, key, size):
+        if size <= self.budget_bytes:
+            return
+        self.oversized += 1
+        if key not in self._warned:
+            self._warned.add(key)
+            logger.warning(
+                "%s needs %.0f MB, more than the whole dataset cache (%.0f MB); it is kept "
+                "as the only entry. Raise HANVION_CACHE_MB to cache it alongside other data.",
+                _key_name(key), size / 2**20, self.budget_bytes / 2**20)
+
+    def _evict(self):
+        # The newest entry is never evicted to make room for itself
+        while self.bytes > self.budget_bytes and len(self.entries) > 1:
+            oldest = next(iter(self.entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def swap(self, values):
+        """
+        Replace several entries at once as a new generation.
+
+        Runs pinned to an older generation keep seeing the values replaced
+        here until they finish.
+        """
+        sized = {key: (value, nbytes(value)) for key, value in values.items()}
+        with self.lock:
+            self.generation += 1
+            for key, (value, size) in sized.items():
+                old = self.entries.get(key)
+                if old is not None and self.pins:
+                    self.retired.append((key, old[0], old[2], self.generation))
+                self._drop(key)
+                self._check_size(key, size)
+                self.entries[key] = (value, size, self.generation)
+                self.bytes += size
+            self._evict()
+            return self.generation
+
+    @contextlib.contextmanager
+    def snapshot(self):
+        """
+        Pin this thread's lookups to the current generation.
+        """
+        with self.lock:
+            generation = self.generation
+            self.pins[generation] = self.pins.get(generation, 0) + 1
+        _local.generation = generation
+        try:
+            yield generation
+        finally:
+            _local.generation = None
+            with self.lock:
+                self.pins[generation] -= 1
+                if not self.pins[generation]:
+                    del self.pins[generation]
+                oldest = min(self.pins, default=None)
+                self.retired = [r for r in self.retired if oldest is not None and oldest < r[3]]
+
+    def keys(self):
+        with self.lock:
+            return list(self.entries)
+
+    def _drop(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[1]
+
+    def clear(self, match=None):
+        """
+        Drop every entry, or those whose key satisfies match(key).
+        """
+        with self.lock:
+            for key in [k for k in self.entries if match is None or match(k)]:
+                self._drop(key)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "oversized": self.oversized,
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "budget_bytes": self.budget_bytes,
+                "generation": self.generation,
+                "retired": len(self.retired),
+                "sizes": {_key_name(k): size for k, (_, size, _) in self.entries.items()},
+            }
+
+
+def _key_name(key):
+    if isinstance(key, tuple) and len(key) == 3 and isinstance(key[0], str):
+        name, args, kwargs = key
+        if not args and not kwargs:
+            return name
+        return f"{name}{args!r}{dict(kwargs)!r}" if kwargs else f"{name}{args!r}"
+    return str(key)
+
+
+DATA_CACHE = DataCache(int(os.environ.get("HANVION_CACHE_MB", DEFAULT_BUDGET_MB)) * 1024 * 1024)
+
+CACHE_BYTES = METRICS.gauge("hanvion_cache_bytes", "Bytes held by the dataset cache.")
+CACHE_EVICTIONS = METRICS.counter("hanvion_cache_evictions", "Dataset cache evictions.")
+
+
+@METRICS.collector
+def _export_cache_stats():
+    stats = DATA_CACHE.stats()
+    CACHE_BYTES.set(value=stats["bytes"])
+    CACHE_EVICTIONS.set(value=stats["evictions"])
+
+
+# Qualified loader name -> (wrapper, source files it is built from)
+LOADERS = {}
+
+
+@contextlib.contextmanager
+def rebuilding(names):
+    """
+    Within the block, calls to the named loaders on this thread load fresh
+    values into the yielded dict instead of reading or filling the cache.
+    Loaders they call that are not named still come from the cache.
+    """
+    staged = {}
+    _local.rebuilding = (frozenset(names), staged)
+    try:
+        yield staged
+    finally:
+        _local.rebuilding = None
+
+
+def cached_data(fn=None, *, sources=()):
+    """
+    Cache fn's return value in DATA_CACHE, keyed by its qualified name and
+    arguments (which must be hashable). fn.clear() drops its entries.
+
+    sources lists the files the value is built from; data_reload rebuilds
+    the entries when one of them changes.
+    """
+    if fn is None:
+        return functools.partial(cached_data, sources=sources)
+
+    name = f"{fn.__module__}.{fn.__qualname__}"
+    loader = fn.__qualname__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = (name, args, tuple(sorted(kwargs.items())))
+        rebuild = getattr(_local, "rebuilding", None)
+        if rebuild is not None and name in rebuild[0]:
+            if key not in rebuild[1]:
+                rebuild[1][key] = fn(*args, **kwargs)
+            return rebuild[1][key]
+
+        missed = False
+
+        def load():
+            nonlocal missed
+            missed = True
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                LOADER_SECONDS.observe(time.perf_counter() - start, loader)
+
+        value = DATA_CACHE.get(key, load)
+        CACHE_REQUESTS.inc(loader, "miss" if missed else "hit")
+        return value
+
+    wrapper.clear = lambda: DATA_CACHE.clear(lambda key: key[0] == name)
+    LOADERS[name] = (wrapper, tuple(sources))
+    return wrapper
@@ -0,0 +1,151 @@
+"""
+Hot reload of data/ while the app keeps serving.
+
+A watcher thread polls the source files the cached loaders declare
+(cached_data(sources=[...])). When one changes, only the loaders built
+from it are re-run, in the background and against the new file, while
+sessions keep reading the cached values. The rebuilt values are swapped
+into DATA_CACHE as one generation, so a table and the indexes derived from
+it change together, and a script run already in progress finishes on the
+generation it started with (DATA_CACHE.snapshot()).
+
+A file is reloaded once its (mtime, size) has stayed the same for one
+poll, so a price file that is still being copied in is not read half
+written. If a rebuild fails, or a loader returns None, the old values
+stay in place and the rebuild is retried on the next change.
+
+HANVION_RELOAD_INTERVAL sets the poll interval in seconds (default 5);
+0 turns the watcher off.
+"""
+import logging
+import os
+import threading
+import time
+
+from hanvion_pages.data_cache import DATA_CACHE, LOADERS, rebuilding
+from hanvion_pages.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 5.0
+
+RELOADS = METRICS.counter(
+    "hanvion_data_reloads", "Dataset reloads by source file and result.", ["source", "result"])
+RELOAD_SECONDS = METRICS.histogram(
+    "hanvion_data_reload_seconds", "Time to rebuild and swap the datasets built from a source file.",
+    ["source"])
+
+# Other caches that hold results computed from a source file, cleared after
+# the file's datasets are swapped in: source -> [clear functions]
+DEPENDENTS = {}
+
+
+def clear_on_change(source, *clear_fns):
+    """
+    Clear other caches (e.g. st.cache_data results) when source is reloaded.
+    """
+    DEPENDENTS.setdefault(source, []).extend(clear_fns)
+
+
+def _stamp(path):
+    try:
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+    except FileNotFoundError:
+        return None
+
+
+def watched_sources():
+    return sorted({path for _, sources in LOADERS.values() for path in sources})
+
+
+def reload_sources(paths):
+    """
+    Rebuild every cached loader entry built from any of paths and swap the
+    results in as one generation. Returns the number of entries swapped, or
+    None when a rebuild failed and nothing was swapped.
+    """
+    paths = set(paths)
+    names = {name for name, (_, sources) in LOADERS.items() if paths & set(sources)}
+    keys = [key for key in DATA_CACHE.keys() if isinstance(key, tuple) and key[0] in names]
+
+    with rebuilding(names) as staged:
+        for name, args, kwargs in keys:
+            LOADERS[name][0](*args, **dict(kwargs))
+
+    if any(value is None for value in staged.values()):
+        return None
+    if staged:
+        DATA_CACHE.swap(staged)
+    for path in paths:
+        for clear in DEPENDENTS.get(path, ()):
+            clear()
+    return len(staged)
+
+
+class Watcher:
+    """
+    Polls watched_sources() and reloads the ones that changed.
+    """
+
+    def __init__(self, interval=DEFAULT_INTERVAL):
+        self.interval = interval
+        self.loaded = {path: _stamp(path) for path in watched_sources()}
+        self.seen = dict(self.loaded)
+        self.stopped = threading.Event()
+
+    def poll(self):
+        """
+        One pass; returns the sources reloaded.
+        """
+        settled = []
+        for path in watched_sources():
+            stamp = _stamp(path)
+            previous = self.seen.get(path, stamp)
+            self.seen[path] = stamp
+            self.loaded.setdefault(path, stamp)
+            if stamp != self.loaded[path] and stamp == previous:
+                settled.append(path)
+
+        reloaded = []
+        for path in settled:
+            start = time.perf_counter()
+            try:
+                swapped = reload_sources([path])
+            except Exception:
+                logger.exception("Reloading %s failed; keeping the loaded data", path)
+                swapped = None
+            RELOAD_SECONDS.observe(time.perf_counter() - start, path)
+            RELOADS.inc(path, "ok" if swapped is not None else "failed")
+            # A failed reload is retried when the file changes again
+            self.loaded[path] = self.seen[path]
+            if swapped is not None:
+                reloaded.append(path)
+        return reloaded
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.poll()
+
+    def stop(self):
+        self.stopped.set()
+
+
+_watcher = None
+_start_lock = threading.Lock()
+
+
+def start_watcher():
+    """
+    Start the background watcher once per process (later calls are no-ops).
+    """
+    global _watcher
+    if _watcher is not None:
+        return _watcher
+    with _start_lock:
+        if _watcher is None:
+            interval = float(os.environ.get("HANVION_RELOAD_INTERVAL", DEFAULT_INTERVAL))
+            _watcher = Watcher(interval)
+            if interval > 0:
+                threading.Thread(target=_watcher.run, name="hanvion-data-reload", daemon=True).start()
+    return _watcher
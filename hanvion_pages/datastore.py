@@ -0,0 +1,259 @@
+import csv
+import hashlib
+import os
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# -----------------------------
+# Columnar store locations
+# -----------------------------
+STORE_DIR = "data/.cache"
+CMS_CSV = "data/cms_procedures.csv"
+CMS_STORE = os.path.join(STORE_DIR, "cms_procedures.arrow")
+STATE_XLSX = "data/tableA1.xlsx"
+STATE_STORE = os.path.join(STORE_DIR, "tableA1.arrow")
+
+CMS_COLUMNS = ["code", "description", "setting", "median_price",
+               "min_price", "max_price", "sample_size"]
+
+CMS_SCHEMA = pa.schema([
+    ("code", pa.string()),
+    ("description", pa.string()),
+    ("setting", pa.string()),
+    ("median_price", pa.float64()),
+    ("min_price", pa.float64()),
+    ("max_price", pa.float64()),
+    ("sample_size", pa.int64()),
+    ("price_spread", pa.float64()),
+    ("variation_ratio", pa.float64()),
+])
+
+BATCH_ROWS = 65536
+
+
+# -----------------------------
+# Arrow IPC helpers
+# -----------------------------
+def write_ipc(batches, path, schema, metadata=None):
+    """
+    Write record batches to an uncompressed Arrow IPC file.
+
+    The file is written next to its destination and renamed into place, so
+    readers never observe a half-written store.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if metadata:
+        schema = schema.with_metadata({k: str(v) for k, v in metadata.items()})
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    rows = 0
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+                rows += batch.num_rows
+    os.replace(tmp_path, path)
+    return rows
+
+
+def open_ipc(path):
+    """
+    Memory-map an Arrow IPC file and return it as a zero-copy Table.
+
+    Column buffers point straight into the page cache, so opening the store
+    costs the same no matter how many rows it holds.
+    """
+    source = pa.memory_map(path, "r")
+    return pa.ipc.open_file(source).read_all()
+
+
+def store_metadata(path):
+    """
+    Schema metadata of an IPC file, decoded to str -> str.
+    """
+    with pa.memory_map(path, "r") as source:
+        meta = pa.ipc.open_file(source).schema.metadata or {}
+    return {k.decode(): v.decode() for k, v in meta.items()}
+
+
+def is_fresh(store_path, source_path):
+    """
+    True when the store exists and is at least as new as its source file.
+    """
+    if not os.path.exists(store_path):
+        return False
+    if not os.path.exists(source_path):
+        return True
+    return os.path.getmtime(store_path) >= os.path.getmtime(source_path)
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def source_stamp(path):
+    """
+    Identity of a source file, recorded in a store's metadata.
+    """
+    st = os.stat(path)
+    return {
+        "source_mtime_ns": st.st_mtime_ns,
+        "source_size": st.st_size,
+        "source_sha256": file_sha256(path),
+    }
+
+
+# -----------------------------
+# CMS procedures: CSV -> Arrow
+# -----------------------------
+def split_cms_row(fields):
+    """
+    Map one raw CSV record onto the 7 CMS columns.
+
+    Hand-made extracts often leave commas in descriptions unquoted
+    ("Office visit, new patient"), so the first field is the code, the last
+    five are setting/prices/sample size and everything between is the
+    description.
+    """
+    if len(fields) > len(CMS_COLUMNS):
+        extra = len(fields) - len(CMS_COLUMNS)
+        description = ",".join(fields[1:2 + extra]).strip()
+        fields = [fields[0], description] + fields[2 + extra:]
+    return fields
+
+
+def _cms_batch(rows):
+    code, description, setting, median, low, high, sample = zip(*rows)
+
+    median = pa.array(median).cast(pa.float64())
+    low = pa.array(low).cast(pa.float64())
+    high = pa.array(high).cast(pa.float64())
+
+    # Derived columns are computed once here instead of on every load
+    spread = pc.subtract(high, low)
+    ratio = pc.round(pc.divide(high, low), 1)
+
+    return pa.record_batch([
+        pa.array(code, pa.string()),
+        pa.array(description, pa.string()),
+        pa.array(setting, pa.string()),
+        median,
+        low,
+        high,
+        pa.array(sample).cast(pa.float64()).cast(pa.int64()),
+        spread,
+        ratio,
+    ], schema=CMS_SCHEMA)
+
+
+def iter_cms_batches(csv_path, batch_rows=BATCH_ROWS):
+    """
+    Stream the CMS procedures CSV as Arrow record batches.
+    """
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = [h.strip() for h in next(reader)]
+        if header != CMS_COLUMNS:
+            raise ValueError(f"Unexpected CMS columns: {header}")
+
+        rows = []
+        for fields in reader:
+            if not fields:
+                continue
+            rows.append(split_cms_row(fields))
+            if len(rows) >= batch_rows:
+                yield _cms_batch(rows)
+                rows = []
+        if rows:
+            yield _cms_batch(rows)
+
+
+def build_cms_store(csv_path=CMS_CSV, store_path=CMS_STORE, batch_rows=BATCH_ROWS):
+    """
+    Convert the CMS procedures CSV into a memory-mappable Arrow IPC file.
+
+    Memory use is bounded by one batch, so national extracts with millions of
+    rows convert without loading the whole CSV.
+    """
+    return write_ipc(
+        iter_cms_batches(csv_path, batch_rows),
+        store_path,
+        CMS_SCHEMA,
+        metadata={"source": os.path.basename(csv_path)},
+    )
+
+
+def open_cms_store(csv_path=CMS_CSV, store_path=CMS_STORE):
+    """
+    Open the CMS store, rebuilding it first if the CSV has changed.
+    """
+    if not is_fresh(store_path, csv_path):
+        build_cms_store(csv_path, store_path)
+    return open_ipc(store_path)
+
+
+# -----------------------------
+# State coverage table: XLSX -> Arrow
+# -----------------------------
+def build_state_store(xlsx_path=STATE_XLSX, store_path=STATE_STORE):
+    """
+    Parse the state XLSX once and snapshot it as an Arrow IPC file.
+    """
+    import pandas as pd
+
+    table = pa.Table.from_pandas(pd.read_excel(xlsx_path), preserve_index=False)
+    write_ipc(table.to_batches(), store_path, table.schema.remove_metadata(),
+              metadata={"source": os.path.basename(xlsx_path), **source_stamp(xlsx_path)})
+    return table
+
+
+def open_state_store(xlsx_path=STATE_XLSX, store_path=STATE_STORE):
+    """
+    Open the state snapshot, re-parsing the XLSX only when its content changed.
+
+    An unchanged mtime and size means the snapshot is current. If they moved
+    (a fresh checkout, a copy) but the SHA-256 still matches, the snapshot is
+    restamped instead of rebuilt, so openpyxl is only paid for real edits.
+    """
+    if not os.path.exists(store_path):
+        return build_state_store(xlsx_path, store_path)
+    if not os.path.exists(xlsx_path):
+        return open_ipc(store_path)
+
+    meta = store_metadata(store_path)
+    st = os.stat(xlsx_path)
+    if (meta.get("source_mtime_ns") == str(st.st_mtime_ns)
+            and meta.get("source_size") == str(st.st_size)):
+        return open_ipc(store_path)
+
+    stamp = source_stamp(xlsx_path)
+    if meta.get("source_sha256") != stamp["source_sha256"]:
+        return build_state_store(xlsx_path, store_path)
+
+    table = open_ipc(store_path)
+    write_ipc(table.to_batches(), store_path, table.schema.remove_metadata(),
+              metadata={**meta, **stamp})
+    return table
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the columnar CMS procedure store.")
+    parser.add_argument("csv", nargs="?", default=CMS_CSV)
+    parser.add_argument("store", nargs="?", default=CMS_STORE)
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS)
+    parser.add_argument("--state", action="store_true",
+                        help=f"also snapshot {STATE_XLSX} into {STATE_STORE}")
+    args = parser.parse_args()
+
+    n = build_cms_store(args.csv, args.store, args.batch_rows)
+    print(f"Wrote {n} rows to {args.store}")
+    if args.state:
+        table = build_state_store()
+        print(f"Wrote {table.num_rows} rows to {STATE_STORE}")
@@ -1,5 +1,28 @@
 import streamlit as st
-import pandas as pd
+
+from hanvion_pages.components import Card, card_row
+
+# National cash price ranges, scaled to the visitor's locality
+VISIT_PRICE_RANGES = {
+    "Primary Care Visit": (85, 140),
+    "Specialist Visit": (140, 280),
+    "Urgent Care Visit": (120, 200),
+    "Telehealth Visit": (40, 85),
+}
+
+# A representative downtown ZIP for each city in the picker
+CITY_ZIPS = {
+    "Boston": "02115",
+    "New York": "10001",
+    "Chicago": "60601",
+    "Los Angeles": "90012",
+    "San Francisco": "94103",
+    "Houston": "77002",
+    "Dallas": "75201",
+    "Miami": "33130",
+    "Seattle": "98101",
+    "Atlanta": "30303",
+}
 
 def page_doctor_costs():
 
@@ -18,26 +41,42 @@ def page_doctor_costs():
     # ------------------------------
     # CITY SELECTION
     # ------------------------------
-    cities = ["Boston", "New York", "Chicago", "Los Angeles", "San Francisco",
-              "Houston", "Dallas", "Miami", "Seattle", "Atlanta"]
-
     st.markdown("<h3>Select City</h3>", unsafe_allow_html=True)
-    city = st.selectbox("City", cities)
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        city = st.selectbox("City", list(CITY_ZIPS))
+    with col2:
+        zip_code = st.text_input("Or enter a ZIP code", max_chars=10).strip()
+
+    # geo builds its index with pandas/numpy. The medication page imports it
+    # at module level because it loads that stack anyway; this page doesn't,
+    # so it imports geo here and stays light to import (benchmarks.startup)
+    from hanvion_pages.geo import load_geo_index
+
+    geo = load_geo_index()
+    place, price_zip = city, CITY_ZIPS[city]
+    if geo is not None and zip_code:
+        locality = geo.locality(zip_code)
+        if locality is None:
+            st.warning(f"ZIP code {zip_code} was not recognised; showing prices for {city}.")
+        else:
+            place = f"{locality['locality']}, {locality['state']}"
+            price_zip = zip_code
 
     # ------------------------------
     # VISIT TYPE
     # ------------------------------
-    visit_types = {
-        "Primary Care Visit": (85, 140),
-        "Specialist Visit": (140, 280),
-        "Urgent Care Visit": (120, 200),
-        "Telehealth Visit": (40, 85),
-    }
-
     st.markdown("<h3>Select Visit Type</h3>", unsafe_allow_html=True)
-    visit = st.selectbox("Visit Type", list(visit_types.keys()))
+    visit = st.selectbox("Visit Type", list(VISIT_PRICE_RANGES.keys()))
 
-    cash_low, cash_high = visit_types[visit]
+    national_low, national_high = VISIT_PRICE_RANGES[visit]
+    if geo is not None:
+        factor = geo.factor(price_zip)
+        cash_low, cash_high = geo.adjust(VISIT_PRICE_RANGES[visit], price_zip)
+    else:
+        factor, (cash_low, cash_high) = 1.0, VISIT_PRICE_RANGES[visit]
+    adjustment_note = (f"Local cost factor {factor:.2f}× the national range "
+                       f"of ${national_low} – ${national_high}.")
 
     # ------------------------------
     # INSURANCE STATUS
@@ -57,52 +96,20 @@ def page_doctor_costs():
 
     if insured.startswith("No"):
         # ---------------- CASH PAY VISIT -------------------
-        st.markdown(
-            f"""
-            <div class="hanvion-card">
-                <h4>Cash Price (Estimated)</h4>
-                <p style="font-size:28px; font-weight:700;">
-                    ${cash_low} – ${cash_high}
-                </p>
-                <p class="hanvion-text-muted">
-                    Typical price for a {visit.lower()} in {city} without insurance.
-                </p>
-            </div>
-            """,
-            unsafe_allow_html=True
+        card_row(
+            Card("Cash Price (Estimated)", f"${cash_low} – ${cash_high}",
+                 note=(f"Typical price for a {visit.lower()} in {place} without insurance.",
+                       adjustment_note)),
         )
 
     else:
         # ---------------- INSURED VISIT -------------------
         copay = 25 if visit != "Specialist Visit" else 45
 
-        st.markdown(
-            f"""
-            <div class="hanvion-card">
-                <h4>Insurance Copay (Estimated)</h4>
-                <p style="font-size:28px; font-weight:700;">
-                    ${copay}
-                </p>
-                <p class="hanvion-text-muted">
-                    Typical {visit.lower()} copay for insured patients.
-                </p>
-            </div>
-            """,
-            unsafe_allow_html=True
+        card_row(
+            Card("Insurance Copay (Estimated)", f"${copay}",
+                 note=f"Typical {visit.lower()} copay for insured patients."),
+            Card("Cash Price Range", f"${cash_low} – ${cash_high}",
+                 note=("Useful if your insurance does not cover this visit or the provider is out-of-network.",
+                       adjustment_note)),
         )
-
-        st.markdown(
-            f"""
-            <div class="hanvion-card">
-                <h4>Cash Price Range</h4>
-                <p style="font-size:28px; font-weight:700;">
-                    ${cash_low} – ${cash_high}
-                </p>
-                <p class="hanvion-text-muted">
-                    Useful if your insurance does not cover this visit or the provider is out-of-network.
-                </p>
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
-
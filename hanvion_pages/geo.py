@@ -0,0 +1,165 @@
+"""
+Geographic price adjustment: ZIP3 -> locality -> cost factor.
+
+data/geo_localities.csv lists ZIP3 ranges with the locality they belong to,
+a cost factor relative to the national average and a centroid. Ranges are
+applied widest first, so a metro row (Boston, 021-022) overrides its
+state's rest-of-state row (010-027). The result is two flat arrays: ZIP3 ->
+locality id (1000 entries) and locality id -> factor, so a lookup is two
+array reads and a whole price table can be adjusted for every locality in
+one broadcast.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from hanvion_pages.data_cache import cached_data
+
+GEO_CSV = "data/geo_localities.csv"
+NATIONAL = -1
+
+
+def zip3(zip_code):
+    """
+    ZIP3 prefix of a ZIP code ("02115", "02115-1234", 2115) or -1.
+    """
+    if isinstance(zip_code, (int, np.integer)):
+        return int(zip_code) // 100 if 0 <= zip_code <= 99999 else -1
+    digits = str(zip_code).strip()[:5]
+    if len(digits) != 5 or not digits.isdigit():
+        return -1
+    return int(digits[:3])
+
+
+class GeoIndex:
+    """
+    ZIP3 -> locality -> cost factor, held as arrays.
+    """
+
+    def __init__(self, localities, zip3_locality):
+        self.localities = localities.reset_index(drop=True)
+        self.zip3_locality = zip3_locality
+        self.factors = self.localities["factor"].to_numpy(np.float64)
+        self.coords = self.localities[["lat", "lon"]].to_numpy(np.float64)
+
+    @classmethod
+    def from_frame(cls, df):
+        df = df.copy()
+        df["zip3_start"] = df["zip3_start"].astype(int)
+        df["zip3_end"] = df["zip3_end"].astype(int)
+
+        # One locality per (state, name); it may own several ZIP3 ranges
+        localities = df.drop_duplicates(["state", "locality"])[
+            ["state", "locality", "factor", "lat", "lon"]
+        ].reset_index(drop=True)
+        ids = {key: i for i, key in enumerate(zip(localities["state"], localities["locality"]))}
+
+        zip3_locality = np.full(1000, NATIONAL, dtype=np.int16)
+        df["width"] = df["zip3_end"] - df["zip3_start"]
+        for row in df.sort_values("width", ascending=False, kind="stable").itertuples():
+            zip3_locality[row.zip3_start:row.zip3_end + 1] = ids[(row.state, row.locality)]
+        return cls(localities, zip3_locality)
+
+    @classmethod
+    def from_csv(cls, path=GEO_CSV):
+        return cls.from_frame(pd.read_csv(path, dtype={"zip3_start": str, "zip3_end": str}))
+
+    # -----------------------------
+    # Single lookups
+    # -----------------------------
+    def locality_id(self, zip_code):
+        z = zip3(zip_code)
+        return int(self.zip3_locality[z]) if z >= 0 else NATIONAL
+
+    def factor(self, zip_code):
+        """
+        Cost factor for a ZIP code; 1.0 (national) when it is unknown.
+        """
+        i = self.locality_id(zip_code)
+        return float(self.factors[i]) if i != NATIONAL else 1.0
+
+    def locality(self, zip_code):
+        """
+        Locality record (state, locality, factor, lat, lon) or None.
+        """
+        i = self.locality_id(zip_code)
+        if i == NATIONAL:
+            return None
+        return self.localities.iloc[i].to_dict()
+
+    def adjust(self, prices, zip_code):
+        """
+        Scale a price or a tuple of prices to a ZIP code, in whole dollars.
+        """
+        f = self.factor(zip_code)
+        if isinstance(prices, tuple):
+            return tuple(int(round(p * f)) for p in prices)
+        return int(round(prices * f))
+
+    # -----------------------------
+    # Bulk
+    # -----------------------------
+    def locality_ids(self, zip_codes):
+        """
+        Locality id for every ZIP in an array (ints or strings).
+        """
+        codes = pd.Series(zip_codes)
+        if pd.api.types.is_integer_dtype(codes):
+            z = codes.to_numpy() // 100
+            valid = (codes.to_numpy() >= 0) & (codes.to_numpy() <= 99999)
+        else:
+            text = codes.astype("string").str.strip().str.slice(0, 5)
+            valid = text.str.fullmatch(r"\d{5}").fillna(False).to_numpy()
+            z = pd.to_numeric(text.str.slice(0, 3).where(valid), errors="coerce").fillna(0).to_numpy(int)
+        return np.where(valid, self.zip3_locality[np.clip(z, 0, 999)], NATIONAL)
+
+    def factors_for(self, zip_codes):
+        ids = self.locality_ids(zip_codes)
+        return np.where(ids == NATIONAL, 1.0, self.factors[ids])
+
+    def adjust_table(self, base_prices):
+        """
+        Every locality's version of a price table at once:
+        (n_localities, *base_prices.shape).
+        """
+        base = np.asarray(base_prices, dtype=np.float64)
+        return self.factors.reshape((-1,) + (1,) * base.ndim) * base
+
+    def price_sheet(self, price_ranges):
+        """
+        Regional price sheet: one row per locality, a low and high column
+        per item of price_ranges (name -> (low, high)).
+        """
+        names = list(price_ranges)
+        base = np.array([price_ranges[n] for n in names], dtype=np.float64)
+        adjusted = np.rint(self.adjust_table(base)).astype(int)  # (localities, items, 2)
+
+        sheet = self.localities[["state", "locality", "factor"]].copy()
+        for j, name in enumerate(names):
+            sheet[f"{name} low"] = adjusted[:, j, 0]
+            sheet[f"{name} high"] = adjusted[:, j, 1]
+        return sheet
+
+
+@cached_data(sources=[GEO_CSV])
+def load_geo_index():
+    try:
+        return GeoIndex.from_csv()
+    except Exception as e:
+        st.error(f"Unable to load geographic adjustment table: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from hanvion_pages.doctor_costs import VISIT_PRICE_RANGES
+
+    parser = argparse.ArgumentParser(description="Write the regional doctor visit price sheet.")
+    parser.add_argument("out", help="CSV file to write")
+    parser.add_argument("--geo", default=GEO_CSV)
+    args = parser.parse_args()
+
+    sheet = GeoIndex.from_csv(args.geo).price_sheet(VISIT_PRICE_RANGES)
+    sheet.to_csv(args.out, index=False)
+    print(f"Wrote {len(sheet)} localities to {args.out}")
@@ -1,5 +1,7 @@
 import streamlit as st
-import pandas as pd
+
+from hanvion_pages.components import Card, card_row
+from hanvion_pages.recommendations import RECOMMENDATION_TEXTS
 
 def calculate_bmi(weight, height_cm):
     height_m = height_cm / 100
@@ -28,19 +30,19 @@ def prevention_recommendations(score, bmi_cat):
 
     # BMI based recommendations
     if bmi_cat in ["Overweight", "Obesity"]:
-        recommendations.append("Focus on moderate calorie reduction and daily walking.")
-        recommendations.append("Try to include vegetables, fruits, and lean proteins in meals.")
+        recommendations.append(RECOMMENDATION_TEXTS["walking"])
+        recommendations.append(RECOMMENDATION_TEXTS["diet"])
     elif bmi_cat == "Underweight":
-        recommendations.append("Increase healthy calorie intake and check for nutritional deficiencies.")
+        recommendations.append(RECOMMENDATION_TEXTS["calorie_intake"])
 
     # Lifestyle score recommendations
     if score < 70:
-        recommendations.append("Increase weekly physical activity to maintain a healthy lifestyle.")
-        recommendations.append("Aim for at least 6–8 hours of sleep daily.")
-        recommendations.append("Focus on building consistent daily habits.")
+        recommendations.append(RECOMMENDATION_TEXTS["activity"])
+        recommendations.append(RECOMMENDATION_TEXTS["sleep"])
+        recommendations.append(RECOMMENDATION_TEXTS["habits"])
 
     if score < 40:
-        recommendations.append("Consider speaking with a healthcare provider about stress or lifestyle concerns.")
+        recommendations.append(RECOMMENDATION_TEXTS["provider"])
 
     return recommendations
 
@@ -88,54 +90,15 @@ def page_health_profile():
     """, unsafe_allow_html=True)
 
     # Results section
-    st.markdown("""
-        <div style="display:flex; gap:25px; flex-wrap:wrap;">
-    """, unsafe_allow_html=True)
-
-    # BMI CARD
-    st.markdown(f"""
-        <div style="
-            flex:1; min-width:280px; 
-            background:#ffffff; padding:25px; border-radius:12px;
-            border:1px solid #eee; box-shadow:0px 4px 12px rgba(0,0,0,0.05);">
-            <h4 style="margin-top:0;">BMI Result</h4>
-            <p style="font-size:36px; font-weight:700; margin:10px 0;">{bmi}</p>
-            <p style="font-size:18px; color:#333;">Category: <b>{bmi_cat}</b></p>
-        </div>
-    """, unsafe_allow_html=True)
-
-    # Lifestyle score card
-    st.markdown(f"""
-        <div style="
-            flex:1; min-width:280px; 
-            background:#ffffff; padding:25px; border-radius:12px;
-            border:1px solid #eee; box-shadow:0px 4px 12px rgba(0,0,0,0.05);">
-            <h4 style="margin-top:0;">Lifestyle Score</h4>
-            <p style="font-size:36px; font-weight:700; margin:10px 0;">{score} / 100</p>
-            <p>Your lifestyle score is based on exercise, sleep, stress, and habits.</p>
-        </div>
-    """, unsafe_allow_html=True)
-
-    st.markdown("</div><br>", unsafe_allow_html=True)
+    card_row(
+        Card("BMI Result", str(bmi), rows=(("Category", bmi_cat),), large=True),
+        Card("Lifestyle Score", f"{score} / 100", large=True,
+             note="Your lifestyle score is based on exercise, sleep, stress, and habits."),
+    )
 
     # Recommendations card
-    st.markdown("""
-        <div style="
-            background:#f9faff; padding:25px;
-            border-radius:12px; border:1px solid #e0e3ff;">
-            <h4 style="margin-top:0;">Personalized Recommendations</h4>
-    """, unsafe_allow_html=True)
-
     if recs:
-        for r in recs:
-            st.markdown(
-                f"<p style='font-size:16px; margin-bottom:8px;'>&#8226; {r}</p>",
-                unsafe_allow_html=True,
-            )
+        card_row(Card("Personalized Recommendations", items=tuple(recs), tinted=True))
     else:
-        st.markdown(
-            "<p style='color:#666;'>You seem to have a healthy balance. Maintain your current habits.</p>",
-            unsafe_allow_html=True,
-        )
-
-    st.markdown("</div>", unsafe_allow_html=True)
+        card_row(Card("Personalized Recommendations", tinted=True,
+                      note="You seem to have a healthy balance. Maintain your current habits."))
@@ -2,32 +2,68 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 
+from hanvion_pages.claims import (
+    BASE_VISIT_COSTS,
+    DEFAULT_PLAN_GRID,
+    SWEEP_YEARS,
+    pareto_frontier,
+    plan_grid,
+    price_premiums,
+    price_sigmas,
+    sample_claim_years,
+    simulate_annual_spend,
+    sweep_plans,
+)
+from hanvion_pages.cms_costs import load_cms_data
+from hanvion_pages.components import Card, card_row
+from hanvion_pages.data_cache import cached_data
+from hanvion_pages.data_reload import clear_on_change
+from hanvion_pages.datastore import CMS_CSV, STATE_XLSX
+from hanvion_pages.metrics import page_fragment
+from hanvion_pages.shared_data import INSURANCE_CSV, shared_table
+
+DEFAULT_STATE_ROW = {"insured_rate": 88.0, "uninsured_rate": 12.0}
+
+# This page's label in app.py's PAGES, under which fragment reruns are timed
+PAGE_LABEL = "Insurance Eligibility"
+
 # -----------------------------
 # Load datasets
 # -----------------------------
-@st.cache_data
+@cached_data(sources=[INSURANCE_CSV])
 def load_insurance_data():
     try:
-        df = pd.read_csv("data/insurance.csv")
+        df = shared_table("insurance").to_pandas()
         return df
     except:
         return None
 
-@st.cache_data
+@cached_data(sources=[STATE_XLSX])
 def load_state_data():
     try:
-        df = pd.read_excel("data/tableA1.xlsx")
+        # Arrow snapshot of tableA1.xlsx; the XLSX is only parsed when it changes
+        df = shared_table("state").to_pandas()
         return df
     except:
         return None
 
+@cached_data(sources=[STATE_XLSX])
+def load_state_lookup():
+    """
+    state -> row dict, built once so per-rerun lookups are a dict get.
+    """
+    df = load_state_data()
+    if df is None:
+        return {}
+    return {row["state"]: row for row in df.to_dict("records")}
+
 
 # -----------------------------
 # Insurance Likelihood Logic
 # -----------------------------
 def insurance_likelihood(age, sex, state_row):
     # state_row should contain insured_rate / uninsured_rate
-    uninsured_rate = state_row.get("uninsured_rate", 12.0)
+    uninsured_rate = state_row.get("uninsured_rate", DEFAULT_STATE_ROW["uninsured_rate"])
     base = 100 - uninsured_rate   # base coverage
 
     if age < 26:
@@ -44,14 +80,6 @@ def insurance_likelihood(age, sex, state_row):
 # -----------------------------
 # Visit cost / deductible logic
 # -----------------------------
-BASE_VISIT_COSTS = {
-    "Primary Care Visit": 140,
-    "Urgent Care Visit": 220,
-    "Specialist Visit": 260,
-    "Telehealth Visit": 80,
-    "Emergency Room Visit": 1800,
-}
-
 def simulate_visit_payment(visit_type,
                            in_network: bool,
                            has_insurance: bool,
@@ -128,6 +156,62 @@ def estimate_annual_spend(visits_pc, visits_uc, visits_er, meds_monthly,
     return int(total_self), with_ins
 
 
+@st.cache_data(max_entries=256)
+def annual_spend_distribution(visits_pc, visits_uc, visits_er, meds_monthly,
+                              has_insurance, in_network, deductible, oop_max,
+                              coinsurance_pct, copay):
+    """
+    Simulated annual spend (mean, p50/p90/p99) for the Section 4 inputs.
+    """
+    return simulate_annual_spend(
+        visits_pc, visits_uc, visits_er, meds_monthly, has_insurance,
+        in_network, deductible, oop_max, coinsurance_pct, copay,
+        sigmas=price_sigmas(load_cms_data()),
+    )
+
+
+@st.cache_data(max_entries=8)
+def grid_premiums(deductibles, oop_maxes, coinsurances, copays):
+    """
+    Modelled premiums for a plan grid; they do not depend on the visitor.
+    """
+    plans = plan_grid(deductible=deductibles, oop_max=oop_maxes,
+                      coinsurance_pct=coinsurances, copay=copays)
+    return price_premiums(plans)
+
+
+@st.cache_data(max_entries=64)
+def plan_comparison(visits_pc, visits_uc, visits_er, meds_monthly, in_network,
+                    deductibles, oop_maxes, coinsurances, copays):
+    """
+    Every plan in the grid priced against the Section 4 usage profile.
+    """
+    plans = plan_grid(deductible=deductibles, oop_max=oop_maxes,
+                      coinsurance_pct=coinsurances, copay=copays)
+    plans["premium"] = grid_premiums(deductibles, oop_maxes, coinsurances, copays)
+    sim = sample_claim_years(
+        {
+            "Primary Care Visit": visits_pc,
+            "Urgent Care Visit": visits_uc,
+            "Emergency Room Visit": visits_er,
+        },
+        meds_monthly, SWEEP_YEARS, sigmas=price_sigmas(load_cms_data()),
+    )
+    plans = sweep_plans(sim, plans, in_network)
+    plans["frontier"] = pareto_frontier(plans["premium"], plans["worst_case"])
+    return plans
+
+
+# Both simulate with price spreads taken from the CMS table
+clear_on_change(CMS_CSV, annual_spend_distribution.clear, plan_comparison.clear)
+
+
+def plan_label(plan):
+    oop = f"${int(plan['oop_max']):,} OOP max" if plan["oop_max"] > 0 else "no OOP max"
+    return (f"${int(plan['deductible']):,} deductible • {int(plan['coinsurance_pct'])}% coinsurance • "
+            f"${int(plan['copay'])} copay • {oop}")
+
+
 # -----------------------------
 # Plan types table
 # -----------------------------
@@ -145,17 +229,38 @@ def plan_types_dataframe():
 # -----------------------------
 # UI
 # -----------------------------
-def page_insurance_checker():
-    df_insurance = load_insurance_data()
-    df_state = load_state_data()
+# Sections 1-2 and 3-4 are fragments: a widget inside one re-runs only that
+# fragment. Inputs another section reads are shared through the widgets'
+# session_state keys.
+def start_full_run():
+    """
+    Number this full run of the page. Fragment reruns see the number of the
+    full run they follow, which is how rerun_page_if_changed tells them
+    apart from the page's own runs.
+    """
+    st.session_state["ins_full_run"] = st.session_state.get("ins_full_run", 0) + 1
 
-    st.markdown("""
-        <h1 style="font-size: 36px; font-weight: 700;">Insurance Eligibility & Cost Tools</h1>
-        <p style="font-size: 17px; max-width: 780px; color: #555;">
-            A single workspace to understand your insurance coverage patterns, visit costs,
-            deductibles, and annual medical spending — especially if you are new to the U.S.
-        </p><br>
-    """, unsafe_allow_html=True)
+
+def rerun_page_if_changed(key, values):
+    """
+    Rerun the whole page when a fragment rerun changed `values`.
+
+    A fragment rerun only redraws its fragment. Sections outside it that
+    read these values (through their widgets' session_state keys) would show
+    the old ones until the next full run, so one is forced. A full run
+    renders every section anyway and only records the values.
+    """
+    run = st.session_state["ins_full_run"]
+    previous = st.session_state.get(key)
+    st.session_state[key] = (run, values)
+    if previous is not None and previous[0] == run and previous[1] != values:
+        st.rerun()
+
+
+@st.fragment
+@page_fragment(PAGE_LABEL)
+def profile_section():
+    states = load_state_lookup()
 
     # -----------------------------
     # Section 1: Basic Profile
@@ -168,25 +273,28 @@ def page_insurance_checker():
 
     col1, col2, col3 = st.columns(3)
     with col1:
-        age = st.number_input("Age", 1, 100, 25)
+        age = st.number_input("Age", 1, 100, 25, key="ins_age")
     with col2:
-        sex = st.selectbox("Sex", ["Male", "Female"])
+        sex = st.selectbox("Sex", ["Male", "Female"], key="ins_sex")
     with col3:
-        state = st.selectbox("State (for uninsured rate)", df_state["state"].tolist() if df_state is not None else ["NA"])
+        state = st.selectbox("State (for uninsured rate)", list(states) or ["NA"], key="ins_state")
 
     col4, col5 = st.columns(2)
     with col4:
-        international = st.selectbox("Are you an international student?", ["No", "Yes"])
+        international = st.selectbox("Are you an international student?", ["No", "Yes"],
+                                     key="ins_international")
     with col5:
-        visit_type = st.selectbox("Planned Visit Type", list(BASE_VISIT_COSTS.keys()))
+        visit_type = st.selectbox("Planned Visit Type", list(BASE_VISIT_COSTS.keys()),
+                                  key="ins_visit_type")
 
     st.markdown("</div><br>", unsafe_allow_html=True)
 
+    # Visit type (Section 3) and student status (Section 5) are read outside
+    # this fragment
+    rerun_page_if_changed("ins_profile_shared", (international, visit_type))
+
     # State row
-    if df_state is not None:
-        state_row = df_state[df_state["state"] == state].iloc[0].to_dict()
-    else:
-        state_row = {"insured_rate": 88.0, "uninsured_rate": 12.0}
+    state_row = states.get(state, DEFAULT_STATE_ROW)
 
     # Insurance likelihood
     likelihood = insurance_likelihood(age, sex, state_row)
@@ -196,42 +304,23 @@ def page_insurance_checker():
     # -----------------------------
     st.markdown("""
         <h3 style="font-weight:700;">2. Coverage Likelihood & State Overview</h3>
-        <div style="display:flex; gap:25px; flex-wrap:wrap;">
     """, unsafe_allow_html=True)
 
-    st.markdown(f"""
-        <div style="
-            flex:1; min-width:260px; background:#ffffff; padding:25px;
-            border-radius:12px; border:1px solid #eee;
-            box-shadow:0px 4px 12px rgba(0,0,0,0.05);">
-            <h4 style="margin-top:0;">Insurance Coverage Likelihood</h4>
-            <p style="font-size:32px; font-weight:700; margin:6px 0;">
-                {likelihood}%
-            </p>
-            <p style="font-size:13px; color:#777;">
-                Estimated from state uninsured data, age, and sex patterns.
-                This is not a guarantee, but an educational reference.
-            </p>
-        </div>
-    """, unsafe_allow_html=True)
+    card_row(
+        Card("Insurance Coverage Likelihood", f"{likelihood}%", large=True,
+             note="Estimated from state uninsured data, age, and sex patterns. "
+                  "This is not a guarantee, but an educational reference."),
+        Card("State Insurance Snapshot",
+             rows=((f"{state} insured rate", f"{state_row.get('insured_rate', 'NA')}%"),
+                   ("Uninsured rate", f"{state_row.get('uninsured_rate', 'NA')}%")),
+             note="States with higher uninsured rates often have more variation in self-pay pricing."),
+    )
 
-    st.markdown(f"""
-        <div style="
-            flex:1; min-width:260px; background:#ffffff; padding:25px;
-            border-radius:12px; border:1px solid #eee;
-            box-shadow:0px 4px 12px rgba(0,0,0,0.05);">
-            <h4 style="margin-top:0;">State Insurance Snapshot</h4>
-            <p>
-                <b>{state}</b> insured rate: <b>{state_row.get('insured_rate', 'NA')}%</b><br>
-                Uninsured rate: <b>{state_row.get('uninsured_rate', 'NA')}%</b>
-            </p>
-            <p style="font-size:13px; color:#777;">
-                States with higher uninsured rates often have more variation in self-pay pricing.
-            </p>
-        </div>
-    """, unsafe_allow_html=True)
 
-    st.markdown("</div><br>", unsafe_allow_html=True)
+@st.fragment
+@page_fragment(PAGE_LABEL)
+def visit_cost_section():
+    visit_type = st.session_state["ins_visit_type"]
 
     # -----------------------------
     # Section 3: Deductible & Visit Cost Simulator
@@ -244,17 +333,18 @@ def page_insurance_checker():
 
     c1, c2, c3 = st.columns(3)
     with c1:
-        has_insurance_str = st.selectbox("Do you have insurance?", ["Yes", "No"])
+        has_insurance_str = st.selectbox("Do you have insurance?", ["Yes", "No"], key="ins_has_insurance")
         has_insurance = has_insurance_str == "Yes"
-        in_network_str = st.selectbox("Provider network", ["In-network", "Out-of-network"])
+        in_network_str = st.selectbox("Provider network", ["In-network", "Out-of-network"],
+                                      key="ins_network")
         in_network = in_network_str == "In-network"
     with c2:
-        deductible = st.number_input("Annual deductible ($)", 0, 10000, 1500)
-        deductible_met = st.number_input("Deductible already met ($)", 0, 10000, 0)
+        deductible = st.number_input("Annual deductible ($)", 0, 10000, 1500, key="ins_deductible")
+        deductible_met = st.number_input("Deductible already met ($)", 0, 10000, 0, key="ins_deductible_met")
     with c3:
-        oop_max = st.number_input("Out-of-pocket max ($)", 0, 20000, 5000)
-        coinsurance_pct = st.slider("Coinsurance (%)", 0, 50, 20)
-        copay = st.number_input("Copay per visit ($)", 0, 200, 30)
+        oop_max = st.number_input("Out-of-pocket max ($)", 0, 20000, 5000, key="ins_oop_max")
+        coinsurance_pct = st.slider("Coinsurance (%)", 0, 50, 20, key="ins_coinsurance")
+        copay = st.number_input("Copay per visit ($)", 0, 200, 30, key="ins_copay")
 
     # Compute visit payment
     allowed, plan_pays, patient_pays = simulate_visit_payment(
@@ -270,43 +360,29 @@ def page_insurance_checker():
 
     cash_price = BASE_VISIT_COSTS.get(visit_type, 150)
 
-    st.markdown("<br>", unsafe_allow_html=True)
-    d1, d2, d3 = st.columns(3)
-    with d1:
-        st.markdown(f"""
-            <div style="
-                background:#ffffff; padding:18px; border-radius:10px;
-                border:1px solid #eee;">
-                <h4 style="margin-top:0;">Typical Billed Amount</h4>
-                <p style="font-size:24px; font-weight:700;">${cash_price}</p>
-                <p style="font-size:12px; color:#777;">Average national charge before discounts.</p>
-            </div>
-        """, unsafe_allow_html=True)
-    with d2:
-        st.markdown(f"""
-            <div style="
-                background:#ffffff; padding:18px; border-radius:10px;
-                border:1px solid #eee;">
-                <h4 style="margin-top:0;">Allowed Amount (after contracts)</h4>
-                <p style="font-size:24px; font-weight:700;">${int(allowed)}</p>
-                <p style="font-size:12px; color:#777;">In-network discounted rate if applicable.</p>
-            </div>
-        """, unsafe_allow_html=True)
-    with d3:
-        st.markdown(f"""
-            <div style="
-                background:#ffffff; padding:18px; border-radius:10px;
-                border:1px solid #eee;">
-                <h4 style="margin-top:0;">Your Estimated Payment</h4>
-                <p style="font-size:24px; font-weight:700;">${int(patient_pays)}</p>
-                <p style="font-size:12px; color:#777;">
-                    Based on deductible, coinsurance, copay, and network.
-                </p>
-            </div>
-        """, unsafe_allow_html=True)
+    card_row(
+        Card("Typical Billed Amount", f"${cash_price}",
+             note="Average national charge before discounts."),
+        Card("Allowed Amount (after contracts)", f"${int(allowed)}",
+             note="In-network discounted rate if applicable."),
+        Card("Your Estimated Payment", f"${int(patient_pays)}",
+             note="Based on deductible, coinsurance, copay, and network."),
+    )
 
     st.markdown("</div><br>", unsafe_allow_html=True)
 
+    # Section 4 prices years with this plan, so it is nested here: a plan
+    # change re-runs both, a Section 4 input re-runs Section 4 alone.
+    annual_spend_section()
+
+
+@st.fragment
+@page_fragment(PAGE_LABEL)
+def annual_spend_section():
+    ss = st.session_state
+    has_insurance = ss["ins_has_insurance"] == "Yes"
+    in_network = ss["ins_network"] == "In-network"
+
     # -----------------------------
     # Section 4: Insurance vs No-insurance & Annual Spend
     # -----------------------------
@@ -318,55 +394,157 @@ def page_insurance_checker():
 
     a1, a2 = st.columns(2)
     with a1:
-        pc_visits = st.number_input("Primary care visits per year", 0, 20, 2)
-        uc_visits = st.number_input("Urgent care visits per year", 0, 10, 1)
+        pc_visits = st.number_input("Primary care visits per year", 0, 20, 2, key="ins_visits_pc")
+        uc_visits = st.number_input("Urgent care visits per year", 0, 10, 1, key="ins_visits_uc")
     with a2:
-        er_visits = st.number_input("Emergency room visits per year", 0, 5, 0)
-        meds_month = st.number_input("Monthly prescriptions filled", 0, 20, 1)
+        er_visits = st.number_input("Emergency room visits per year", 0, 5, 0, key="ins_visits_er")
+        meds_month = st.number_input("Monthly prescriptions filled", 0, 20, 1, key="ins_meds_monthly")
 
-    annual_self, annual_ins = estimate_annual_spend(
-        pc_visits, uc_visits, er_visits, meds_month, has_insurance
+    spend = annual_spend_distribution(
+        pc_visits, uc_visits, er_visits, meds_month, has_insurance,
+        in_network, float(ss["ins_deductible"]), float(ss["ins_oop_max"]),
+        int(ss["ins_coinsurance"]), float(ss["ins_copay"]),
     )
+    annual_self = spend["self_pay"]
+    annual_ins = spend["insured"]
 
-    st.markdown("<br>", unsafe_allow_html=True)
-    e1, e2 = st.columns(2)
-    with e1:
-        st.markdown(f"""
-            <div style="
-                background:#ffffff; padding:18px; border-radius:10px;
-                border:1px solid #eee;">
-                <h4 style="margin-top:0;">Estimated Annual Cost Without Insurance</h4>
-                <p style="font-size:26px; font-weight:700;">${annual_self}</p>
-            </div>
-        """, unsafe_allow_html=True)
-    with e2:
-        if annual_ins is not None:
-            savings = annual_self - annual_ins
-            st.markdown(f"""
-                <div style="
-                    background:#ffffff; padding:18px; border-radius:10px;
-                    border:1px solid #eee;">
-                    <h4 style="margin-top:0;">Estimated Annual Cost With Insurance</h4>
-                    <p style="font-size:26px; font-weight:700;">${annual_ins}</p>
-                    <p style="font-size:13px; color:#777;">
-                        Approximate potential savings: ${savings}
-                    </p>
-                </div>
-            """, unsafe_allow_html=True)
-        else:
-            st.markdown("""
-                <div style="
-                    background:#ffffff; padding:18px; border-radius:10px;
-                    border:1px solid #eee;">
-                    <h4 style="margin-top:0;">Insurance Not Selected</h4>
-                    <p style="font-size:13px; color:#777;">
-                        Turn on "Do you have insurance?" above to compare annual costs.
-                    </p>
-                </div>
-            """, unsafe_allow_html=True)
+    self_card = Card(
+        "Estimated Annual Cost Without Insurance", f"${int(annual_self['mean'])}",
+        note=f"Typical year: ${int(annual_self['p50'])} • 1 in 10 years above ${int(annual_self['p90'])}",
+    )
+    if annual_ins is not None:
+        savings = int(annual_self["mean"] - annual_ins["mean"])
+        ins_card = Card(
+            "Estimated Annual Cost With Insurance", f"${int(annual_ins['mean'])}",
+            note=(f"Typical year: ${int(annual_ins['p50'])} • Bad year (p90): ${int(annual_ins['p90'])} • "
+                  f"Worst 1% (p99): ${int(annual_ins['p99'])}",
+                  f"Approximate potential savings: ${savings}"),
+        )
+    else:
+        ins_card = Card("Insurance Not Selected",
+                        note='Turn on "Do you have insurance?" above to compare annual costs.')
+    card_row(self_card, ins_card)
+
+    # Spread of simulated years
+    labels = ["Mean", "P50", "P90", "P99"]
+    spread = pd.DataFrame(
+        {"Without insurance": [annual_self[k] for k in ("mean", "p50", "p90", "p99")]},
+        index=labels,
+    )
+    if annual_ins is not None:
+        spread["With insurance"] = [annual_ins[k] for k in ("mean", "p50", "p90", "p99")]
+    st.bar_chart(spread, stack=False)
+    st.caption(
+        "Based on 100,000 simulated years of visits and prescriptions, priced with "
+        "your plan's deductible, coinsurance, copay and out-of-pocket maximum."
+    )
 
     st.markdown("</div><br>", unsafe_allow_html=True)
 
+    # Grid choices re-run only the comparison
+    plan_compare_section()
+
+
+@st.fragment
+@page_fragment(PAGE_LABEL)
+def plan_compare_section():
+    ss = st.session_state
+
+    st.markdown("""
+        <h4 style="font-weight:700;">Compare plans for this usage</h4>
+        <p style="font-size:14px; color:#666;">
+            Every combination of the options below is priced against the same simulated years.
+            Premiums are modelled from each plan's generosity, not quoted.
+        </p>
+    """, unsafe_allow_html=True)
+
+    g1, g2, g3, g4 = st.columns(4)
+    with g1:
+        deductibles = st.multiselect("Deductibles ($)", DEFAULT_PLAN_GRID["deductible"],
+                                     DEFAULT_PLAN_GRID["deductible"], key="ins_grid_deductible")
+    with g2:
+        oop_maxes = st.multiselect("OOP maximums ($)", DEFAULT_PLAN_GRID["oop_max"],
+                                   DEFAULT_PLAN_GRID["oop_max"], key="ins_grid_oop_max")
+    with g3:
+        coinsurances = st.multiselect("Coinsurance (%)", DEFAULT_PLAN_GRID["coinsurance_pct"],
+                                      DEFAULT_PLAN_GRID["coinsurance_pct"], key="ins_grid_coinsurance")
+    with g4:
+        copays = st.multiselect("Copays ($)", DEFAULT_PLAN_GRID["copay"],
+                                DEFAULT_PLAN_GRID["copay"], key="ins_grid_copay")
+
+    if not (deductibles and oop_maxes and coinsurances and copays):
+        st.info("Pick at least one value in each column to compare plans.")
+        return
+
+    plans = plan_comparison(
+        ss["ins_visits_pc"], ss["ins_visits_uc"], ss["ins_visits_er"], ss["ins_meds_monthly"],
+        ss["ins_network"] == "In-network",
+        tuple(sorted(deductibles)), tuple(sorted(oop_maxes)),
+        tuple(sorted(coinsurances)), tuple(sorted(copays)),
+    )
+    if plans.empty:
+        st.info("Every combination has a deductible above its OOP maximum.")
+        return
+
+    # Ties are common (a copay never applies below the deductible), so each
+    # pick breaks them on the other measure
+    cheapest = plans.sort_values(["expected_cost", "worst_case"]).iloc[0]
+    safest = plans.sort_values(["worst_case", "expected_cost"]).iloc[0]
+    frontier = (plans[plans["frontier"]]
+                .sort_values(["premium", "expected_cost"])
+                .drop_duplicates(["premium", "worst_case"]))
+
+    card_row(
+        Card("Lowest Expected Annual Cost", f"${int(cheapest['expected_cost']):,}",
+             note=(plan_label(cheapest),
+                   f"Premium ${int(cheapest['premium']):,} + expected out-of-pocket "
+                   f"${int(cheapest['expected_oop']):,}")),
+        Card("Lowest Worst-Case Year", f"${int(safest['worst_case']):,}",
+             note=(plan_label(safest), "Premium plus the most you could pay out of pocket.")),
+        Card("Plans Compared", f"{len(plans):,}",
+             note=f"{len(frontier)} sit on the premium vs worst-case frontier."),
+    )
+
+    chart = pd.DataFrame({
+        "Annual premium ($)": plans["premium"],
+        "Worst-case year ($)": plans["worst_case"],
+        "Plan": np.where(plans["frontier"], "Frontier", "Dominated"),
+    })
+    st.scatter_chart(chart, x="Annual premium ($)", y="Worst-case year ($)", color="Plan")
+
+    st.dataframe(
+        pd.DataFrame({
+            "Plan": [plan_label(p) for _, p in frontier.iterrows()],
+            "Premium ($)": frontier["premium"].round().astype(int),
+            "Expected total ($)": frontier["expected_cost"].round().astype(int),
+            "Bad year total, p90 ($)": (frontier["premium"] + frontier["p90_oop"]).round().astype(int),
+            "Worst case ($)": frontier["worst_case"].round().astype(int),
+        }),
+        hide_index=True,
+        use_container_width=True,
+    )
+    st.caption(
+        "A frontier plan has no alternative that is both cheaper to hold and cheaper in a worst-case year."
+    )
+
+
+def page_insurance_checker():
+    df_insurance = load_insurance_data()
+
+    st.markdown("""
+        <h1 style="font-size: 36px; font-weight: 700;">Insurance Eligibility & Cost Tools</h1>
+        <p style="font-size: 17px; max-width: 780px; color: #555;">
+            A single workspace to understand your insurance coverage patterns, visit costs,
+            deductibles, and annual medical spending — especially if you are new to the U.S.
+        </p><br>
+    """, unsafe_allow_html=True)
+
+    start_full_run()
+    profile_section()
+    visit_cost_section()
+
+    international = st.session_state["ins_international"]
+
     # -----------------------------
     # Section 5: International Student Advisor
     # -----------------------------
@@ -1,5 +1,161 @@
+import os
+
+import numpy as np
 import streamlit as st
-import pandas as pd
+
+from hanvion_pages.cms_search import prefix_range
+from hanvion_pages.components import Card, card_row
+from hanvion_pages.data_cache import cached_data
+from hanvion_pages.geo import load_geo_index
+from hanvion_pages.pharmacy_prices import PHARMACY_CSV, PHARMACY_PRICE_CSV, PharmacyPrices
+from hanvion_pages.shared_data import GOODRX_CSV, attach, shared_table
+
+SEARCH_RADII = [5, 10, 25, 50]
+NEARBY_LIMIT = 10
+SEARCH_LIMIT = 200
+ALL_CONDITIONS = "All conditions"
+
+
+# -----------------------------
+# Load dataset
+# -----------------------------
+class MedicationPrices:
+    """
+    GoodRx-style price table keyed by (drug, strength), with a name prefix
+    index and a condition -> products index built once per load.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        records = df.to_dict("records")
+        self.by_key = {(r["drug"], r["strength"]): r for r in records}
+
+        self.strengths = {}
+        self.by_condition = {}
+        for r in records:
+            self.strengths.setdefault(r["drug"], []).append(r["strength"])
+            for condition in _split_conditions(r.get("conditions")):
+                self.by_condition.setdefault(condition, {}).setdefault(r["drug"], []).append(r["strength"])
+        self.drugs = sorted(self.strengths)
+        self.conditions = sorted(self.by_condition, key=str.lower)
+        self.by_condition = {c: dict(sorted(drugs.items())) for c, drugs in self.by_condition.items()}
+
+        # Every word start of every name ("insulin glargine", "glargine"),
+        # lower-cased and sorted, so a prefix is two binary searches
+        keys, owners = [], []
+        for i, drug in enumerate(self.drugs):
+            words = drug.lower().split()
+            for j in range(len(words)):
+                keys.append(" ".join(words[j:]))
+                owners.append(i)
+        order = np.argsort(np.array(keys, dtype=str), kind="stable")
+        self.name_keys = np.array(keys, dtype=str)[order]
+        self.name_owners = np.array(owners, dtype=np.int64)[order]
+
+    def lookup(self, drug, strength):
+        return self.by_key.get((drug, strength))
+
+    def search(self, prefix, limit=None):
+        """
+        Drugs with a word starting with prefix (case-insensitive), by name.
+        """
+        prefix = " ".join(prefix.lower().split())
+        if not prefix:
+            return self.drugs[:limit]
+        lo, hi = prefix_range(self.name_keys, prefix)
+        return [self.drugs[i] for i in np.unique(self.name_owners[lo:hi])[:limit]]
+
+    def for_condition(self, condition):
+        """
+        {drug: [strengths]} listed for a condition, by drug name.
+        """
+        return self.by_condition.get(condition, {})
+
+
+def _split_conditions(value):
+    if not isinstance(value, str):
+        return []
+    return [c.strip() for c in value.split("|") if c.strip()]
+
+
+# Read-only and shared by every session, so one parse per process
+@cached_data(sources=[GOODRX_CSV])
+def load_medication_prices():
+    try:
+        return MedicationPrices(shared_table("goodrx").to_pandas())
+    except Exception as e:
+        st.error(f"Unable to load medication prices dataset: {e}")
+        return None
+
+
+@cached_data(sources=[PHARMACY_CSV, PHARMACY_PRICE_CSV])
+def load_pharmacy_prices():
+    """
+    Per-pharmacy prices and locations, or None when the files are absent.
+    """
+    if not (os.path.exists(PHARMACY_CSV) and os.path.exists(PHARMACY_PRICE_CSV)):
+        return None
+    try:
+        return PharmacyPrices.from_parts(attach("pharmacy_prices"))
+    except Exception as e:
+        st.error(f"Unable to load pharmacy prices: {e}")
+        return None
+
+
+def locate_zip(pharmacies, zip_code):
+    """
+    (lat, lon, description) for a ZIP: the pharmacies in that ZIP if there
+    are any, else the centroid of its locality; None if unknown.
+    """
+    point = pharmacies.locate(zip_code)
+    if point is not None:
+        return (*point, f"ZIP {zip_code}")
+    geo = load_geo_index()
+    locality = geo.locality(zip_code) if geo is not None else None
+    if locality is None:
+        return None
+    return locality["lat"], locality["lon"], f"{locality['locality']}, {locality['state']}"
+
+
+def nearby_section(med_name, strength):
+    pharmacies = load_pharmacy_prices()
+    if pharmacies is None:
+        return
+
+    st.divider()
+    st.markdown("<h2>Cheapest Pharmacies Near You</h2>", unsafe_allow_html=True)
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        zip_code = st.text_input("ZIP code", max_chars=10, key="med_zip").strip()
+    with col2:
+        radius = st.selectbox("Within", SEARCH_RADII, index=1, format_func=lambda r: f"{r} miles")
+    if not zip_code:
+        return
+
+    place = locate_zip(pharmacies, zip_code)
+    if place is None:
+        st.warning(f"ZIP code {zip_code} was not recognised.")
+        return
+    lat, lon, label = place
+
+    nearby = pharmacies.cheapest_near(med_name, strength, lat, lon, radius, NEARBY_LIMIT)
+    if nearby.empty:
+        st.info(f"No pharmacy within {radius} miles of {label} lists {med_name} {strength}.")
+        return
+
+    best = nearby.iloc[0]
+    card_row(
+        Card("Lowest Discount Price", f"${best['discount_price']:.2f}",
+             note=f"{best['name']}, {best['miles']:.1f} miles from {label}."),
+        Card("Cash Price There", f"${best['cash_price']:.2f}",
+             note="Walk-in price at the same pharmacy without a discount program."),
+    )
+    st.dataframe(
+        nearby.rename(columns={"name": "Pharmacy", "chain": "Chain", "zip": "ZIP", "miles": "Miles",
+                               "cash_price": "Cash", "discount_price": "Discount"}),
+        hide_index=True, use_container_width=True,
+    )
+
 
 def page_medication_prices():
 
@@ -18,21 +174,42 @@ def page_medication_prices():
     # ------------------------------
     # LOAD DATA
     # ------------------------------
-    df = pd.read_csv("data/goodrx_prices.csv")
-
-    # The medication column is called **drug**
-    drug_list = sorted(df["drug"].unique())
+    prices = load_medication_prices()
+    if prices is None:
+        return
 
     # ------------------------------
     # MEDICATION SELECTOR
     # ------------------------------
     st.markdown("<h3>Select Medication</h3>", unsafe_allow_html=True)
-    med_name = st.selectbox("Medication", drug_list)
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        query = st.text_input("Search by name", placeholder="e.g. metf", key="med_search")
+    with col2:
+        condition = st.selectbox("Or browse by condition", [ALL_CONDITIONS] + prices.conditions)
+
+    # Options come from the prebuilt indexes, not a scan of the table
+    if condition == ALL_CONDITIONS:
+        strengths = prices.strengths
+        options = prices.search(query, SEARCH_LIMIT)
+    else:
+        strengths = prices.for_condition(condition)
+        matches = set(prices.search(query)) if query.strip() else strengths
+        options = [drug for drug in strengths if drug in matches][:SEARCH_LIMIT]
+    if not options:
+        st.info(f"No medication matches \"{query.strip()}\"."
+                if condition == ALL_CONDITIONS else
+                f"No medication for {condition} matches \"{query.strip()}\".")
+        return
 
-    # Filter matching row
-    med_row = df[df["drug"] == med_name].iloc[0]
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        med_name = st.selectbox("Medication", options)
+    with col2:
+        strength = st.selectbox("Strength", strengths[med_name])
+
+    med_row = prices.lookup(med_name, strength)
 
-    strength = med_row["strength"]
     cash_low = med_row["cash_low"]
     cash_high = med_row["cash_high"]
     discount_low = med_row["discount_low"]
@@ -46,44 +223,16 @@ def page_medication_prices():
     # ------------------------------
     st.markdown("<h2>Price Summary</h2>", unsafe_allow_html=True)
 
-    # ----- CASH PRICE -----
-    st.markdown(
-        f"""
-        <div class="hanvion-card">
-            <h4>Cash Price</h4>
-            <p style="font-size:28px; font-weight:700;">${cash_low} – ${cash_high}</p>
-            <p class="hanvion-text-muted">
-                Estimated walk-in price for {med_name} {strength} without insurance.
-            </p>
-        </div>
-        """,
-        unsafe_allow_html=True
-    )
-
-    # ----- DISCOUNT PRICE -----
-    st.markdown(
-        f"""
-        <div class="hanvion-card">
-            <h4>Discount Program Price</h4>
-            <p style="font-size:28px; font-weight:700;">${discount_low} – ${discount_high}</p>
-            <p class="hanvion-text-muted">
-                Estimated discount price using pharmacy savings programs.
-            </p>
-        </div>
-        """,
-        unsafe_allow_html=True
+    card_row(
+        Card("Cash Price", f"${cash_low} – ${cash_high}",
+             note=f"Estimated walk-in price for {med_name} {strength} without insurance."),
+        Card("Discount Program Price", f"${discount_low} – ${discount_high}",
+             note="Estimated discount price using pharmacy savings programs."),
+        Card("Insurance Copay", f"${int(copay)}",
+             note=f"Typical copay for insured patients for {med_name} {strength}."),
     )
 
-    # ----- INSURANCE COPAY -----
-    st.markdown(
-        f"""
-        <div class="hanvion-card">
-            <h4>Insurance Copay</h4>
-            <p style="font-size:28px; font-weight:700;">${int(copay)}</p>
-            <p class="hanvion-text-muted">
-                Typical copay for insured patients for {med_name} {strength}.
-            </p>
-        </div>
-        """,
-        unsafe_allow_html=True
-    )
+    # ------------------------------
+    # NEARBY PHARMACIES
+    # ------------------------------
+    nearby_section(med_name, strength)
@@ -0,0 +1,391 @@
+"""
+In-process latency metrics with OpenMetrics export.
+
+Page reruns, dataset loads, cache lookups, calculators and filters record
+into histograms and counters held in METRICS. They are exported in the
+OpenMetrics text format:
+
+- HANVION_METRICS_PORT=9464   serve GET /metrics on 127.0.0.1:<port>
+- HANVION_METRICS_FILE=path   rewrite the file every HANVION_METRICS_INTERVAL
+                              seconds (default 15), e.g. for a node exporter
+                              textfile collector
+- GET /metrics on the headless API (hanvion_pages.api)
+
+Setting HANVION_PROFILE_DIR lets a single session opt in to cProfile by
+opening the app with ?profile=1; each rerun of that session writes
+<dir>/<page>-<timestamp>.prof, readable with pstats or snakeviz.
+"""
+import bisect
+import contextlib
+import cProfile
+import functools
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Seconds; from a cheap dictionary lookup to a cold multi-second load
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROW_BUCKETS = (0, 1, 10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+EXPORT_INTERVAL = 15
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+# -----------------------------
+# Metric types
+# -----------------------------
+class Counter:
+    type = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def set(self, *labels, value):
+        """
+        Overwrite the value, for totals kept elsewhere (and read on export).
+        """
+        with self.lock:
+            self.values[labels] = value
+
+    def samples(self):
+        with self.lock:
+            values = dict(self.values)
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}_total{_labels(self.label_names, labels)} {_number(value)}"
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def samples(self):
+        with self.lock:
+            values = dict(self.values)
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_labels(self.label_names, labels)} {_number(value)}"
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. Each label set holds per-bucket counts (not
+    cumulative; they are summed on export), a sum and a count.
+    """
+    type = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.buckets = tuple(buckets)
+        self.series = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self.lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        i = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    @contextlib.contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def snapshot(self, *labels):
+        """
+        (count, sum) for one label set.
+        """
+        with self.lock:
+            series = self.series.get(labels)
+            return (sum(series[:-1]), series[-1]) if series else (0, 0.0)
+
+    def samples(self):
+        with self.lock:
+            series = {labels: list(s) for labels, s in self.series.items()}
+        for labels, counts in sorted(series.items()):
+            cumulative = 0
+            for bound, n in zip((*self.buckets, float("inf")), counts[:-1]):
+                cumulative += n
+                le = (("le", _number(float(bound))),)
+                yield f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.label_names, labels)} {_number(counts[-1])}"
+            yield f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.collectors = []
+        self.lock = threading.Lock()
+
+    def _add(self, metric):
+        with self.lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help, labels=()):
+        return self._add(Counter(name, help, labels))
+
+    def gauge(self, name, help, labels=()):
+        return self._add(Gauge(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def collector(self, fn):
+        """
+        Register fn() to run before each export, e.g. to refresh gauges.
+        """
+        self.collectors.append(fn)
+        return fn
+
+    def render(self):
+        """
+        All metrics in the OpenMetrics text format.
+        """
+        for collect in self.collectors:
+            collect()
+        lines = []
+        with self.lock:
+            metrics = list(self.metrics.values())
+        for metric in metrics:
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.append(f"# HELP {metric.name} {_escape(metric.help)}")
+            lines.extend(metric.samples())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Registry()
+
+PAGE_SECONDS = METRICS.histogram(
+    "hanvion_page_render_seconds", "Time to run one page of the app script.", ["page"])
+PAGE_ERRORS = METRICS.counter(
+    "hanvion_page_errors", "Page runs that raised an exception.", ["page"])
+LOADER_SECONDS = METRICS.histogram(
+    "hanvion_loader_seconds", "Time to load a dataset on a cache miss.", ["loader"])
+CACHE_REQUESTS = METRICS.counter(
+    "hanvion_cache_requests", "Dataset cache lookups by loader and result (hit or miss).",
+    ["loader", "result"])
+CALCULATOR_SECONDS = METRICS.histogram(
+    "hanvion_calculator_seconds", "Time spent in a calculator call.", ["calculator"])
+ROWS_FILTERED = METRICS.histogram(
+    "hanvion_rows_filtered", "Rows a filter returned.", ["filter"], buckets=ROW_BUCKETS)
+ROWS_SCANNED = METRICS.counter(
+    "hanvion_rows_scanned", "Rows a filter was run over.", ["filter"])
+
+
+def timed(name):
+    """
+    Decorator recording each call of the function in CALCULATOR_SECONDS.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                CALCULATOR_SECONDS.observe(time.perf_counter() - start, name)
+        return wrapper
+    return decorate
+
+
+# Label of the page run the current (script) thread is in, if any
+_page_run = threading.local()
+
+
+@contextlib.contextmanager
+def page_run(label):
+    """
+    Record one run of a page in PAGE_SECONDS (and PAGE_ERRORS if it raises)
+    and pin its dataset lookups to one DATA_CACHE generation. Fragments
+    rendered by their page's full run are already inside it, so nested
+    calls do nothing.
+    """
+    if getattr(_page_run, "label", None) is not None:
+        yield
+        return
+    # data_cache records into this module's metrics
+    from hanvion_pages.data_cache import DATA_CACHE
+
+    _page_run.label = label
+    try:
+        with PAGE_SECONDS.time(label), DATA_CACHE.snapshot():
+            try:
+                yield
+            except Exception:
+                PAGE_ERRORS.inc(label)
+                raise
+    finally:
+        _page_run.label = None
+
+
+def page_fragment(label):
+    """
+    Decorator for the body of an st.fragment on page `label`. A fragment
+    rerun runs only the fragment, not app.py's run_page, so it is recorded
+    and pinned through page_run here instead.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with page_run(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def record_filter(name, scanned, returned):
+    ROWS_SCANNED.inc(name, amount=scanned)
+    ROWS_FILTERED.observe(returned, name)
+
+
+# -----------------------------
+# Exporters
+# -----------------------------
+def write_file(path, registry=METRICS):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(registry.render())
+    os.replace(tmp_path, path)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    registry = METRICS
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port, host="127.0.0.1"):
+    """
+    Serve GET /metrics from a daemon thread; returns the server.
+    """
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="hanvion-metrics", daemon=True).start()
+    return server
+
+
+def _write_periodically(path, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            write_file(path)
+        except OSError:
+            pass
+
+
+_started = False
+_start_lock = threading.Lock()
+
+
+def start_exporters():
+    """
+    Start the exporters configured in the environment, once per process.
+    Streamlit reruns the app script constantly; later calls are no-ops.
+    """
+    global _started
+    if _started:
+        return
+    with _start_lock:
+        if _started:
+            return
+        _started = True
+        port = os.environ.get("HANVION_METRICS_PORT")
+        if port:
+            try:
+                serve(int(port))
+            except OSError:
+                pass  # another server process already exports on this port
+        path = os.environ.get("HANVION_METRICS_FILE")
+        if path:
+            interval = float(os.environ.get("HANVION_METRICS_INTERVAL", EXPORT_INTERVAL))
+            threading.Thread(target=_write_periodically, args=(path, interval),
+                             name="hanvion-metrics-file", daemon=True).start()
+
+
+# -----------------------------
+# Opt-in profiling
+# -----------------------------
+# Only one cProfile profiler can be active at a time on newer Pythons, so
+# concurrent profiled reruns take turns; a rerun that finds the profiler
+# busy simply runs unprofiled.
+_profile_lock = threading.Lock()
+
+
+def profile_dir():
+    """
+    Directory for profiles, or None when profiling is not enabled.
+    """
+    return os.environ.get("HANVION_PROFILE_DIR") or None
+
+
+def run_profiled(fn, name, directory):
+    """
+    Run fn() under cProfile and dump the stats to directory.
+
+    Returns the .prof path, or None if another profile was in progress.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        fn()
+        return None
+    try:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            fn()
+        finally:
+            profiler.disable()
+            os.makedirs(directory, exist_ok=True)
+            slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+            path = os.path.join(directory, f"{slug}-{int(time.time() * 1000)}.prof")
+            profiler.dump_stats(path)
+        return path
+    finally:
+        _profile_lock.release()
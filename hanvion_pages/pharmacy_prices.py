@@ -0,0 +1,226 @@
+"""
+Per-pharmacy medication prices and nearest-pharmacy search.
+
+data/pharmacies.csv lists pharmacies with their ZIP and coordinates;
+data/pharmacy_prices.csv has one cash and one discount price per pharmacy
+and (drug, strength) it stocks. Both are compiled into arrays:
+
+- pharmacies in grid-cell order, with the sorted cell key of each, so the
+  pharmacies near a point are a few contiguous slices found by binary
+  search (one per row of 0.1 degree cells the search circle touches);
+- prices stored CSR-style by (drug, strength): one slice per product,
+  sorted by pharmacy, so pricing every candidate pharmacy for a product is
+  a single searchsorted.
+
+"k cheapest within N miles" is then a cell lookup, an exact distance
+filter over the candidates and a partial sort, without touching pharmacies
+or prices outside the circle.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+PHARMACY_CSV = "data/pharmacies.csv"
+PHARMACY_PRICE_CSV = "data/pharmacy_prices.csv"
+
+PHARMACY_COLUMNS = ["pharmacy_id", "name", "chain", "zip", "lat", "lon"]
+PRICE_COLUMNS = ["pharmacy_id", "drug", "strength", "cash_price", "discount_price"]
+
+CELL_DEG = 0.1
+LON_CELLS = int(round(360 / CELL_DEG))
+EARTH_RADIUS_MILES = 3958.8
+MILES_PER_DEG_LAT = 69.05
+
+# Array parts, in the order PharmacyPrices.__init__ takes them after the tables
+ARRAYS = ("cells", "offsets", "price_pharmacy", "cash", "discount")
+
+
+def cell_keys(lat, lon):
+    """
+    Grid cell of each point: lat row * LON_CELLS + lon column.
+    """
+    rows = np.floor((np.asarray(lat, dtype=np.float64) + 90) / CELL_DEG).astype(np.int64)
+    cols = np.floor((np.asarray(lon, dtype=np.float64) + 180) / CELL_DEG).astype(np.int64)
+    return rows * LON_CELLS + np.clip(cols, 0, LON_CELLS - 1)
+
+
+def haversine_miles(lat, lon, lats, lons):
+    lat, lon = np.radians(lat), np.radians(lon)
+    lats, lons = np.radians(lats), np.radians(lons)
+    a = (np.sin((lats - lat) / 2) ** 2
+         + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2)
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def _lon_spans(lon, dlon):
+    """
+    [(first column, last column)] covering lon +- dlon, split at the antimeridian.
+    """
+    if dlon >= 180:
+        return [(0, LON_CELLS - 1)]
+    lo, hi = lon - dlon, lon + dlon
+    col = lambda x: min(int(np.floor((x + 180) / CELL_DEG)), LON_CELLS - 1)
+    if lo < -180:
+        return [(col(lo + 360), LON_CELLS - 1), (0, col(hi))]
+    if hi >= 180:
+        return [(col(lo), LON_CELLS - 1), (0, col(hi - 360))]
+    return [(col(lo), col(hi))]
+
+
+class PharmacyPrices:
+    """
+    Pharmacy locations and per-pharmacy prices compiled into array indexes.
+    """
+
+    def __init__(self, pharmacies, products, cells, offsets, price_pharmacy, cash, discount):
+        self.pharmacies = pharmacies  # pa.Table in cell order
+        self.products = products      # pa.Table (drug, strength) in product id order
+        self.cells = cells
+        self.offsets = offsets
+        self.price_pharmacy = price_pharmacy
+        self.cash = cash
+        self.discount = discount
+
+        self.lat = self.pharmacies["lat"].to_numpy()
+        self.lon = self.pharmacies["lon"].to_numpy()
+        self.product_ids = {
+            key: i for i, key in enumerate(zip(products["drug"].to_pylist(), products["strength"].to_pylist()))
+        }
+        zips = pd.DataFrame({"zip": self.pharmacies["zip"].to_numpy(zero_copy_only=False),
+                             "lat": self.lat, "lon": self.lon})
+        self.zip_points = zips.groupby("zip")[["lat", "lon"]].mean()
+
+    def __len__(self):
+        return self.pharmacies.num_rows
+
+    @classmethod
+    def build(cls, pharmacies, prices):
+        """
+        Compile pharmacy and price frames (PHARMACY_COLUMNS, PRICE_COLUMNS).
+        Prices for unknown pharmacies or without a drug and strength are
+        dropped.
+        """
+        pharmacies = pharmacies[PHARMACY_COLUMNS].astype({"pharmacy_id": str, "zip": str})
+        pharmacies["cell"] = cell_keys(pharmacies["lat"], pharmacies["lon"])
+        pharmacies = pharmacies.sort_values("cell", kind="stable").reset_index(drop=True)
+
+        pharmacy_index = pd.Index(pharmacies["pharmacy_id"]).get_indexer(prices["pharmacy_id"].astype(str))
+        prices = prices.assign(pharmacy=pharmacy_index)[pharmacy_index >= 0]
+        # ngroup numbers rows with a missing key -1, which bincount rejects
+        prices = prices.dropna(subset=["drug", "strength"])
+
+        product_codes = prices.groupby(["drug", "strength"], sort=True).ngroup().to_numpy()
+        products = prices[["drug", "strength"]].drop_duplicates().sort_values(["drug", "strength"])
+        order = np.lexsort((prices["pharmacy"].to_numpy(), product_codes))
+        counts = np.bincount(product_codes, minlength=len(products))
+        offsets = np.zeros(len(products) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        return cls(
+            pa.Table.from_pandas(pharmacies.drop(columns="cell"), preserve_index=False),
+            pa.Table.from_pandas(products, preserve_index=False),
+            pharmacies["cell"].to_numpy(np.int64),
+            offsets,
+            prices["pharmacy"].to_numpy(np.int32)[order],
+            prices["cash_price"].to_numpy(np.float64)[order],
+            prices["discount_price"].to_numpy(np.float64)[order],
+        )
+
+    @classmethod
+    def from_csv(cls, pharmacy_path=PHARMACY_CSV, price_path=PHARMACY_PRICE_CSV):
+        return cls.build(pd.read_csv(pharmacy_path, dtype={"zip": str, "pharmacy_id": str}),
+                         pd.read_csv(price_path, dtype={"pharmacy_id": str}))
+
+    def parts(self):
+        """
+        Tables and arrays to publish with shared_data; from_parts reverses it.
+        """
+        return {"pharmacies": self.pharmacies, "products": self.products,
+                **{name: getattr(self, name) for name in ARRAYS}}
+
+    @classmethod
+    def from_parts(cls, parts):
+        return cls(parts["pharmacies"], parts["products"], *(parts[name] for name in ARRAYS))
+
+    # -----------------------------
+    # Spatial queries
+    # -----------------------------
+    def locate(self, zip_code):
+        """
+        (lat, lon) for a ZIP served by a pharmacy in the data, else None.
+        """
+        zip_code = str(zip_code).strip()[:5]
+        if zip_code in self.zip_points.index:
+            point = self.zip_points.loc[zip_code]
+            return float(point["lat"]), float(point["lon"])
+        return None
+
+    def within(self, lat, lon, radius_miles):
+        """
+        (pharmacy indexes, distances in miles) of pharmacies within the radius.
+        """
+        dlat = radius_miles / MILES_PER_DEG_LAT
+        first_row = int(np.floor((max(lat - dlat, -90) + 90) / CELL_DEG))
+        last_row = int(np.floor((min(lat + dlat, 90 - 1e-9) + 90) / CELL_DEG))
+        # Longitude degrees shrink towards the poles; size the span for the
+        # circle's most poleward latitude
+        widest = min(max(abs(lat - dlat), abs(lat + dlat)), 89.9)
+        dlon = radius_miles / (MILES_PER_DEG_LAT * np.cos(np.radians(widest)))
+
+        lo_keys, hi_keys = [], []
+        for first_col, last_col in _lon_spans(lon, dlon):
+            rows = np.arange(first_row, last_row + 1, dtype=np.int64) * LON_CELLS
+            lo_keys.append(rows + first_col)
+            hi_keys.append(rows + last_col + 1)
+        starts = np.searchsorted(self.cells, np.concatenate(lo_keys), side="left")
+        stops = np.searchsorted(self.cells, np.concatenate(hi_keys), side="left")
+
+        lengths = stops - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        # Concatenated aranges of every [start, stop) slice
+        shift = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        candidates = np.arange(total) + shift
+
+        distance = haversine_miles(lat, lon, self.lat[candidates], self.lon[candidates])
+        inside = distance <= radius_miles
+        return candidates[inside], distance[inside]
+
+    def cheapest_near(self, drug, strength, lat, lon, radius_miles=10, k=10, by="discount"):
+        """
+        The k cheapest pharmacies stocking (drug, strength) within the radius,
+        cheapest first (nearest first on ties), as a DataFrame with name,
+        chain, zip, miles, cash_price and discount_price.
+        """
+        product = self.product_ids.get((drug, strength))
+        candidates, distance = self.within(lat, lon, radius_miles)
+        if product is None or candidates.size == 0:
+            return self._frame(np.empty(0, dtype=np.int64), np.empty(0), np.empty(0, dtype=np.int64))
+
+        start, stop = self.offsets[product], self.offsets[product + 1]
+        stocked = self.price_pharmacy[start:stop]
+        pos = np.searchsorted(stocked, candidates)
+        has = pos < stocked.size
+        has[has] = stocked[pos[has]] == candidates[has]
+        candidates, distance, rows = candidates[has], distance[has], pos[has] + start
+
+        price = (self.discount if by == "discount" else self.cash)[rows]
+        if price.size > k:
+            # Partial sort: only the k cheapest (plus ties at the cut) are ordered
+            cut = np.partition(price, k - 1)[k - 1]
+            keep = price <= cut
+            candidates, distance, rows, price = candidates[keep], distance[keep], rows[keep], price[keep]
+        order = np.lexsort((distance, price))[:k]
+        return self._frame(candidates[order], distance[order], rows[order])
+
+    def _frame(self, pharmacies, distance, rows):
+        picked = self.pharmacies.take(pa.array(pharmacies, pa.int64()))
+        return pd.DataFrame({
+            "name": picked["name"].to_numpy(zero_copy_only=False),
+            "chain": picked["chain"].to_numpy(zero_copy_only=False),
+            "zip": picked["zip"].to_numpy(zero_copy_only=False),
+            "miles": np.round(distance, 1),
+            "cash_price": self.cash[rows],
+            "discount_price": self.discount[rows],
+        })
@@ -0,0 +1,172 @@
+"""
+Coverage likelihood for whole member rosters.
+
+A roster (CSV or Parquet with age, sex and state columns) is streamed in
+chunks. Each chunk is joined to the state table and scored with
+insurance_likelihood_batch, the array form of
+insurance_eligibility.insurance_likelihood. Scored rows are written out as
+chunks finish, and likelihood is averaged by segment along the way.
+
+    python -m hanvion_pages.population roster.parquet --out scored.parquet \\
+        --segments state,age_band,sex --summary segments.csv --workers 4 --verify 1000
+"""
+import argparse
+import contextlib
+
+import numpy as np
+import pandas as pd
+
+from hanvion_pages.batch_io import CHUNK_ROWS, ChunkWriter, iter_chunks, map_chunks
+from hanvion_pages.datastore import open_state_store
+
+ROSTER_COLUMNS = ["age", "sex", "state"]
+
+
+# -----------------------------
+# Vectorized likelihood
+# -----------------------------
+def insurance_likelihood_batch(age, sex, uninsured_rate):
+    """
+    insurance_likelihood over arrays.
+
+    The arithmetic is done in the scalar function's order (base, age
+    adjustment, sex adjustment, clip) so every result is bit-identical to
+    it.
+    """
+    age = np.asarray(age, dtype=np.float64)
+    uninsured_rate = np.asarray(uninsured_rate, dtype=np.float64)
+
+    base = 100 - uninsured_rate
+    base = base + np.where(age < 26, -4.0, np.where(age > 55, 6.0, 0.0))
+    base = base + np.where((pd.Series(sex) == "Female").to_numpy(), 2.0, 0.0)
+    return np.minimum(np.maximum(base, 25), 98)
+
+
+def uninsured_lookup(states=None):
+    """
+    Series state -> uninsured_rate from the state table snapshot.
+    """
+    if states is None:
+        states = open_state_store().to_pandas()
+    return pd.Series(states["uninsured_rate"].to_numpy(np.float64), index=states["state"].astype(str))
+
+
+def join_uninsured(state, lookup):
+    """
+    Uninsured rate for every row's state; unknown states get the default.
+
+    Rosters hold a few dozen distinct states, so they are factorized first
+    and only the distinct values are looked up.
+    """
+    from hanvion_pages.insurance_eligibility import DEFAULT_STATE_ROW
+
+    codes, uniques = pd.factorize(pd.Series(state).astype(str))
+    pos = lookup.index.get_indexer(uniques)
+    rates = np.where(pos >= 0, lookup.to_numpy()[pos], DEFAULT_STATE_ROW["uninsured_rate"])
+    return rates[codes]
+
+
+AGE_BANDS = ["<26", "26-55", ">55"]
+
+
+def age_band(age):
+    """
+    The age brackets insurance_likelihood distinguishes, as a Categorical.
+    """
+    age = np.asarray(age, dtype=np.float64)
+    codes = np.where(age < 26, 0, np.where(age > 55, 2, 1))
+    return pd.Categorical.from_codes(codes, AGE_BANDS)
+
+
+# -----------------------------
+# Chunk scoring
+# -----------------------------
+def score_chunk(df, lookup, segments=(), verify=0):
+    """
+    Score one roster chunk; returns (scored chunk, per-segment sum and count).
+    """
+    missing = [c for c in ROSTER_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"roster is missing column(s): {', '.join(missing)}")
+
+    uninsured = join_uninsured(df["state"], lookup)
+    likelihood = insurance_likelihood_batch(df["age"], df["sex"], uninsured)
+
+    scored = df.copy()
+    scored["likelihood"] = likelihood
+    if verify:
+        _verify(scored.head(verify), uninsured[:verify])
+
+    partial = None
+    if segments:
+        keys = scored[[s for s in segments if s != "age_band"]].copy()
+        if "age_band" in segments:
+            keys["age_band"] = age_band(scored["age"])
+        partial = (
+            scored["likelihood"]
+            .groupby([keys[s] for s in segments], dropna=False, observed=True)
+            .agg(["sum", "count"])
+        )
+    return scored, partial
+
+
+def _verify(scored, uninsured):
+    from hanvion_pages.insurance_eligibility import insurance_likelihood
+
+    for row, rate in zip(scored.itertuples(index=False), uninsured):
+        expected = insurance_likelihood(row.age, row.sex, {"uninsured_rate": rate})
+        if not (expected == row.likelihood or (np.isnan(expected) and np.isnan(row.likelihood))):
+            raise ValueError(
+                f"batch likelihood {row.likelihood!r} != scalar {expected!r} "
+                f"for age={row.age!r} sex={row.sex!r} state={row.state!r}"
+            )
+
+
+def score_roster(in_path, out_path=None, segments=(), workers=None,
+                 chunk_rows=CHUNK_ROWS, verify=0, lookup=None):
+    """
+    Stream a roster through score_chunk; returns the segment summary
+    (mean likelihood and member count per segment) or None.
+    """
+    lookup = uninsured_lookup() if lookup is None else lookup
+    chunks = iter_chunks(in_path, chunk_rows)
+    results = map_chunks(score_chunk, chunks, workers, lookup, tuple(segments), verify)
+
+    totals = None
+    with ChunkWriter(out_path) if out_path else contextlib.nullcontext() as writer:
+        for scored, partial in results:
+            if writer is not None:
+                writer.write(scored)
+            if partial is not None:
+                totals = partial if totals is None else totals.add(partial, fill_value=0)
+
+    if totals is None:
+        return None
+    summary = totals.assign(likelihood=totals["sum"] / totals["count"])
+    return summary[["likelihood", "count"]].astype({"count": "int64"}).reset_index()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a member roster for coverage likelihood.")
+    parser.add_argument("roster", help="CSV or Parquet with age, sex and state columns")
+    parser.add_argument("--out", default=None, help="scored roster to write (.csv or .parquet)")
+    parser.add_argument("--segments", default="", help="comma-separated columns to summarise by "
+                                                       "(age_band is derived from age)")
+    parser.add_argument("--summary", default=None, help="segment summary CSV to write")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--verify", type=int, default=0,
+                        help="check the first N rows of each chunk against the scalar function")
+    args = parser.parse_args(argv)
+
+    segments = [s for s in args.segments.split(",") if s]
+    summary = score_roster(args.roster, args.out, segments, args.workers, args.chunk_rows, args.verify)
+    if summary is not None:
+        if args.summary:
+            summary.to_csv(args.summary, index=False)
+        else:
+            print(summary.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""
+Prevention recommendation texts shared by the Health Profile page and the
+cohort scorer. Kept free of imports so neither pulls in the other's
+dependencies.
+"""
+
+# Name -> text, in the order prevention_recommendations lists them. Code
+# refers to a recommendation by name (REC_IDX for its cohort bit), so the
+# texts can be reordered or extended without the two drifting apart.
+RECOMMENDATION_TEXTS = {
+    "walking": "Focus on moderate calorie reduction and daily walking.",
+    "diet": "Try to include vegetables, fruits, and lean proteins in meals.",
+    "calorie_intake": "Increase healthy calorie intake and check for nutritional deficiencies.",
+    "activity": "Increase weekly physical activity to maintain a healthy lifestyle.",
+    "sleep": "Aim for at least 6–8 hours of sleep daily.",
+    "habits": "Focus on building consistent daily habits.",
+    "provider": "Consider speaking with a healthcare provider about stress or lifestyle concerns.",
+}
+
+RECOMMENDATIONS = tuple(RECOMMENDATION_TEXTS.values())
+REC_IDX = {name: i for i, name in enumerate(RECOMMENDATION_TEXTS)}
@@ -0,0 +1,362 @@
+"""
+Read-only datasets shared by every app process on a node.
+
+One process publishes each dataset once into a shared directory (tmpfs
+/dev/shm by default) as uncompressed Arrow IPC tables and .npy arrays;
+every other process memory-maps the published files. The mapped pages are
+the same physical pages in every process, so adding workers does not add
+copies of the CMS, GoodRx, insurance, state and pharmacy price tables or
+of the indexes over them, and a worker that finds its datasets already
+published parses no source files at all.
+
+A JSON manifest records, per dataset, its files and the (mtime, size) of
+the source files it was built from. It is replaced atomically after the
+files are in place, so readers see either the old generation or the new
+one. Publishing takes an exclusive lock so concurrent workers build a
+stale dataset once; the others wait and attach. Superseded files are
+unlinked, which is safe while other processes still map them.
+
+    python -m hanvion_pages.shared_data publish    # e.g. before starting workers
+    python -m hanvion_pages.shared_data status
+
+HANVION_SHARED_DIR picks the directory; setting it to an empty string
+turns sharing off and every process builds its own copy. A directory this
+user does not own, or that others can write to, is never read: every
+process then builds its own copy too.
+"""
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import stat
+import time
+from functools import lru_cache
+
+# numpy, pandas, pyarrow and the modules built on them are imported where
+# a dataset is built or attached, so importing this module (every page
+# that reads a shared table does) stays cheap
+
+GOODRX_CSV = "data/goodrx_prices.csv"
+INSURANCE_CSV = "data/insurance.csv"
+
+MANIFEST = "manifest.json"
+# Bumped whenever a builder changes what it publishes (e.g. a dtype), so
+# copies published by older code are rebuilt even if the sources did not
+# change
+MANIFEST_FORMAT = 2
+
+# Datasets a page can do without (it hides the section); publish() skips
+# them while their source files are absent
+OPTIONAL = {"pharmacy_prices"}
+
+# Attribute order of ProcedureSearchIndex.__init__
+SEARCH_ARRAYS = ("vocab", "offsets", "postings", "codes", "code_rows")
+
+
+def shared_dir():
+    """
+    Directory datasets are published to, or None when sharing is off.
+
+    Defaults to a directory in /dev/shm named after the absolute data
+    directory, so two checkouts on one node never share by accident.
+    """
+    configured = os.environ.get("HANVION_SHARED_DIR")
+    if configured is not None:
+        return configured or None
+    from hanvion_pages.datastore import STORE_DIR
+
+    data_dir = os.path.abspath("data")
+    digest = hashlib.sha256(data_dir.encode()).hexdigest()[:12]
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else os.path.join(STORE_DIR, "shared")
+    return os.path.join(base, f"hanvion-{digest}")
+
+
+def _check_dir(directory):
+    """
+    Create the shared directory (mode 0700) if needed, and raise
+    PermissionError unless it is a directory this user owns that nobody
+    else can write to. The default path is predictable, so another user
+    could have created it first and planted files every worker would map.
+    """
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    st = os.lstat(directory)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o022:
+        raise PermissionError(f"{directory} is not a directory owned by and writable only by this user")
+
+
+# -----------------------------
+# Dataset builders: name -> {part: pa.Table or np.ndarray}
+# -----------------------------
+def _read_csv(path):
+    import pandas as pd
+    import pyarrow as pa
+
+    # Parsed by pandas, as the pages always have, so column dtypes match
+    return pa.Table.from_pandas(pd.read_csv(path), preserve_index=False)
+
+
+def _build_cms():
+    from hanvion_pages.datastore import open_cms_store
+
+    return {"table": open_cms_store()}
+
+
+def _build_cms_search():
+    from hanvion_pages.cms_search import ProcedureSearchIndex
+    from hanvion_pages.datastore import open_cms_store
+
+    table = open_cms_store()
+    index = ProcedureSearchIndex.build(table["code"], table["description"])
+    return {name: getattr(index, name) for name in SEARCH_ARRAYS}
+
+
+def _build_state():
+    from hanvion_pages.datastore import open_state_store
+
+    return {"table": open_state_store()}
+
+
+def _build_pharmacy_prices():
+    from hanvion_pages.pharmacy_prices import PharmacyPrices
+
+    return PharmacyPrices.from_csv().parts()
+
+
+@lru_cache(maxsize=None)
+def datasets():
+    """
+    name -> (source files, builder) for every shareable dataset.
+    """
+    from hanvion_pages.datastore import CMS_CSV, STATE_XLSX
+    from hanvion_pages.pharmacy_prices import PHARMACY_CSV, PHARMACY_PRICE_CSV
+
+    return {
+        "cms": ([CMS_CSV], _build_cms),
+        "cms_search": ([CMS_CSV], _build_cms_search),
+        "goodrx": ([GOODRX_CSV], lambda: {"table": _read_csv(GOODRX_CSV)}),
+        "insurance": ([INSURANCE_CSV], lambda: {"table": _read_csv(INSURANCE_CSV)}),
+        "state": ([STATE_XLSX], _build_state),
+        "pharmacy_prices": ([PHARMACY_CSV, PHARMACY_PRICE_CSV], _build_pharmacy_prices),
+    }
+
+
+def source_stamps(name):
+    """
+    [path, mtime_ns, size] of each source file (None for a missing file).
+    """
+    stamps = []
+    for path in datasets()[name][0]:
+        try:
+            st = os.stat(path)
+            stamps.append([path, st.st_mtime_ns, st.st_size])
+        except FileNotFoundError:
+            stamps.append([path, None, None])
+    return stamps
+
+
+# -----------------------------
+# Manifest and files
+# -----------------------------
+def read_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifest = {}
+    if manifest.get("format") != MANIFEST_FORMAT:
+        return {"format": MANIFEST_FORMAT, "datasets": {}}
+    return manifest
+
+
+def _write_manifest(directory, manifest):
+    path = os.path.join(directory, MANIFEST)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def _write_part(directory, stem, value):
+    import numpy as np
+    import pyarrow as pa
+
+    from hanvion_pages.datastore import write_ipc
+
+    if isinstance(value, pa.Table):
+        filename = f"{stem}.arrow"
+        # Row selections (df.iloc) on a chunked column concatenate its chunks
+        # into private memory first; one batch lets them read the mapping
+        try:
+            value = value.combine_chunks()
+        except pa.ArrowInvalid:
+            pass  # over 2 GiB of string data in one column
+        write_ipc(value.to_batches(), os.path.join(directory, filename), value.schema)
+    else:
+        filename = f"{stem}.npy"
+        tmp_path = os.path.join(directory, f"{filename}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, np.ascontiguousarray(value))
+        os.replace(tmp_path, os.path.join(directory, filename))
+    return filename
+
+
+def _open_part(directory, filename):
+    import numpy as np
+
+    from hanvion_pages.datastore import open_ipc
+
+    path = os.path.join(directory, filename)
+    if filename.endswith(".arrow"):
+        return open_ipc(path)
+    return np.load(path, mmap_mode="r")
+
+
+class _PublishLock:
+    def __init__(self, directory):
+        self.path = os.path.join(directory, ".lock")
+
+    def __enter__(self):
+        self.f = open(self.path, "a")
+        fcntl.flock(self.f, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self.f, fcntl.LOCK_UN)
+        self.f.close()
+
+
+def _remove_unreferenced(directory, manifest):
+    keep = {MANIFEST, ".lock"}
+    for entry in manifest["datasets"].values():
+        keep.update(entry["files"].values())
+    for filename in os.listdir(directory):
+        if filename not in keep:
+            os.remove(os.path.join(directory, filename))
+
+
+# -----------------------------
+# Publish / attach
+# -----------------------------
+def publish(names=None, force=False, directory=None):
+    """
+    Build and publish the named datasets (default all) whose sources changed
+    since they were last published. Returns the names that were rebuilt.
+    """
+    directory = directory or shared_dir()
+    _check_dir(directory)
+    rebuilt = []
+    with _PublishLock(directory):
+        manifest = read_manifest(directory)
+        for name in names or datasets():
+            stamps = source_stamps(name)
+            if name in OPTIONAL and any(mtime is None for _, mtime, _ in stamps):
+                # Not provided here; drop a copy published before the files went
+                if manifest["datasets"].pop(name, None) is not None:
+                    _write_manifest(directory, manifest)
+                continue
+            entry = manifest["datasets"].get(name)
+            if not force and entry is not None and entry["sources"] == stamps:
+                continue
+            parts = datasets()[name][1]()
+            generation = time.time_ns()
+            files = {part: _write_part(directory, f"{name}-{generation}.{part}", value)
+                     for part, value in parts.items()}
+            manifest["datasets"][name] = {"files": files, "sources": stamps, "published": time.time()}
+            _write_manifest(directory, manifest)
+            rebuilt.append(name)
+        _remove_unreferenced(directory, manifest)
+    return rebuilt
+
+
+def attach(name):
+    """
+    {part: zero-copy Table or read-only array} for one dataset.
+
+    Attaches to the published copy when it is current, publishing it first
+    otherwise. With sharing off, or a shared directory that cannot be
+    trusted, the dataset is built in-process.
+    """
+    build = datasets()[name][1]
+    directory = shared_dir()
+    if directory is None:
+        return build()
+    try:
+        _check_dir(directory)
+    except OSError:
+        return build()
+
+    entry = read_manifest(directory)["datasets"].get(name)
+    if entry is None or entry["sources"] != source_stamps(name):
+        try:
+            publish([name], directory=directory)
+        except OSError:
+            # Shared directory missing or read-only: keep a private copy
+            return build()
+        entry = read_manifest(directory)["datasets"][name]
+    try:
+        return {part: _open_part(directory, f) for part, f in entry["files"].items()}
+    except FileNotFoundError:
+        # Superseded by a concurrent publish between reading the manifest
+        # and opening the files; the new manifest is complete
+        entry = read_manifest(directory)["datasets"][name]
+        return {part: _open_part(directory, f) for part, f in entry["files"].items()}
+
+
+def shared_table(name):
+    return attach(name)["table"]
+
+
+def shared_search_index():
+    from hanvion_pages.cms_search import ProcedureSearchIndex
+
+    return ProcedureSearchIndex(**attach("cms_search"))
+
+
+def status(directory=None):
+    """
+    Per dataset: published time, bytes on the shared filesystem, and
+    whether its sources changed since.
+    """
+    directory = directory or shared_dir()
+    manifest = read_manifest(directory) if directory else {"datasets": {}}
+    rows = {}
+    for name in datasets():
+        entry = manifest["datasets"].get(name)
+        if entry is None:
+            rows[name] = None
+            continue
+        rows[name] = {
+            "published": entry["published"],
+            "bytes": sum(os.path.getsize(os.path.join(directory, f)) for f in entry["files"].values()),
+            "stale": entry["sources"] != source_stamps(name),
+        }
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Publish datasets for sharing between app processes.")
+    parser.add_argument("command", choices=["publish", "status"])
+    parser.add_argument("names", nargs="*", help=f"datasets ({', '.join(datasets())}); default all")
+    parser.add_argument("--force", action="store_true", help="rebuild even if sources are unchanged")
+    args = parser.parse_args(argv)
+
+    directory = shared_dir()
+    if directory is None:
+        parser.error("sharing is disabled (HANVION_SHARED_DIR is empty)")
+    if args.command == "publish":
+        try:
+            rebuilt = publish(args.names or None, args.force)
+        except PermissionError as e:
+            parser.error(str(e))
+        print(f"Published {', '.join(rebuilt) or 'nothing (all current)'} to {directory}")
+    for name, row in status().items():
+        if row is None:
+            print(f"  {name:12s} not published")
+        else:
+            when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row["published"]))
+            print(f"  {name:12s} {row['bytes']:>14,d} bytes  {when}{'  STALE' if row['stale'] else ''}")
+
+
+if __name__ == "__main__":
+    main()
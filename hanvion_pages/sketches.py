@@ -0,0 +1,255 @@
+"""
+Mergeable quantile sketches of negotiated procedure prices.
+
+Each (code, setting) keeps a merging t-digest: about a hundred weighted
+centroids, dense in the tails and sparse in the middle, from which any
+percentile can be read. Digests from different files merge by pooling
+their centroids, so new rate files are folded in without keeping the raw
+observations. The store is an Arrow IPC file with one row per key and the
+centroids as list columns.
+"""
+import math
+import os
+
+import numpy as np
+import pyarrow as pa
+
+from hanvion_pages.datastore import open_ipc, write_ipc
+
+SKETCH_STORE = "data/cms_price_sketches.arrow"
+COMPRESSION = 200
+BUFFER_SIZE = 4096
+
+SKETCH_SCHEMA = pa.schema([
+    ("code", pa.string()),
+    ("setting", pa.string()),
+    ("description", pa.string()),
+    ("providers", pa.int64()),
+    ("min", pa.float64()),
+    ("max", pa.float64()),
+    ("means", pa.list_(pa.float32())),
+    # float64: float32 counts stop being exact above 2**24 and merged
+    # stores would drift with every --append
+    ("weights", pa.list_(pa.float64())),
+])
+
+
+# -----------------------------
+# t-digest
+# -----------------------------
+class TDigest:
+    """
+    Merging t-digest with the arcsine scale function.
+
+    Centroids are rebuilt in one vectorized pass: points sorted by value are
+    grouped so that each group spans at most one unit of
+    k(q) = compression / (2 pi) * asin(2q - 1), which keeps tail centroids
+    tiny and the total near compression / 2.
+    """
+
+    def __init__(self, compression=COMPRESSION, means=None, weights=None,
+                 min_value=math.inf, max_value=-math.inf):
+        self.compression = compression
+        self.means = np.asarray(means if means is not None else (), dtype=np.float64)
+        self.weights = np.asarray(weights if weights is not None else (), dtype=np.float64)
+        self.min = min_value
+        self.max = max_value
+        self.buffer = []
+        self._cdf = None
+
+    @property
+    def count(self):
+        return int(round(self.weights.sum())) + len(self.buffer)
+
+    def add(self, value):
+        self.buffer.append(value)
+        if len(self.buffer) >= BUFFER_SIZE:
+            self.flush()
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if values.size:
+            self._absorb(values, np.ones(values.size))
+
+    def merge(self, other):
+        other.flush()
+        if other.weights.size:
+            self.flush()
+            self._absorb(other.means, other.weights, other.min, other.max)
+        return self
+
+    def flush(self):
+        if self.buffer:
+            values = np.array(self.buffer, dtype=np.float64)
+            self.buffer = []
+            self._absorb(values, np.ones(values.size))
+
+    def _absorb(self, means, weights, low=None, high=None):
+        self.min = min(self.min, means.min() if low is None else low)
+        self.max = max(self.max, means.max() if high is None else high)
+
+        m = np.concatenate([self.means, means])
+        w = np.concatenate([self.weights, weights])
+        order = np.argsort(m, kind="stable")
+        m, w = m[order], w[order]
+
+        cum = np.cumsum(w)
+        q_mid = (cum - w / 2) / cum[-1]
+        k = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * q_mid - 1))
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(k)) + 1])
+
+        self.weights = np.add.reduceat(w, starts)
+        self.means = np.add.reduceat(m * w, starts) / self.weights
+        self._cdf = None
+
+    def quantile(self, q):
+        """
+        Value at quantile q (a float or an array of floats in [0, 1]).
+        """
+        self.flush()
+        if not self.weights.size:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else math.nan
+        if self._cdf is None:
+            cum = np.cumsum(self.weights)
+            mid = (cum - self.weights / 2) / cum[-1]
+            self._cdf = (
+                np.concatenate([[0.0], mid, [1.0]]),
+                np.concatenate([[self.min], self.means, [self.max]]),
+            )
+        xs, ys = self._cdf
+        result = np.interp(q, xs, ys)
+        return float(result) if np.ndim(result) == 0 else result
+
+
+class PriceSketch:
+    """
+    Price distribution of one (code, setting): a digest plus the
+    description and provider count the cms_procedures schema carries.
+    """
+
+    def __init__(self, description="", providers=0, digest=None):
+        self.description = description
+        self.providers = providers
+        self.digest = digest if digest is not None else TDigest()
+
+    def add(self, rate, providers):
+        self.digest.add(rate)
+        self.providers += providers
+
+    def merge(self, other):
+        self.digest.merge(other.digest)
+        self.providers += other.providers
+        self.description = self.description or other.description
+        return self
+
+    @property
+    def count(self):
+        return self.digest.count
+
+    def quantile(self, q):
+        return self.digest.quantile(q)
+
+
+# -----------------------------
+# Store: (code, setting) -> PriceSketch
+# -----------------------------
+class SketchStore:
+    """
+    Price sketches keyed by (code, setting).
+
+    Opened from disk, rows are decoded into sketches on first access, so a
+    national store opens in the time it takes to index its keys.
+    """
+
+    def __init__(self, sketches=None, table=None):
+        self.sketches = dict(sketches or {})
+        self.table = table
+        self.rows = {}
+        if table is not None:
+            table = table.combine_chunks()
+            self.table = table
+            keys = zip(table.column("code").to_pylist(), table.column("setting").to_pylist())
+            self.rows = {key: i for i, key in enumerate(keys) if key not in self.sketches}
+
+    def __len__(self):
+        return len(self.sketches) + len(self.rows)
+
+    def __contains__(self, key):
+        return key in self.sketches or key in self.rows
+
+    def keys(self):
+        return list(self.sketches) + list(self.rows)
+
+    def get(self, code, setting):
+        key = (code, setting)
+        sketch = self.sketches.get(key)
+        if sketch is None and key in self.rows:
+            sketch = self.sketches[key] = self._decode(self.rows.pop(key))
+        return sketch
+
+    def _decode(self, i):
+        row = {name: self.table.column(name)[i] for name in SKETCH_SCHEMA.names}
+        digest = TDigest(
+            means=row["means"].values.to_numpy(zero_copy_only=False),
+            weights=row["weights"].values.to_numpy(zero_copy_only=False),
+            min_value=row["min"].as_py(),
+            max_value=row["max"].as_py(),
+        )
+        return PriceSketch(row["description"].as_py(), row["providers"].as_py(), digest)
+
+    def quantiles(self, code, setting, qs):
+        """
+        Prices at quantiles qs for one key, or None when it has no sketch.
+        """
+        sketch = self.get(code, setting)
+        if sketch is None:
+            return None
+        return sketch.quantile(qs)
+
+    def merge(self, sketches):
+        """
+        Fold {(code, setting): PriceSketch} into the store.
+        """
+        for (code, setting), sketch in sketches.items():
+            current = self.get(code, setting)
+            if current is None:
+                self.sketches[(code, setting)] = sketch
+            else:
+                current.merge(sketch)
+        return self
+
+    def items(self):
+        for code, setting in self.keys():
+            yield (code, setting), self.get(code, setting)
+
+    def to_table(self):
+        columns = {name: [] for name in SKETCH_SCHEMA.names}
+        for (code, setting), sketch in sorted(self.items()):
+            sketch.digest.flush()
+            columns["code"].append(code)
+            columns["setting"].append(setting)
+            columns["description"].append(sketch.description)
+            columns["providers"].append(sketch.providers)
+            columns["min"].append(sketch.digest.min)
+            columns["max"].append(sketch.digest.max)
+            columns["means"].append(sketch.digest.means)
+            columns["weights"].append(sketch.digest.weights)
+        return pa.table(columns, schema=SKETCH_SCHEMA)
+
+    def save(self, path=SKETCH_STORE):
+        table = self.to_table()
+        return write_ipc(table.to_batches(), path, SKETCH_SCHEMA,
+                         metadata={"compression": COMPRESSION})
+
+    @classmethod
+    def open(cls, path=SKETCH_STORE):
+        return cls(table=open_ipc(path))
+
+
+def load_sketch_store(path=SKETCH_STORE):
+    """
+    The sketch store at path, or None when none has been built.
+    """
+    if not os.path.exists(path):
+        return None
+    return SketchStore.open(path)
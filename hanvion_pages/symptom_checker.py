@@ -1,96 +1,44 @@
 import streamlit as st
 
+from hanvion_pages.components import Card, card_row
+from hanvion_pages.data_cache import cached_data
+from hanvion_pages.symptom_engine import SYMPTOM_CATALOG, SymptomEngine
+
 # -----------------------------
 # Symptom Database
 # -----------------------------
+@cached_data(sources=[SYMPTOM_CATALOG])
+def load_symptom_engine():
+    """
+    Symptom catalog compiled into its match and lookup indexes, once per process.
+    """
+    try:
+        return SymptomEngine.from_csv()
+    except Exception as e:
+        st.error(f"Unable to load symptom catalog: {e}")
+        return None
+
+
+def resolve_free_text(engine, text):
+    """
+    Map comma-separated free text to catalog symptoms.
+
+    Returns (matched symptoms, [(typed, suggestion)], unmatched terms).
+    """
+    matched, suggested, unmatched = [], [], []
+    for term in (t.strip() for t in text.split(",")):
+        if not term:
+            continue
+        hits = engine.lookup(term, limit=1)
+        if not hits:
+            unmatched.append(term)
+            continue
+        symptom, similarity = hits[0]
+        matched.append(symptom)
+        if similarity < 1.0:
+            suggested.append((term, symptom))
+    return matched, suggested, unmatched
 
-SYMPTOM_MAP = {
-    "Chest pain": {
-        "system": "Cardiovascular",
-        "possible_causes": [
-            "Muscle strain",
-            "Acid reflux",
-            "Anxiety or stress",
-            "Costochondritis",
-            "Angina"
-        ],
-        "seek_care": True,
-        "notes": "Chest pain can be caused by harmless conditions, but sudden or severe pain needs urgent evaluation."
-    },
-
-    "Shortness of breath": {
-        "system": "Respiratory",
-        "possible_causes": [
-            "Asthma",
-            "Viral infection",
-            "Allergies",
-            "Anemia",
-            "Heart or lung conditions"
-        ],
-        "seek_care": True,
-        "notes": "If breathing difficulty is new or worsening, seek medical attention."
-    },
-
-    "Headache": {
-        "system": "Neurological",
-        "possible_causes": [
-            "Migraine",
-            "Tension headache",
-            "Dehydration",
-            "Eye strain"
-        ],
-        "seek_care": False,
-        "notes": "Severe, sudden-onset headache or neurological symptoms require urgent care."
-    },
-
-    "Fever": {
-        "system": "General / Infectious",
-        "possible_causes": [
-            "Viral infection",
-            "Flu",
-            "COVID-19",
-            "Sinus infection"
-        ],
-        "seek_care": False,
-        "notes": "Persistent high fever or fever in children may need evaluation."
-    },
-
-    "Stomach pain": {
-        "system": "Gastrointestinal",
-        "possible_causes": [
-            "Indigestion",
-            "Food poisoning",
-            "Constipation",
-            "Gastritis"
-        ],
-        "seek_care": False,
-        "notes": "Severe or persistent abdominal pain should be evaluated."
-    },
-
-    "Back pain": {
-        "system": "Musculoskeletal",
-        "possible_causes": [
-            "Muscle strain",
-            "Poor posture",
-            "Disc issue"
-        ],
-        "seek_care": False,
-        "notes": "Back pain with numbness or weakness may need medical review."
-    },
-
-    "Dizziness": {
-        "system": "Neurological",
-        "possible_causes": [
-            "Dehydration",
-            "Low blood pressure",
-            "Inner ear issues"
-        ],
-        "seek_care": False,
-        "notes": "If dizziness is persistent or severe, seek care."
-    }
-}
-
-SYMPTOM_LIST = list(SYMPTOM_MAP.keys())
 
 # -----------------------------
 # UI
@@ -100,61 +48,65 @@ def page_symptom_checker():
     st.markdown("""
         <h1 style="font-size: 36px; font-weight: 700;">Symptom Explorer</h1>
         <p style="font-size: 17px; max-width: 760px; color: #555;">
-            A structured symptom lookup tool to help you understand which body system 
+            A structured symptom lookup tool to help you understand which body system
             your symptoms relate to. This is not a diagnosis — but a guide for awareness.
         </p>
         <br>
     """, unsafe_allow_html=True)
 
+    engine = load_symptom_engine()
+    if engine is None:
+        return
+
     # INPUT CARD
     st.markdown("""
-        <div style="background:#ffffff; padding:22px; 
-                    border-radius:10px; border:1px solid #eee; 
+        <div style="background:#ffffff; padding:22px;
+                    border-radius:10px; border:1px solid #eee;
                     box-shadow:0px 4px 10px rgba(0,0,0,0.05);">
-            <h4 style="margin-top:0;">Select a symptom</h4>
+            <h4 style="margin-top:0;">Select your symptoms</h4>
         </div>
     """, unsafe_allow_html=True)
 
-    selected_symptom = st.selectbox("", SYMPTOM_LIST)
-
-    if selected_symptom:
-        info = SYMPTOM_MAP[selected_symptom]
-
-        st.markdown("<br>", unsafe_allow_html=True)
-
-        # RESULT CARD
+    picked = st.multiselect("Symptoms", engine.symptoms, label_visibility="collapsed")
+    typed = st.text_input("Or describe them, separated by commas",
+                          placeholder="e.g. hedache, runny nose, tiredness")
+
+    matched, suggested, unmatched = resolve_free_text(engine, typed) if typed else ([], [], [])
+    for term, symptom in suggested:
+        st.caption(f'Reading "{term}" as {symptom}.')
+    if unmatched:
+        st.warning(f"No catalog symptom resembles: {', '.join(unmatched)}")
+
+    selected = list(dict.fromkeys(picked + matched))
+    if not selected:
+        return
+
+    result = engine.match(selected, limit=8)
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    # RESULT CARDS
+    card_row(
+        Card("Likely Body Systems",
+             rows=tuple((system, f"{count} of {len(selected)} symptoms")
+                        for system, count in result["systems"]),
+             note="Systems the selected symptoms most often relate to."),
+        Card("Common Possible Causes",
+             items=tuple(f"{cause} ({explained} of {len(selected)})" if len(selected) > 1 else cause
+                         for cause, _, explained in result["causes"]),
+             note="Ranked by how many of your symptoms each explains, then how typical it is."),
+    )
+
+    # SAFETY NOTICE
+    st.markdown("<h4>General Guidance</h4>", unsafe_allow_html=True)
+    guidance = [(symptom, engine.details(symptom)) for symptom in selected]
+    card_row(*(Card(symptom, note=info["notes"], tinted=info["seek_care"]) for symptom, info in guidance))
+
+    # RISK FLAG
+    if result["seek_care"]:
         st.markdown("""
-            <div style="background:#ffffff; padding:25px; 
-                        border-radius:12px; border:1px solid #eee;
-                        box-shadow:0px 4px 12px rgba(0,0,0,0.05);">
-        """, unsafe_allow_html=True)
-
-        st.markdown(f"""
-            <h3 style="margin-top:0; font-weight:700;">{selected_symptom}</h3>
-            <p style="font-size:16px;"><b>Likely body system:</b> {info['system']}</p>
+            <div style="margin-top:20px; padding:15px; background:#fff4f4;
+                        border-left:5px solid #d9534f; border-radius:5px;">
+                <b>One or more of these symptoms may require medical attention if severe or persistent.</b>
+            </div>
         """, unsafe_allow_html=True)
-
-        st.markdown("<h4>Common Possible Causes</h4>", unsafe_allow_html=True)
-
-        for cause in info["possible_causes"]:
-            st.markdown(f"<p style='margin-left:10px;'>&#8226; {cause}</p>", unsafe_allow_html=True)
-
-        st.markdown("<br>", unsafe_allow_html=True)
-
-        # SAFETY NOTICE
-        st.markdown("<h4>General Guidance</h4>", unsafe_allow_html=True)
-        st.markdown(
-            f"<p style='color:#333;'>{info['notes']}</p>",
-            unsafe_allow_html=True,
-        )
-
-        # RISK FLAG
-        if info["seek_care"]:
-            st.markdown("""
-                <div style="margin-top:20px; padding:15px; background:#fff4f4;
-                            border-left:5px solid #d9534f; border-radius:5px;">
-                    <b>This symptom may require medical attention if severe or persistent.</b>
-                </div>
-            """, unsafe_allow_html=True)
-
-        st.markdown("</div>", unsafe_allow_html=True)
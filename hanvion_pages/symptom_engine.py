@@ -0,0 +1,220 @@
+"""
+Indexed symptom catalog: multi-symptom matching and typo-tolerant lookup.
+
+The catalog (data/symptom_catalog.csv) has one row per symptom with its
+body system, possible causes in order of how common they are, a seek-care
+flag, guidance notes and alternative names. It is compiled into
+
+- an inverted index symptom -> (cause, weight), stored CSR-style so a query
+  sums a handful of array slices with np.bincount, and
+- a trigram index over symptom names and aliases, so free text like
+  "hedache" or "short of breath" still finds its symptom.
+"""
+import csv
+import re
+from collections import defaultdict
+
+import numpy as np
+
+from hanvion_pages.metrics import timed
+
+SYMPTOM_CATALOG = "data/symptom_catalog.csv"
+
+# Minimum Dice similarity of trigram sets for a fuzzy match
+MIN_SIMILARITY = 0.35
+
+
+def _normalize(text):
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def trigrams(text):
+    """
+    Set of character trigrams of each word, padded so word starts and ends
+    count: "fever" -> {"  f", " fe", "fev", "eve", "ver", "er "}.
+    """
+    grams = set()
+    for word in _normalize(text).split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _csr(lists, dtype=np.int32):
+    """
+    (offsets, values) for a list of integer lists.
+    """
+    offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(items) for items in lists])
+    values = np.fromiter((v for items in lists for v in items), dtype=dtype, count=offsets[-1])
+    return offsets, values
+
+
+class SymptomEngine:
+    """
+    Symptom catalog compiled into array indexes.
+
+    Cause weights are precomputed per (symptom, cause): a rank prior
+    (earlier causes are more common), normalised over the symptom, times the
+    cause's inverse symptom frequency, so a cause shared by dozens of
+    symptoms says less than one specific to a few.
+    """
+
+    def __init__(self, records):
+        self.symptoms = [r["symptom"] for r in records]
+        self.notes = [r["notes"] for r in records]
+        self.seek_care = np.array([r["seek_care"] for r in records], dtype=bool)
+
+        self.systems = sorted({r["system"] for r in records})
+        system_ids = {s: i for i, s in enumerate(self.systems)}
+        self.system_of = np.array([system_ids[r["system"]] for r in records], dtype=np.int32)
+
+        self.causes = []
+        cause_ids = {}
+        cause_lists = []
+        for r in records:
+            ids = []
+            for cause in r["causes"]:
+                if cause not in cause_ids:
+                    cause_ids[cause] = len(self.causes)
+                    self.causes.append(cause)
+                ids.append(cause_ids[cause])
+            cause_lists.append(ids)
+        self.cause_offsets, self.cause_index = _csr(cause_lists)
+
+        symptom_count = np.bincount(self.cause_index, minlength=len(self.causes))
+        idf = np.log(1 + len(records) / np.maximum(symptom_count, 1))
+        weights = []
+        for ids in cause_lists:
+            prior = 1.0 / np.arange(1, len(ids) + 1)
+            weights.extend(prior / prior.sum() * idf[ids])
+        self.cause_weights = np.asarray(weights, dtype=np.float64)
+
+        self._build_name_index(records)
+
+    def _build_name_index(self, records):
+        self.ids = {}
+        names = []
+        name_symptom = []
+        for i, r in enumerate(records):
+            for name in [r["symptom"], *r["aliases"]]:
+                key = _normalize(name)
+                if key and key not in self.ids:
+                    self.ids[key] = i
+                    names.append(key)
+                    name_symptom.append(i)
+        self.name_symptom = np.asarray(name_symptom, dtype=np.int32)
+
+        gram_ids = {}
+        postings = defaultdict(list)
+        sizes = []
+        for n, name in enumerate(names):
+            grams = trigrams(name)
+            sizes.append(len(grams))
+            for gram in grams:
+                postings[gram_ids.setdefault(gram, len(gram_ids))].append(n)
+        self.gram_ids = gram_ids
+        self.gram_offsets, self.gram_names = _csr([postings[g] for g in range(len(gram_ids))])
+        self.name_sizes = np.asarray(sizes, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.symptoms)
+
+    @classmethod
+    def from_csv(cls, path=SYMPTOM_CATALOG):
+        records = []
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                records.append({
+                    "symptom": row["symptom"].strip(),
+                    "system": row["system"].strip(),
+                    "causes": [c.strip() for c in row["causes"].split("|") if c.strip()],
+                    "seek_care": row["seek_care"].strip() in ("1", "true", "True", "yes"),
+                    "notes": row["notes"].strip(),
+                    "aliases": [a.strip() for a in (row.get("aliases") or "").split("|") if a.strip()],
+                })
+        return cls(records)
+
+    # -----------------------------
+    # Lookup
+    # -----------------------------
+    def symptom_id(self, name):
+        return self.ids.get(_normalize(name))
+
+    def lookup(self, text, limit=5):
+        """
+        Symptoms whose name or an alias resembles text, best first, as
+        [(symptom, similarity)]. An exact name or alias scores 1.0.
+        """
+        exact = self.symptom_id(text)
+        if exact is not None:
+            return [(self.symptoms[exact], 1.0)]
+
+        grams = trigrams(text)
+        gram_ids = [self.gram_ids[g] for g in grams if g in self.gram_ids]
+        if not gram_ids:
+            return []
+
+        hits = np.concatenate([self.gram_names[self.gram_offsets[g]:self.gram_offsets[g + 1]]
+                               for g in gram_ids])
+        shared = np.bincount(hits, minlength=self.name_sizes.size)
+        # Dice >= m needs at least m * |q| / (2 - m) shared trigrams
+        names = np.flatnonzero(shared >= MIN_SIMILARITY * len(grams) / (2 - MIN_SIMILARITY))
+        dice = 2.0 * shared[names] / (self.name_sizes[names] + len(grams))
+        keep = dice >= MIN_SIMILARITY
+        names, dice = names[keep], dice[keep]
+
+        # Best name per symptom, then best symptoms
+        order = np.argsort(-dice, kind="stable")
+        symptoms, first = np.unique(self.name_symptom[names[order]], return_index=True)
+        best = np.sort(first)[:limit]
+        return [(self.symptoms[self.name_symptom[names[order[i]]]], float(dice[order[i]])) for i in best]
+
+    # -----------------------------
+    # Matching
+    # -----------------------------
+    @timed("symptom_match")
+    def match(self, symptoms, limit=10):
+        """
+        Rank causes and body systems for a set of symptom names.
+
+        Causes are ordered by how many of the symptoms they explain, then by
+        summed weight. Returns {"causes": [(cause, score, explained)],
+        "systems": [(system, symptom count)], "seek_care": bool}.
+        """
+        ids = sorted({i for i in (self.symptom_id(s) for s in symptoms) if i is not None})
+        if not ids:
+            return {"causes": [], "systems": [], "seek_care": False}
+
+        spans = [slice(self.cause_offsets[i], self.cause_offsets[i + 1]) for i in ids]
+        causes = np.concatenate([self.cause_index[s] for s in spans])
+        weights = np.concatenate([self.cause_weights[s] for s in spans])
+
+        score = np.bincount(causes, weights=weights, minlength=len(self.causes))
+        explained = np.bincount(causes, minlength=len(self.causes))
+        hit = np.flatnonzero(explained)
+        order = hit[np.lexsort((-score[hit], -explained[hit]))][:limit]
+
+        systems = np.bincount(self.system_of[ids], minlength=len(self.systems))
+        system_order = np.flatnonzero(systems)[np.argsort(-systems[systems > 0], kind="stable")]
+
+        return {
+            "causes": [(self.causes[c], float(score[c]), int(explained[c])) for c in order],
+            "systems": [(self.systems[s], int(systems[s])) for s in system_order],
+            "seek_care": bool(self.seek_care[ids].any()),
+        }
+
+    def details(self, symptom):
+        """
+        Catalog entry for one symptom (system, causes, seek_care, notes).
+        """
+        i = self.symptom_id(symptom)
+        if i is None:
+            return None
+        span = slice(self.cause_offsets[i], self.cause_offsets[i + 1])
+        return {
+            "system": self.systems[self.system_of[i]],
+            "possible_causes": [self.causes[c] for c in self.cause_index[span]],
+            "seek_care": bool(self.seek_care[i]),
+            "notes": self.notes[i],
+        }
@@ -0,0 +1,317 @@
+"""
+Build cms_procedures.csv from Transparency-in-Coverage in-network-rate files.
+
+Payer in-network files are single JSON documents that run to many
+gigabytes. They are parsed incrementally here: the top-level object is
+walked by hand and each element of the in_network array (and of any other
+large top-level array, such as provider_references) is decoded on its own
+from a sliding buffer. Memory is bounded by the largest single element, not
+by the file.
+
+Negotiated rates are filtered to the billing codes we care about and
+sketched per (code, setting) (see hanvion_pages.sketches). Files are spread
+over a process pool and their sketches merged. The merged sketches are saved
+as the price sketch store and summarised into the cms_procedures schema.
+
+    python -m hanvion_pages.tic_ingest payer1.json.gz payer2.json \\
+        --codes-from data/cms_procedures.csv --out data/cms_procedures.csv --workers 4
+
+With --append, new files are merged into the existing sketch store and the
+CSV is rewritten from the combined sketches. When --out is the --codes-from
+CSV, rows for codes and settings no file priced are written back unchanged.
+"""
+import argparse
+import csv
+import gzip
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from hanvion_pages.datastore import CMS_COLUMNS, CMS_CSV, split_cms_row
+from hanvion_pages.sketches import SKETCH_STORE, PriceSketch, SketchStore, load_sketch_store
+
+READ_CHUNK = 1 << 20
+
+# Dollar-denominated rate types; "percentage" and "per diem" are not
+# comparable to a per-service price.
+PRICE_RATE_TYPES = {"negotiated", "derived", "fee schedule"}
+
+SETTING_BY_CLASS = {"professional": "Clinic", "institutional": "Hospital"}
+
+
+# -----------------------------
+# Incremental JSON walking
+# -----------------------------
+class JsonStream:
+    """
+    Cursor over a JSON text that decodes one value at a time.
+    """
+
+    def __init__(self, f, chunk=READ_CHUNK):
+        self.f = f
+        self.chunk = chunk
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _read(self, size):
+        if self.pos > self.chunk:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        data = self.f.read(size)
+        if not data:
+            self.eof = True
+            return False
+        self.buf += data
+        return True
+
+    def peek(self):
+        """
+        Next non-whitespace character without consuming it ("" at EOF).
+        """
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._read(self.chunk):
+                return ""
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"expected {char!r}, found {found!r}")
+        self.pos += 1
+
+    def value(self):
+        """
+        Decode the next complete value.
+
+        A failed decode means the value runs past the buffer: read more,
+        doubling the read size so one large value costs amortized linear
+        time, and retry. A value ending exactly at the buffer end may be a
+        truncated number, so that also reads more before accepting it.
+        """
+        self.peek()
+        read_size = self.chunk
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._read(read_size)
+            read_size *= 2
+
+    def items(self):
+        """
+        Iterate an array's elements one by one.
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            sep = self.peek()
+            self.pos += 1
+            if sep == "]":
+                return
+            if sep != ",":
+                raise ValueError(f"expected ',' or ']', found {sep!r}")
+
+
+def _open_text(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def iter_in_network(path):
+    """
+    Yield each in_network entry of a TiC file without loading the file.
+    """
+    with _open_text(path) as f:
+        stream = JsonStream(f)
+        stream.expect("{")
+        while stream.peek() != "}":
+            key = stream.value()
+            stream.expect(":")
+            if key == "in_network":
+                yield from stream.items()
+            elif stream.peek() == "[":
+                # Other big arrays (provider_references) are skipped element-wise
+                for _ in stream.items():
+                    pass
+            else:
+                stream.value()
+            if stream.peek() == ",":
+                stream.pos += 1
+
+
+# -----------------------------
+# Sketching
+# -----------------------------
+def _provider_count(negotiated_rate):
+    groups = negotiated_rate.get("provider_groups")
+    if groups:
+        return sum(len(g.get("npi") or [None]) for g in groups)
+    return len(negotiated_rate.get("provider_references") or [None])
+
+
+def pick_setting(settings, billing_class):
+    """
+    Setting for one price of a code listed under settings ({setting: description}).
+
+    The billing_class setting is used when the reference lists it or lists
+    nothing; a code listed under exactly one setting keeps that setting.
+    """
+    by_class = SETTING_BY_CLASS.get(billing_class, "Clinic")
+    if len(settings) == 1 and by_class not in settings:
+        return next(iter(settings))
+    return by_class
+
+
+def aggregate_file(path, reference):
+    """
+    Sketch one TiC file into {(code, setting): PriceSketch}.
+
+    reference maps code -> {setting: description} for the codes to keep
+    (see pick_setting for how a price is assigned a setting).
+    """
+    aggregates = {}
+
+    for item in iter_in_network(path):
+        code = str(item.get("billing_code", ""))
+        if code not in reference:
+            continue
+        settings = reference[code]
+
+        for negotiated_rate in item.get("negotiated_rates", ()):
+            providers = _provider_count(negotiated_rate)
+            for price in negotiated_rate.get("negotiated_prices", ()):
+                if price.get("negotiated_type", "negotiated") not in PRICE_RATE_TYPES:
+                    continue
+                setting = pick_setting(settings, price.get("billing_class"))
+                key = (code, setting)
+                sketch = aggregates.get(key)
+                if sketch is None:
+                    description = settings.get(setting) or next(iter(settings.values()), "")
+                    sketch = aggregates[key] = PriceSketch(description or item.get("description", ""))
+                sketch.add(float(price["negotiated_rate"]), providers)
+
+    return aggregates
+
+
+def ingest_files(paths, reference, workers=None, store=None):
+    """
+    Sketch many TiC files across a process pool and merge the results,
+    into store when one is given.
+    """
+    if workers == 1 or len(paths) == 1:
+        parts = [aggregate_file(p, reference) for p in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(aggregate_file, paths, [reference] * len(paths)))
+
+    store = store if store is not None else SketchStore()
+    for part in parts:
+        store.merge(part)
+    return store
+
+
+# -----------------------------
+# Reference codes and output
+# -----------------------------
+def read_cms_rows(csv_path):
+    """
+    Rows of a cms_procedures CSV as lists in CMS_COLUMNS order ([] if absent).
+    """
+    if not csv_path or not os.path.exists(csv_path):
+        return []
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        return [split_cms_row(fields) for fields in reader if fields]
+
+
+def load_reference(csv_path=CMS_CSV, codes=None):
+    """
+    code -> {setting: description} from an existing cms_procedures CSV,
+    optionally restricted to codes. Codes missing from the CSV are kept
+    with no settings, so billing_class decides theirs.
+    """
+    reference = {}
+    for row in read_cms_rows(csv_path):
+        reference.setdefault(row[0], {})[row[2]] = row[1]
+    if codes:
+        reference = {c: reference.get(c, {}) for c in codes}
+    return reference
+
+
+def write_cms_csv(store, out_path, keep_rows=()):
+    """
+    Write one row per sketched (code, setting), plus the keep_rows (raw CSV
+    rows) whose (code, setting) was not sketched, sorted by code and setting.
+    """
+    rows = []
+    for (code, setting), sketch in store.items():
+        digest = sketch.digest
+        rows.append([
+            code, sketch.description, setting,
+            round(digest.quantile(0.5)), round(digest.min), round(digest.max), sketch.providers,
+        ])
+    sketched = {(row[0], row[2]) for row in rows}
+    rows.extend(row for row in keep_rows if (row[0], row[2]) not in sketched)
+    rows.sort(key=lambda row: (row[0], row[2]))
+
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(CMS_COLUMNS)
+        writer.writerows(rows)
+    os.replace(tmp_path, out_path)
+    return len(rows)
+
+
+def _same_file(a, b):
+    try:
+        return os.path.samefile(a, b)
+    except OSError:
+        return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aggregate TiC in-network files into cms_procedures.csv.")
+    parser.add_argument("files", nargs="+", help="in-network JSON files (.json or .json.gz)")
+    parser.add_argument("--codes-from", default=CMS_CSV,
+                        help="cms_procedures CSV whose codes, descriptions and settings to keep")
+    parser.add_argument("--codes", default=None, help="comma-separated billing codes to keep")
+    parser.add_argument("--out", default=CMS_CSV)
+    parser.add_argument("--sketches", default=SKETCH_STORE, help="price sketch store to write")
+    parser.add_argument("--append", action="store_true",
+                        help="merge into the existing sketch store instead of replacing it")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    codes = args.codes.split(",") if args.codes else None
+    reference = load_reference(args.codes_from, codes)
+    if not reference:
+        parser.error("no billing codes to keep; pass --codes or --codes-from")
+
+    # Rewriting the reference CSV in place: rows no file priced stay as they were
+    keep_rows = read_cms_rows(args.out) if _same_file(args.out, args.codes_from) else ()
+
+    store = load_sketch_store(args.sketches) if args.append else None
+    store = ingest_files(args.files, reference, args.workers, store)
+    store.save(args.sketches)
+    n = write_cms_csv(store, args.out, keep_rows)
+    print(f"Wrote {n} code/setting rows to {args.out} and {args.sketches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_STACK = ("pandas", "numpy", "pyarrow")
+
+# Small chunks, so a few thousand rows cross several chunk boundaries
+CHUNK_ROWS = 1000
+
+
+@pytest.fixture(params=[1, 2], ids=["serial", "2-workers"])
+def stream(request, tmp_path):
+    """
+    stream(frame, score, edges, **kwargs) -> (frame, result, scored).
+
+    Places the `edges` rows on both sides of the first chunk boundary of
+    `frame`, writes it to Parquet and streams it through
+    score(in_path, out_path, workers=..., chunk_rows=CHUNK_ROWS, **kwargs),
+    once in-process and once with a worker pool. Returns the frame as
+    written, score's return value and the scored output read back, whose
+    rows must line up with the frame's.
+    """
+    def run(frame, score, edges, **kwargs):
+        half = len(edges) // 2
+        frame = frame.copy()
+        frame.iloc[CHUNK_ROWS - half:CHUNK_ROWS - half + len(edges)] = edges[frame.columns].to_numpy()
+        frame = frame.astype(edges.dtypes.to_dict())
+        in_path, out_path = str(tmp_path / "in.parquet"), str(tmp_path / "out.parquet")
+        frame.to_parquet(in_path, index=False)
+
+        result = score(in_path, out_path, workers=request.param, chunk_rows=CHUNK_ROWS, **kwargs)
+        scored = pd.read_parquet(out_path)
+        assert len(scored) == len(frame)
+        return frame, result, scored
+
+    return run
+
+
+@pytest.fixture
+def data_stack_after_import():
+    """
+    data_stack_after_import(module) -> the DATA_STACK modules importing
+    `module` loads, checked in a fresh interpreter.
+    """
+    def run(module):
+        code = f"import sys, {module}; print(' '.join(m for m in {DATA_STACK!r} if m in sys.modules))"
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=ROOT)
+        return out.stdout.split()
+
+    return run
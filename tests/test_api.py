@@ -0,0 +1,86 @@
+import json
+import threading
+import urllib.request
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from hanvion_pages import api
+
+
+def _data(**overrides):
+    fields = dict(cms=None, cms_index=None, medications=None, sigmas={}, states={})
+    fields.update(overrides)
+    data = SimpleNamespace(**fields)
+    data.current = lambda: data
+    return data
+
+
+def test_missing_dataset_answers_503():
+    status, payload = api.dispatch(_data(), "/v1/cms/search", {"q": "mri"})
+    assert status == 503
+    assert "cms" in payload["error"]
+
+
+def test_unexpected_error_answers_500(monkeypatch):
+    def broken(data, items):
+        raise AttributeError("boom")
+
+    monkeypatch.setitem(api.ROUTES, "/v1/bmi", broken)
+    status, payload = api.dispatch(_data(), "/v1/bmi", {"weight": 70, "height_cm": 170})
+    assert status == 500
+    assert "AttributeError" in payload["error"]
+
+
+def test_bad_input_still_answers_400():
+    status, _ = api.dispatch(_data(), "/v1/bmi", {"weight": 70})
+    assert status == 400
+
+
+@pytest.fixture
+def server():
+    prices = SimpleNamespace(strengths={"A": ["1 mg"]},
+                             lookup=lambda drug, strength: {"drug": drug, "cash_low": np.float64("nan")})
+    server = api.make_server(port=0, data=_data(medications=prices))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_nan_is_sent_as_null(server):
+    request = urllib.request.Request(f"{server}/v1/medications", method="POST",
+                                     data=json.dumps({"drug": "A", "strength": "1 mg"}).encode())
+    with urllib.request.urlopen(request) as response:
+        body = response.read().decode()
+    assert "NaN" not in body
+    assert json.loads(body) == {"drug": "A", "cash_low": None}
+
+
+@pytest.mark.parametrize("path", ["/v1/visit-payment", "/v1/annual-spend", "/v1/annual-spend/simulate"])
+@pytest.mark.parametrize("value", ["false", "0", 0, 1, None])
+def test_insurance_flag_must_be_a_json_bool(path, value):
+    item = {"visit_type": "Primary Care Visit", "deductible": 1500, "oop_max": 5000,
+            "coinsurance_pct": 20, "visits_pc": 2, "has_insurance": value, "n_years": 10}
+    status, payload = api.dispatch(_data(), path, [item])
+    assert status == 400
+    assert "has_insurance" in payload["error"]
+
+
+def test_in_network_flag_must_be_a_json_bool():
+    item = {"visit_type": "Primary Care Visit", "deductible": 1500, "oop_max": 5000,
+            "coinsurance_pct": 20, "in_network": "no"}
+    status, payload = api.dispatch(_data(), "/v1/visit-payment", item)
+    assert status == 400
+    assert "in_network" in payload["error"]
+
+
+def test_insurance_flag_false_prices_without_a_plan():
+    item = {"visit_type": "Primary Care Visit", "deductible": 1500, "oop_max": 5000,
+            "coinsurance_pct": 20, "deductible_met": 1500}
+    status, (insured, uninsured) = api.dispatch(
+        _data(), "/v1/visit-payment", [item, dict(item, has_insurance=False)])
+    assert status == 200
+    assert uninsured["plan_pays"] == 0
+    assert uninsured["patient_pays"] == uninsured["allowed"]
+    assert insured["plan_pays"] > 0
@@ -0,0 +1,187 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from hanvion_pages import claims
+from hanvion_pages.claims import (
+    VISIT_TYPES,
+    adjudicate,
+    annual_patient_spend,
+    pareto_frontier,
+    plan_grid,
+    sample_claim_years,
+    simulate_annual_spend,
+    simulate_visit_payment_batch,
+    simulation_years,
+    sweep_plans,
+)
+from hanvion_pages.insurance_eligibility import estimate_annual_spend, simulate_visit_payment
+
+GRID = {
+    "visit_type": VISIT_TYPES + ["Unknown Visit"],
+    "in_network": [True, False],
+    "has_insurance": [True, False],
+    "deductible": [0, 100, 1500],
+    "deductible_met": [0, 50, 100, 2000],
+    "oop_max": [0, 20, 5000],
+    "coinsurance_pct": [0, 20, 35],
+    "copay": [0, 30, 500],
+}
+
+
+@pytest.fixture(scope="module")
+def grid():
+    rows = list(itertools.product(*GRID.values()))
+    return [dict(zip(GRID, row)) for row in rows]
+
+
+def test_batch_matches_scalar_visit_payment(grid):
+    columns = {name: np.array([row[name] for row in grid]) for name in GRID}
+    allowed, plan_pays, patient_pays = simulate_visit_payment_batch(
+        columns["visit_type"], columns["in_network"], columns["deductible"],
+        columns["deductible_met"], columns["oop_max"], columns["coinsurance_pct"],
+        columns["copay"], has_insurance=columns["has_insurance"],
+    )
+
+    expected = np.array([simulate_visit_payment(**row) for row in grid], dtype=np.float64)
+    np.testing.assert_allclose(allowed, expected[:, 0], rtol=1e-12, atol=0)
+    np.testing.assert_allclose(plan_pays, expected[:, 1], rtol=1e-12, atol=0)
+    np.testing.assert_allclose(patient_pays, expected[:, 2], rtol=1e-12, atol=0)
+
+
+def test_batch_broadcasts_one_plan_over_many_visits():
+    allowed, plan_pays, patient_pays = simulate_visit_payment_batch(
+        VISIT_TYPES, True, 1500, 1400, 5000, 20, 30)
+
+    for i, visit_type in enumerate(VISIT_TYPES):
+        expected = simulate_visit_payment(visit_type, True, True, 1500, 1400, 5000, 20, 30)
+        assert (allowed[i], plan_pays[i], patient_pays[i]) == pytest.approx(expected, rel=1e-12)
+
+
+# -----------------------------
+# Annual spend
+# -----------------------------
+PLANS = [
+    # in_network, deductible, oop_max, coinsurance_pct, copay
+    (True, 1500, 5000, 20, 30),
+    (True, 0, 3000, 10, 0),
+    (False, 500, 0, 40, 0),
+    (True, 6000, 9200, 0, 50),
+]
+USAGE = {"Primary Care Visit": 3, "Urgent Care Visit": 1.5, "Emergency Room Visit": 0.3}
+
+
+def _claim_by_claim(sim, in_network, deductible, oop_max, coinsurance_pct, copay):
+    """
+    Reference: every visit and month-end pharmacy claim adjudicated one at a
+    time, with the deductible met so far carried through the year.
+    """
+    annual = np.zeros(sim.n_years)
+    rate = 0.6 if in_network else 1.0
+    coinsurance = coinsurance_pct / 100.0
+    for year in range(sim.n_years):
+        in_year = sim.year == year
+        spent = 0.0
+        total = 0.0
+        for month in range(12):
+            for billed in sim.billed[in_year & (sim.month == month)]:
+                allowed, _, pays = adjudicate(billed, in_network, True, deductible, spent,
+                                              0, coinsurance_pct, copay)
+                spent += float(allowed)
+                total += float(pays)
+            if sim.fills:
+                claim = sim.pharmacy[year] * rate
+                remaining = max(deductible - spent, 0)
+                if remaining > 0:
+                    total += claim if claim <= remaining else remaining + (claim - remaining) * coinsurance
+                else:
+                    total += min(copay * sim.fills, claim) if copay > 0 else claim * coinsurance
+                spent += claim
+        annual[year] = min(total, oop_max) if oop_max > 0 else total
+    return annual
+
+
+@pytest.fixture(scope="module")
+def claim_years():
+    return sample_claim_years(USAGE, meds_monthly=2, n_years=400, seed=3)
+
+
+@pytest.mark.parametrize("plan", PLANS)
+def test_annual_spend_matches_claim_by_claim(claim_years, plan):
+    np.testing.assert_allclose(annual_patient_spend(claim_years, *plan),
+                               _claim_by_claim(claim_years, *plan), rtol=1e-9, atol=1e-9)
+
+
+def test_plan_arrays_price_each_plan_like_a_scalar_plan(claim_years):
+    in_network, deductible, oop_max, coinsurance, copay = (np.array(col)[:, None] for col in zip(*PLANS))
+    batch = annual_patient_spend(claim_years, in_network, deductible, oop_max, coinsurance, copay)
+
+    assert batch.shape == (len(PLANS), claim_years.n_years)
+    for row, plan in zip(batch, PLANS):
+        np.testing.assert_allclose(row, annual_patient_spend(claim_years, *plan), rtol=1e-12)
+
+
+def test_self_pay_mean_matches_estimate_annual_spend():
+    # Prices at the BASE_VISIT_COSTS medians: the only randomness left is the
+    # Poisson visit counts, whose means are the heuristic's inputs
+    no_spread = dict.fromkeys(VISIT_TYPES, 0.0)
+    simulated = simulate_annual_spend(3, 1, 0.5, 0, has_insurance=True, n_years=200_000,
+                                      sigmas=no_spread)
+    self_pay, _ = estimate_annual_spend(3, 1, 0.5, 0, has_insurance=True)
+
+    assert simulated["self_pay"]["mean"] == pytest.approx(self_pay, rel=0.01)
+    assert simulated["insured"]["mean"] < simulated["self_pay"]["mean"]
+
+
+def test_heavy_users_simulate_fewer_years():
+    light = {"Primary Care Visit": 2, "Urgent Care Visit": 1}
+    heavy = {"Primary Care Visit": 20, "Urgent Care Visit": 10, "Emergency Room Visit": 5}
+    assert simulation_years(light, 1) == claims.SIM_YEARS
+    assert simulation_years({}, 0) == claims.SIM_YEARS
+    assert simulation_years(heavy, 20) * (35 + 12) <= claims.SIM_CLAIMS
+    assert simulation_years(heavy, 20, claims=1) == claims.MIN_SIM_YEARS
+
+
+def test_capped_simulation_agrees_with_the_full_one():
+    capped = simulate_annual_spend(20, 10, 5, 20, has_insurance=True, oop_max=0)
+    full = simulate_annual_spend(20, 10, 5, 20, has_insurance=True, oop_max=0,
+                                 n_years=claims.SIM_YEARS, seed=1)
+    for kind in ("self_pay", "insured"):
+        for stat in ("mean", "p50", "p90", "p99"):
+            assert capped[kind][stat] == pytest.approx(full[kind][stat], rel=0.02)
+
+
+@pytest.mark.parametrize("cells", [claims.SWEEP_CELLS, 5_000])
+def test_sweep_matches_each_plan_priced_alone(claim_years, monkeypatch, cells):
+    # A small SWEEP_CELLS prices the grid in many chunks
+    monkeypatch.setattr(claims, "SWEEP_CELLS", cells)
+    plans = plan_grid(deductible=[0, 1000, 4500], oop_max=[0, 3000, 9200], copay=[0, 30])
+    plans["premium"] = np.arange(len(plans)) * 10.0
+
+    swept = sweep_plans(claim_years, plans)
+
+    for plan in swept.itertuples():
+        alone = annual_patient_spend(claim_years, True, plan.deductible, plan.oop_max,
+                                     plan.coinsurance_pct, plan.copay)
+        assert plan.expected_oop == pytest.approx(alone.mean(), rel=1e-12)
+        assert plan.p90_oop == pytest.approx(np.percentile(alone, 90), rel=1e-12)
+        assert plan.expected_cost == pytest.approx(plan.premium + alone.mean(), rel=1e-12)
+        worst = plan.oop_max if plan.oop_max > 0 else alone.max()
+        assert plan.worst_case == pytest.approx(plan.premium + worst, rel=1e-12)
+
+
+def _dominated(cost, risk, i):
+    return any(cost[j] <= cost[i] and risk[j] <= risk[i] and (cost[j] < cost[i] or risk[j] < risk[i])
+               for j in range(len(cost)))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_pareto_frontier_matches_pairwise_dominance(seed):
+    rng = np.random.default_rng(seed)
+    # Few distinct values, so ties on cost, on risk and on both are common
+    cost = rng.integers(0, 8, 60).astype(float)
+    risk = rng.integers(0, 8, 60).astype(float)
+
+    expected = [not _dominated(cost, risk, i) for i in range(len(cost))]
+    assert pareto_frontier(cost, risk).tolist() == expected
@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+
+from benchmarks import synthetic
+from hanvion_pages import cms_costs
+from hanvion_pages.cms_search import ProcedureSearchIndex
+
+
+@pytest.fixture(scope="module")
+def cms():
+    df = synthetic.cms_frame(5000, seed=2)
+    return df, ProcedureSearchIndex.build(df["code"], df["description"])
+
+
+@pytest.fixture
+def filter_procedures(cms, monkeypatch):
+    df, index = cms
+    monkeypatch.setattr(cms_costs, "load_cms_search_index", lambda: index)
+    return lambda text, setting="All": cms_costs.filter_procedures(df, text, setting)
+
+
+def _substring_filter(df, text, setting="All"):
+    # The viewer's filter before the search index
+    s = text.lower()
+    filtered = df[df["description"].str.lower().str.contains(s, regex=False)
+                  | df["code"].astype(str).str.contains(s, regex=False)]
+    return filtered if setting == "All" else filtered[filtered["setting"] == setting]
+
+
+# Whole words, word starts, word-internal substrings and code prefixes
+@pytest.mark.parametrize("text", ["office", "Brain", "  mri ", "scopy", "ectro", "term12", "term999",
+                                  "0001234", "0004999", "nomatch"])
+@pytest.mark.parametrize("setting", ["All", "Imaging"])
+def test_single_word_matches_substring_filter(filter_procedures, cms, text, setting):
+    got = filter_procedures(text, setting)
+    expected = _substring_filter(cms[0], text.strip(), setting)
+    assert sorted(got.index) == sorted(expected.index)
+
+
+@pytest.mark.parametrize("text", ["mri brain", "visit patient", "blood test draw"])
+def test_phrase_matches_are_all_found(filter_procedures, cms, text):
+    got = set(filter_procedures(text).index)
+    assert set(_substring_filter(cms[0], text).index) <= got
+    # Every word of the query is in every result
+    for description in cms[0].loc[sorted(got), "description"]:
+        assert all(word in description for word in text.split())
+
+
+def test_ranking(cms):
+    df, index = cms
+    rows = index.search("0001234")
+    assert df["code"].iloc[rows[0]] == "0001234"
+    # Codes match from their start only
+    assert index.search("4999").size == 0
+
+    # Whole word before word start before word-internal match
+    small = pd.DataFrame({"code": ["1", "2", "3"],
+                          "description": ["upper endoscopy", "scopy tool", "scopyx exam"]})
+    small_index = ProcedureSearchIndex.build(small["code"], small["description"])
+    assert small_index.search("scopy").tolist() == [1, 2, 0]
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from hanvion_pages.cohort import BMI_CATEGORIES, decode_recommendations, score_cohort, score_file
+from hanvion_pages.health_profile import calculate_bmi, lifestyle_score, prevention_recommendations
+
+# Category edges (BMI exactly 18.5, 24.9, 29.9 at 2 m) and thresholds of
+# the score
+EDGES = pd.DataFrame({
+    "weight": [74.0, 99.6, 119.6, 74.0, 99.6, 119.6],
+    "height_cm": [200.0] * 6,
+    "sleep": [6, 5, 6, 5, 6, 5],
+    "activity_days": [3, 2, 3, 2, 3, 2],
+    "stress": ["High"] * 6,
+    "smoking": ["Yes", "No"] * 3,
+    "alcohol": ["Frequent"] * 6,
+})
+
+
+def _cohort(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "weight": rng.uniform(35, 160, n).round(1),
+        "height_cm": rng.uniform(140, 205, n).round(1),
+        "sleep": rng.integers(3, 10, n),
+        "activity_days": rng.integers(0, 8, n),
+        "stress": rng.choice(["Low", "Medium", "High"], n),
+        "smoking": rng.choice(["No", "Yes"], n),
+        "alcohol": rng.choice(["None", "Occasional", "Frequent"], n),
+    })
+
+
+def _expected(row):
+    bmi, category = calculate_bmi(row.weight, row.height_cm)
+    score = lifestyle_score(row.sleep, row.activity_days, row.stress, row.smoking, row.alcohol)
+    return bmi, category, score, prevention_recommendations(score, category)
+
+
+def _assert_rows_match(members, scores):
+    for row, (bmi, category, score, mask) in zip(
+            members.itertuples(), zip(scores["bmi"], scores["bmi_category"],
+                                      scores["lifestyle_score"], scores["recommendations"])):
+        assert (bmi, category, score, decode_recommendations(mask)) == _expected(row), row
+
+
+def test_score_cohort_matches_scalar_functions():
+    members = pd.concat([EDGES, _cohort(3000)], ignore_index=True)
+    _assert_rows_match(members, score_cohort(members))
+
+
+def test_streamed_scores_match_scalar_functions(stream):
+    members, summary, scored = stream(_cohort(4017, seed=1), score_file, EDGES)
+
+    _assert_rows_match(members, scored)
+    assert summary["members"] == len(members)
+    assert sum(summary["bmi_categories"].values()) == len(members)
+    assert set(summary["bmi_categories"]) == set(BMI_CATEGORIES)
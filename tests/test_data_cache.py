@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from hanvion_pages.data_cache import DataCache, nbytes
+
+
+def test_nbytes_reports_buffers():
+    assert nbytes(np.zeros(1000)) == 8000
+    assert nbytes(pd.DataFrame({"a": np.zeros(1000)})) >= 8000
+    assert nbytes({"k": np.zeros(10)}) > 80
+
+
+def test_oversized_value_is_kept_as_the_only_entry():
+    cache = DataCache(budget_bytes=10_000)
+    cache.put("small", np.zeros(100))
+    loads = []
+
+    def load():
+        loads.append(1)
+        return np.zeros(10_000)
+
+    for _ in range(3):
+        value = cache.get("big", load)
+    assert value.size == 10_000
+    assert len(loads) == 1
+    stats = cache.stats()
+    assert stats["oversized"] == 1
+    assert list(stats["sizes"]) == ["big"]
+
+
+def test_import_does_not_load_the_data_stack(data_stack_after_import):
+    assert data_stack_after_import("hanvion_pages.data_cache") == []
@@ -0,0 +1,85 @@
+import os
+import threading
+
+import pytest
+
+from hanvion_pages import data_cache, data_reload
+from hanvion_pages.data_cache import DataCache, cached_data
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """
+    A private DATA_CACHE and loader registry, so the watcher sees only the
+    loaders a test declares.
+    """
+    cache, loaders = DataCache(budget_bytes=2**20), {}
+    for module in (data_cache, data_reload):
+        monkeypatch.setattr(module, "DATA_CACHE", cache)
+        monkeypatch.setattr(module, "LOADERS", loaders)
+    return cache
+
+
+def _rewrite(path, text, bump):
+    path.write_text(text)
+    stamp = os.stat(path).st_mtime_ns + bump
+    os.utime(path, ns=(stamp, stamp))
+
+
+def _poll(watcher):
+    # The real watcher polls on its own thread, away from the script run's pin
+    result = []
+    thread = threading.Thread(target=lambda: result.extend(watcher.poll()))
+    thread.start()
+    thread.join()
+    return result
+
+
+def test_held_snapshot_keeps_its_generation_across_a_reload(cache, tmp_path):
+    source = tmp_path / "prices.csv"
+    source.write_text("old")
+
+    @cached_data(sources=[str(source)])
+    def load_prices():
+        return source.read_text()
+
+    @cached_data(sources=[str(source)])
+    def load_index():
+        return load_prices().upper()
+
+    assert (load_prices(), load_index()) == ("old", "OLD")
+    watcher = data_reload.Watcher(interval=0)
+
+    with cache.snapshot() as generation:
+        _rewrite(source, "new", bump=1_000_000_000)
+        assert _poll(watcher) == []  # changed, but not settled yet
+        assert _poll(watcher) == [str(source)]
+        assert cache.generation == generation + 1
+
+        # This run still pairs the old table with the old index
+        assert (load_prices(), load_index()) == ("old", "OLD")
+        assert cache.stats()["retired"] == 2
+
+    assert (load_prices(), load_index()) == ("new", "NEW")
+    with cache.snapshot() as generation:
+        assert generation == cache.generation
+        assert (load_prices(), load_index()) == ("new", "NEW")
+    assert cache.stats()["retired"] == 0
+
+
+def test_failed_reload_keeps_the_loaded_value(cache, tmp_path):
+    source = tmp_path / "prices.csv"
+    source.write_text("old")
+
+    @cached_data(sources=[str(source)])
+    def load_prices():
+        text = source.read_text()
+        return None if text == "broken" else text
+
+    assert load_prices() == "old"
+    watcher = data_reload.Watcher(interval=0)
+    _rewrite(source, "broken", bump=1_000_000_000)
+    _poll(watcher)
+    assert _poll(watcher) == []
+    assert load_prices() == "old"
+    assert cache.generation == 0
@@ -0,0 +1,79 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from hanvion_pages import datastore
+
+
+@pytest.fixture
+def state_files(tmp_path, monkeypatch, request):
+    """
+    A copy of the state XLSX and a store path, plus the list of XLSX paths
+    build_state_store has parsed.
+    """
+    xlsx = tmp_path / "tableA1.xlsx"
+    shutil.copy(request.config.rootpath / datastore.STATE_XLSX, xlsx)
+    builds = []
+    build = datastore.build_state_store
+
+    def counting_build(xlsx_path, store_path):
+        builds.append(xlsx_path)
+        return build(xlsx_path, store_path)
+
+    monkeypatch.setattr(datastore, "build_state_store", counting_build)
+    return str(xlsx), str(tmp_path / "tableA1.arrow"), builds
+
+
+def _touch(path, seconds=10):
+    stamp = os.stat(path).st_mtime_ns + seconds * 1_000_000_000
+    os.utime(path, ns=(stamp, stamp))
+
+
+def test_unchanged_xlsx_opens_the_snapshot(state_files):
+    xlsx, store, builds = state_files
+    first = datastore.open_state_store(xlsx, store)
+    assert datastore.open_state_store(xlsx, store).equals(first)
+    assert len(builds) == 1
+
+
+def test_touched_xlsx_is_restamped_not_rebuilt(state_files):
+    xlsx, store, builds = state_files
+    first = datastore.open_state_store(xlsx, store)
+    _touch(xlsx)
+
+    assert datastore.open_state_store(xlsx, store).equals(first)
+    assert len(builds) == 1
+    meta = datastore.store_metadata(store)
+    assert meta["source_mtime_ns"] == str(os.stat(xlsx).st_mtime_ns)
+
+    # The new stamp is current: the next open reads no XLSX bytes at all
+    def no_hashing(path):
+        raise AssertionError("hashed an unchanged source")
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(datastore, "file_sha256", no_hashing)
+        assert datastore.open_state_store(xlsx, store).equals(first)
+
+
+def test_edited_xlsx_is_rebuilt(state_files):
+    xlsx, store, builds = state_files
+    datastore.open_state_store(xlsx, store)
+    df = pd.read_excel(xlsx)
+    df.loc[df["state"] == "CA", "insured_rate"] = 50.0
+    df.to_excel(xlsx, index=False)
+    _touch(xlsx)
+
+    table = datastore.open_state_store(xlsx, store).to_pandas()
+    assert len(builds) == 2
+    assert table.loc[table["state"] == "CA", "insured_rate"].item() == 50.0
+    assert datastore.store_metadata(store)["source_sha256"] == datastore.file_sha256(xlsx)
+
+
+def test_missing_xlsx_keeps_serving_the_snapshot(state_files):
+    xlsx, store, builds = state_files
+    first = datastore.open_state_store(xlsx, store)
+    os.remove(xlsx)
+    assert datastore.open_state_store(xlsx, store).equals(first)
+    assert len(builds) == 1
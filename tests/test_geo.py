@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from hanvion_pages.geo import NATIONAL, GeoIndex, zip3
+
+
+@pytest.fixture(scope="module")
+def geo():
+    return GeoIndex.from_frame(pd.DataFrame({
+        "zip3_start": ["010", "021", "028", "100"],
+        "zip3_end": ["027", "022", "029", "100"],
+        "state": ["MA", "MA", "RI", "NY"],
+        "locality": ["Rest of Massachusetts", "Boston", "Rhode Island", "Manhattan"],
+        "factor": [1.05, 1.15, 1.02, 1.30],
+        "lat": [42.3, 42.36, 41.7, 40.78],
+        "lon": [-71.8, -71.06, -71.5, -73.97],
+    }))
+
+
+@pytest.mark.parametrize("zip_code, expected", [
+    ("02115", 21), ("02115-1234", 21), (2115, 21), (" 10001 ", 100), ("00501", 5),
+    ("2115", -1), ("abcde", -1), ("", -1), (-1, -1), (100000, -1),
+])
+def test_zip3(zip_code, expected):
+    assert zip3(zip_code) == expected
+
+
+@pytest.mark.parametrize("zip_code, locality, factor", [
+    ("02115", "Boston", 1.15),                 # metro range beats the state-wide one
+    ("02301", "Rest of Massachusetts", 1.05),
+    ("01002", "Rest of Massachusetts", 1.05),
+    ("02860", "Rhode Island", 1.02),
+    ("10001", "Manhattan", 1.30),
+])
+def test_zip3_lookup(geo, zip_code, locality, factor):
+    assert geo.locality(zip_code)["locality"] == locality
+    assert geo.factor(zip_code) == factor
+
+
+@pytest.mark.parametrize("zip_code", ["99999", "00000", "bogus", "123"])
+def test_unknown_zip_falls_back_to_national(geo, zip_code):
+    assert geo.locality_id(zip_code) == NATIONAL
+    assert geo.locality(zip_code) is None
+    assert geo.factor(zip_code) == 1.0
+    assert geo.adjust((85, 140), zip_code) == (85, 140)
+
+
+def test_adjust_rounds_to_whole_dollars(geo):
+    assert geo.adjust(85, "02115") == 98
+    assert geo.adjust((85, 140), "10001") == (110, 182)
+
+
+def test_bulk_lookup_matches_single(geo):
+    zips = ["02115", "02301", "02860", "10001", "99999", "bogus", "2115"]
+    assert geo.locality_ids(zips).tolist() == [geo.locality_id(z) for z in zips]
+    assert geo.factors_for(zips).tolist() == [geo.factor(z) for z in zips]
+    ints = [2115, 2860, 10001, 99999, -5]
+    assert geo.factors_for(np.array(ints)).tolist() == [geo.factor(z) for z in ints]
+
+
+def test_price_sheet_matches_adjust(geo):
+    sheet = geo.price_sheet({"Visit": (85, 140)})
+    for zip_code in ["02115", "02301", "02860", "10001"]:
+        row = sheet[sheet["locality"] == geo.locality(zip_code)["locality"]].iloc[0]
+        assert (row["Visit low"], row["Visit high"]) == geo.adjust((85, 140), zip_code)
@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+
+from benchmarks import synthetic
+from hanvion_pages.medication_prices import MedicationPrices, _split_conditions
+
+NAMES = ["Insulin Glargine", "insulin lispro", "Glipizide", "Amlodipine", "Amoxicillin Clav",
+         "Vitamin D3", "Co-Trimoxazole", "Lisinopril HCTZ", "Hydrochlorothiazide"]
+
+
+@pytest.fixture(scope="module")
+def medications():
+    df = synthetic.medication_frame(600, seed=4)
+    extra = df.head(len(NAMES)).assign(drug=NAMES, strength="10 mg")
+    df = pd.concat([df, extra], ignore_index=True)
+    return df, MedicationPrices(df)
+
+
+def _brute_search(drugs, prefix):
+    prefix = " ".join(prefix.lower().split())
+    hits = []
+    for name in drugs:
+        words = name.lower().split()
+        # A multi-word prefix has to run on from a word start
+        if any(" ".join(words[j:]).startswith(prefix) for j in range(len(words))):
+            hits.append(name)
+    return hits
+
+
+@pytest.mark.parametrize("prefix", ["a", "am", "AMLO", "  insulin  ", "insulin g", "Insulin Glargine",
+                                    "gl", "lisinopril h", "co-t", "d3", "hctz", "in", "mri", "tr",
+                                    "glargine x", "zzz"])
+def test_search_matches_word_prefix_scan(medications, prefix):
+    df, meds = medications
+    assert meds.search(prefix) == _brute_search(sorted(df["drug"].unique()), prefix)
+
+
+@pytest.mark.parametrize("limit", [0, 1, 5, 1000])
+def test_search_limit_keeps_name_order(medications, limit):
+    df, meds = medications
+    assert meds.search("a", limit) == _brute_search(sorted(df["drug"].unique()), "a")[:limit]
+
+
+def test_empty_prefix_lists_every_drug(medications):
+    df, meds = medications
+    assert meds.search("   ") == sorted(df["drug"].unique())
+    assert meds.search("", limit=3) == sorted(df["drug"].unique())[:3]
+
+
+def test_for_condition_matches_a_scan(medications):
+    df, meds = medications
+    for condition in meds.conditions + ["Unknown"]:
+        rows = df[[condition in _split_conditions(c) for c in df["conditions"]]]
+        expected = {drug: list(group["strength"]) for drug, group in sorted(rows.groupby("drug", sort=False))}
+        assert meds.for_condition(condition) == expected
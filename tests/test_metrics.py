@@ -0,0 +1,116 @@
+import re
+
+import pytest
+
+from hanvion_pages import metrics
+from hanvion_pages.data_cache import DATA_CACHE, _local
+
+
+def test_page_fragment_records_reruns_once_and_pins_a_generation():
+    seen = []
+
+    @metrics.page_fragment("Fragment page")
+    def section():
+        seen.append(_local.generation)
+
+    before = metrics.PAGE_SECONDS.snapshot("Fragment page")[0]
+    section()  # a fragment rerun: recorded on its own
+    with metrics.page_run("Fragment page"):
+        section()  # rendered by the page's full run: recorded with it
+    assert metrics.PAGE_SECONDS.snapshot("Fragment page")[0] == before + 2
+    assert seen == [DATA_CACHE.generation] * 2
+    assert _local.generation is None
+
+
+def test_page_run_counts_errors():
+    @metrics.page_fragment("Failing page")
+    def section():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        section()
+    assert metrics.PAGE_ERRORS.values[("Failing page",)] == 1
+
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)$')
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"(?:,|$)')
+SUFFIXES = {"counter": ("_total",), "gauge": ("",), "histogram": ("_bucket", "_sum", "_count")}
+
+
+def _unescape(value):
+    return re.sub(r"\\(.)", lambda m: "\n" if m.group(1) == "n" else m.group(1), value)
+
+
+def parse_openmetrics(text):
+    """
+    {family: {"type", "help", "samples": [(name, labels, value)]}}, checking
+    the structure the exposition format requires along the way.
+    """
+    lines = text.split("\n")
+    assert lines[-2:] == ["# EOF", ""]
+    families, family = {}, None
+    for line in lines[:-2]:
+        if line.startswith("# TYPE "):
+            name, kind = line[7:].split(" ")
+            assert name not in families
+            family = families[name] = {"type": kind, "help": None, "samples": []}
+            current = name
+        elif line.startswith("# HELP "):
+            name, help = line[7:].split(" ", 1)
+            assert name == current
+            family["help"] = _unescape(help)
+        else:
+            name, labels, value = SAMPLE.match(line).groups()
+            assert any(name == current + s for s in SUFFIXES[family["type"]])
+            pairs = LABEL.findall(labels or "")
+            assert ",".join(f'{k}="{v}"' for k, v in pairs) == (labels or "")
+            family["samples"].append((name, {k: _unescape(v) for k, v in pairs}, float(value)))
+    return families
+
+
+def test_render_parses_back():
+    registry = metrics.Registry()
+    hits = registry.counter("t_requests", "Requests by \"route\".", ["route"])
+    size = registry.gauge("t_bytes", "Bytes held.")
+    latency = registry.histogram("t_seconds", "Latency.", ["page"], buckets=(0.1, 1.0))
+    hits.inc("a")
+    hits.inc('we"ird\\route\nx', amount=3)
+    size.set(value=2.5)
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, "Overview")
+    latency.observe(0.2, "CMS")
+
+    families = parse_openmetrics(registry.render())
+
+    assert families["t_requests"]["help"] == 'Requests by "route".'
+    assert families["t_requests"]["samples"] == [
+        ("t_requests_total", {"route": "a"}, 1.0),
+        ("t_requests_total", {"route": 'we"ird\\route\nx'}, 3.0),
+    ]
+    assert families["t_bytes"]["samples"] == [("t_bytes", {}, 2.5)]
+
+    by_page = {}
+    for name, labels, value in families["t_seconds"]["samples"]:
+        by_page.setdefault(labels.pop("page"), []).append((name, labels, value))
+    assert by_page["Overview"] == [
+        ("t_seconds_bucket", {"le": "0.1"}, 2.0),
+        ("t_seconds_bucket", {"le": "1"}, 3.0),
+        ("t_seconds_bucket", {"le": "+Inf"}, 4.0),
+        ("t_seconds_sum", {}, 3.65),
+        ("t_seconds_count", {}, 4.0),
+    ]
+    assert [v for _, _, v in by_page["CMS"]] == [0.0, 1.0, 1.0, 0.2, 1.0]
+
+
+def test_global_registry_parses_back():
+    metrics.PAGE_SECONDS.observe(0.01, "Overview")
+    families = parse_openmetrics(metrics.METRICS.render())
+    assert families["hanvion_page_render_seconds"]["type"] == "histogram"
+    for family in families.values():
+        buckets = {}
+        for name, labels, value in family["samples"]:
+            if name.endswith("_bucket"):
+                key = tuple(sorted((k, v) for k, v in labels.items() if k != "le"))
+                buckets.setdefault(key, []).append(value)
+        # Cumulative counts never go down
+        assert all(counts == sorted(counts) for counts in buckets.values())
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks import synthetic
+from hanvion_pages.pharmacy_prices import PharmacyPrices, haversine_miles
+
+
+def _store(n=2000, products=20):
+    pharmacies = synthetic.pharmacies(n)
+    prices = synthetic.pharmacy_prices(pharmacies["pharmacy_id"], products)
+    return pharmacies, prices, PharmacyPrices.build(pharmacies, prices)
+
+
+def test_cheapest_near_matches_brute_force():
+    pharmacies, prices, store = _store()
+    rng = np.random.default_rng(1)
+    for _ in range(50):
+        drug = f"Drug {rng.integers(20)}"
+        lat, lon, radius = rng.uniform(27, 47), rng.uniform(-120, -70), rng.choice([25, 100, 400])
+
+        miles = haversine_miles(lat, lon, pharmacies["lat"].to_numpy(), pharmacies["lon"].to_numpy())
+        near = pharmacies.assign(miles=miles)[miles <= radius]
+        expected = (prices[prices["drug"] == drug].merge(near, on="pharmacy_id")
+                    .sort_values(["discount_price", "miles"], kind="stable").head(10))
+
+        got = store.cheapest_near(drug, "10 mg", lat, lon, radius, k=10)
+        assert got["name"].tolist() == expected["name"].tolist()
+        # Prices come back exactly as listed, not as float32 approximations
+        assert got["discount_price"].tolist() == expected["discount_price"].tolist()
+        assert got["cash_price"].tolist() == expected["cash_price"].tolist()
+
+
+def test_prices_are_not_rounded_through_float32():
+    pharmacies = pd.DataFrame({"pharmacy_id": ["P1"], "name": ["One"], "chain": ["A"], "zip": ["10001"],
+                               "lat": [40.75], "lon": [-73.99]})
+    prices = pd.DataFrame({"pharmacy_id": ["P1"], "drug": ["Metformin"], "strength": ["500 mg"],
+                           "cash_price": [25.2], "discount_price": [9.33]})
+    got = PharmacyPrices.build(pharmacies, prices).cheapest_near("Metformin", "500 mg", 40.75, -73.99)
+    assert got[["cash_price", "discount_price"]].values.tolist() == [[25.2, 9.33]]
+
+
+def test_rows_without_drug_or_strength_are_dropped():
+    pharmacies, prices, _ = _store(n=200, products=5)
+    broken = prices.copy()
+    broken.loc[broken.index[:3], "drug"] = np.nan
+    broken.loc[broken.index[3:6], "strength"] = np.nan
+
+    store = PharmacyPrices.build(pharmacies, broken)
+    clean = PharmacyPrices.build(pharmacies, broken.dropna(subset=["drug", "strength"]))
+
+    assert store.products.equals(clean.products)
+    np.testing.assert_array_equal(store.offsets, clean.offsets)
+    np.testing.assert_array_equal(store.price_pharmacy, clean.price_pharmacy)
+    np.testing.assert_array_equal(store.discount, clean.discount)
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from hanvion_pages.insurance_eligibility import DEFAULT_STATE_ROW, insurance_likelihood
+from hanvion_pages.population import score_roster
+
+LOOKUP = pd.Series({"TX": 18.4, "FL": 13.2, "CA": 7.7, "MA": 2.4, "WY": 80.0})
+
+# Age-bracket edges, states missing from the table and both clip bounds
+EDGES = pd.DataFrame({
+    "age": [25, 26, 55, 56, 90, 18],
+    "sex": ["Female", "Male", "Female", "Male", "Female", "Male"],
+    "state": ["ZZ", "TX", "PR", "MA", "MA", "WY"],
+})
+
+
+def _roster(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "age": rng.integers(0, 100, n),
+        "sex": rng.choice(["Female", "Male", "Other"], n),
+        "state": rng.choice(list(LOOKUP.index) + ["ZZ", "PR"], n),
+    })
+
+
+def _expected(row):
+    state_row = {"uninsured_rate": LOOKUP[row.state]} if row.state in LOOKUP.index else DEFAULT_STATE_ROW
+    return insurance_likelihood(row.age, row.sex, state_row)
+
+
+def test_score_roster_matches_insurance_likelihood(stream):
+    roster, _, scored = stream(_roster(3017), score_roster, EDGES, lookup=LOOKUP)
+
+    assert scored["likelihood"].tolist() == [_expected(row) for row in roster.itertuples(index=False)]
+    assert sorted(set(scored["likelihood"]) & {25.0, 98.0}) == [25.0, 98.0]
+
+
+def test_segment_summary_matches_row_means(tmp_path):
+    roster = _roster(2005, seed=1)
+    roster.to_csv(tmp_path / "roster.csv", index=False)
+
+    summary = score_roster(str(tmp_path / "roster.csv"), segments=["state", "sex"],
+                           chunk_rows=500, lookup=LOOKUP)
+
+    roster["likelihood"] = [_expected(row) for row in roster.itertuples(index=False)]
+    expected = roster.groupby(["state", "sex"])["likelihood"].agg(["mean", "count"]).reset_index()
+    merged = summary.merge(expected, on=["state", "sex"], validate="one_to_one")
+    assert len(merged) == len(expected)
+    np.testing.assert_allclose(merged["likelihood"], merged["mean"], rtol=1e-12)
+    assert (merged["count_x"] == merged["count_y"]).all()
@@ -0,0 +1,79 @@
+import json
+import os
+import stat
+
+import pytest
+
+from hanvion_pages import shared_data
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def shared(tmp_path, monkeypatch):
+    monkeypatch.chdir(ROOT)
+    directory = tmp_path / "shared"
+    monkeypatch.setenv("HANVION_SHARED_DIR", str(directory))
+    return directory
+
+
+def test_attach_publishes_into_a_private_directory(shared):
+    table = shared_data.shared_table("insurance")
+
+    assert stat.S_IMODE(os.stat(shared).st_mode) & 0o077 == 0
+    assert "insurance" in shared_data.read_manifest(str(shared))["datasets"]
+    assert table.equals(shared_data.datasets()["insurance"][1]()["table"])
+
+
+def test_untrusted_directory_is_not_read(shared):
+    shared.mkdir()
+    shared.chmod(0o777)
+    # A manifest planted by someone else pointing at their own file
+    (shared / "planted.arrow").write_bytes(b"not arrow")
+    entry = {"files": {"table": "planted.arrow"}, "sources": shared_data.source_stamps("insurance"), "published": 0}
+    manifest = {"format": shared_data.MANIFEST_FORMAT, "datasets": {"insurance": entry}}
+    (shared / shared_data.MANIFEST).write_text(json.dumps(manifest))
+
+    table = shared_data.shared_table("insurance")
+
+    assert table.equals(shared_data.datasets()["insurance"][1]()["table"])
+    with pytest.raises(PermissionError):
+        shared_data.publish(["insurance"])
+
+
+def test_copy_published_by_an_older_format_is_rebuilt(shared):
+    assert shared_data.publish(["insurance"]) == ["insurance"]
+    manifest = json.loads((shared / shared_data.MANIFEST).read_text())
+    manifest["format"] -= 1
+    (shared / shared_data.MANIFEST).write_text(json.dumps(manifest))
+
+    assert shared_data.publish(["insurance"]) == ["insurance"]
+    assert shared_data.publish(["insurance"]) == []
+
+
+@pytest.mark.skipif(not hasattr(os, "geteuid") or os.geteuid() != 0, reason="chown needs root")
+def test_directory_owned_by_another_user_is_not_read(shared):
+    shared.mkdir(mode=0o700)
+    os.chown(shared, 12345, 12345)
+
+    table = shared_data.shared_table("insurance")
+
+    assert table.equals(shared_data.datasets()["insurance"][1]()["table"])
+    assert not (shared / shared_data.MANIFEST).exists()
+
+
+def test_import_does_not_load_the_data_stack(data_stack_after_import):
+    assert data_stack_after_import("hanvion_pages.shared_data") == []
+
+
+def test_optional_dataset_without_sources_is_skipped(shared):
+    assert shared_data.publish(["pharmacy_prices", "insurance"]) == ["insurance"]
+
+    # A copy published while the files were there goes when they do
+    manifest = json.loads((shared / shared_data.MANIFEST).read_text())
+    manifest["datasets"]["pharmacy_prices"] = dict(manifest["datasets"]["insurance"])
+    (shared / shared_data.MANIFEST).write_text(json.dumps(manifest))
+
+    assert shared_data.publish() == [name for name in shared_data.datasets()
+                                     if name not in ("insurance", "pharmacy_prices")]
+    assert "pharmacy_prices" not in shared_data.read_manifest(str(shared))["datasets"]
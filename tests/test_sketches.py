@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from hanvion_pages.sketches import PriceSketch, SketchStore, TDigest
+
+
+def _sketch(values, weight):
+    digest = TDigest(means=values, weights=np.full(len(values), float(weight)),
+                     min_value=min(values), max_value=max(values))
+    return PriceSketch("MRI", 1, digest)
+
+
+def test_counts_survive_repeated_append_round_trips(tmp_path):
+    path = str(tmp_path / "sketches.arrow")
+    batch = 2**24 + 1  # not representable as float32
+    SketchStore({("70551", "Imaging"): _sketch([400.0, 500.0, 900.0], batch)}).save(path)
+
+    for _ in range(5):
+        store = SketchStore.open(path).merge({("70551", "Imaging"): _sketch([450.0, 800.0], batch)})
+        store.save(path)
+
+    digest = SketchStore.open(path).get("70551", "Imaging").digest
+    assert digest.count == 3 * batch + 5 * 2 * batch
+
+
+def test_quantiles_of_merged_sketches_match_the_pooled_data():
+    rng = np.random.default_rng(0)
+    parts = [rng.lognormal(6, 0.5, 20_000) for _ in range(4)]
+    merged = TDigest()
+    for part in parts:
+        digest = TDigest()
+        digest.extend(part)
+        merged.merge(digest)
+
+    pooled = np.concatenate(parts)
+    for q in (0.1, 0.5, 0.9):
+        assert merged.quantile(q) == pytest.approx(np.quantile(pooled, q), rel=0.01)
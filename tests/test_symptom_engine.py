@@ -0,0 +1,74 @@
+import math
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from benchmarks import synthetic
+from hanvion_pages.symptom_engine import MIN_SIMILARITY, SYMPTOM_CATALOG, SymptomEngine
+
+
+@pytest.fixture(scope="module")
+def catalog(request):
+    return SymptomEngine.from_csv(str(request.config.rootpath / SYMPTOM_CATALOG))
+
+
+@pytest.mark.parametrize("text", ["Headache", "  HEADACHE! ", "head ache", "head-pain"])
+def test_exact_name_or_alias(catalog, text):
+    assert catalog.lookup(text) == [("Headache", 1.0)]
+
+
+@pytest.mark.parametrize("text, symptom", [("hedache", "Headache"), ("fevr", "Fever"),
+                                           ("shortness of breth", "Shortness of breath")])
+def test_one_typo_finds_the_symptom_first(catalog, text, symptom):
+    found = catalog.lookup(text)
+    assert found[0][0] == symptom
+    assert MIN_SIMILARITY <= found[0][1] < 1.0
+    assert [score for _, score in found] == sorted((score for _, score in found), reverse=True)
+
+
+@pytest.mark.parametrize("text", ["", "   ", "!!", "qqqq zzzz"])
+def test_empty_or_unknown_query(catalog, text):
+    assert catalog.lookup(text) == []
+    assert catalog.match([text]) == {"causes": [], "systems": [], "seek_care": False}
+
+
+def _naive_match(records, names):
+    """
+    Per-cause overlap count and summed weight, straight from the records.
+    """
+    symptom_count = Counter(c for r in records for c in r["causes"])
+    picked = [r for r in records if r["symptom"] in names]
+    explained, score = Counter(), Counter()
+    for r in picked:
+        norm = sum(1 / (k + 1) for k in range(len(r["causes"])))
+        for k, cause in enumerate(r["causes"]):
+            idf = math.log(1 + len(records) / symptom_count[cause])
+            explained[cause] += 1
+            score[cause] += 1 / (k + 1) / norm * idf
+    return explained, score, any(r["seek_care"] for r in picked)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_match_ranks_causes_like_a_naive_overlap_count(seed):
+    # Few causes, so symptoms share them and overlap counts vary
+    records = synthetic.symptom_records(200, n_causes=40, seed=seed)
+    engine = SymptomEngine(records)
+    rng = np.random.default_rng(seed)
+    names = [records[i]["symptom"] for i in rng.choice(len(records), 6, replace=False)]
+
+    result = engine.match(names + ["not a symptom"], limit=len(engine.causes))
+    explained, score, seek_care = _naive_match(records, names)
+
+    assert {c: n for c, _, n in result["causes"]} == dict(explained)
+    for cause, got, _ in result["causes"]:
+        assert got == pytest.approx(score[cause], rel=1e-9)
+    # Most symptoms explained first, then highest weight
+    keys = [(n, s) for _, s, n in result["causes"]]
+    for (n1, s1), (n2, s2) in zip(keys, keys[1:]):
+        assert n1 > n2 or (n1 == n2 and s1 >= s2 - 1e-9)
+    assert result["seek_care"] == seek_care
+    assert sum(n for _, n in result["systems"]) == len(names)
+
+    top = engine.match(names, limit=3)["causes"]
+    assert top == result["causes"][:3]
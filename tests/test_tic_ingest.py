@@ -0,0 +1,64 @@
+import csv
+import json
+
+from hanvion_pages import tic_ingest
+
+REFERENCE = [
+    ["code", "description", "setting", "median_price", "min_price", "max_price", "sample_size"],
+    ["70551", "MRI brain without contrast", "Imaging", "500", "300", "1200", "40"],
+    ["70551", "MRI brain without contrast (hospital)", "Hospital", "900", "600", "2000", "25"],
+    ["99213", "Office visit, established patient", "Clinic", "95", "60", "210", "850"],
+    ["99999", "Not in any payer file", "Clinic", "10", "5", "20", "3"],
+]
+
+
+def _price(rate, billing_class):
+    return {"negotiated_type": "negotiated", "negotiated_rate": rate, "billing_class": billing_class}
+
+
+def _write_tic(path):
+    doc = {"reporting_entity_name": "Payer", "in_network": [
+        {"billing_code": "70551", "negotiated_rates": [{"provider_groups": [{"npi": [1, 2]}], "negotiated_prices": [
+            _price(450, "professional"), _price(950, "institutional")]}]},
+        {"billing_code": "99213", "negotiated_rates": [{"provider_groups": [{"npi": [3]}], "negotiated_prices": [
+            _price(100, "institutional")]}]},
+    ]}
+    path.write_text(json.dumps(doc))
+
+
+def _rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return {(r["code"], r["setting"]): r for r in csv.DictReader(f)}
+
+
+def test_reference_keeps_every_setting_of_a_code(tmp_path):
+    cms = tmp_path / "cms.csv"
+    with open(cms, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows(REFERENCE)
+
+    reference = tic_ingest.load_reference(str(cms))
+    assert reference["70551"] == {"Imaging": "MRI brain without contrast",
+                                  "Hospital": "MRI brain without contrast (hospital)"}
+
+
+def test_rewriting_the_reference_csv_keeps_unpriced_rows(tmp_path):
+    cms = tmp_path / "cms.csv"
+    with open(cms, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows(REFERENCE)
+    tic = tmp_path / "payer.json"
+    _write_tic(tic)
+
+    tic_ingest.main([str(tic), "--codes-from", str(cms), "--out", str(cms),
+                     "--sketches", str(tmp_path / "sketches.arrow"), "--workers", "1"])
+    rows = _rows(cms)
+
+    # Institutional price lands on the listed Hospital row with its description
+    assert rows[("70551", "Hospital")]["description"] == "MRI brain without contrast (hospital)"
+    assert rows[("70551", "Hospital")]["median_price"] == "950"
+    # Professional price: Clinic is not listed for this code, so billing_class decides
+    assert rows[("70551", "Clinic")]["median_price"] == "450"
+    # A code listed under one setting keeps it
+    assert rows[("99213", "Clinic")]["median_price"] == "100"
+    # Rows no file priced are written back unchanged
+    assert rows[("70551", "Imaging")]["median_price"] == "500"
+    assert rows[("99999", "Clinic")]["description"] == "Not in any payer file"